@@ -0,0 +1,113 @@
+-- ========================================
+-- ROW VERSIONS - ORACLE
+-- Monotonic ROW_VERSION on every synced table and update triggers
+-- that keep the version and MODIFIED_AT supplied by the sync engine
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- ADD ROW_VERSION COLUMN TO TABLES
+-- ========================================
+
+-- EXPENSE Table
+ALTER TABLE finance_expense
+ADD (row_version NUMBER(15) DEFAULT 1 NOT NULL);
+
+-- INCOME Table
+ALTER TABLE finance_income
+ADD (row_version NUMBER(15) DEFAULT 1 NOT NULL);
+
+-- BUDGET Table
+ALTER TABLE finance_budget
+ADD (row_version NUMBER(15) DEFAULT 1 NOT NULL);
+
+-- SAVINGS_GOAL Table
+ALTER TABLE finance_savings_goal
+ADD (row_version NUMBER(15) DEFAULT 1 NOT NULL);
+
+-- ========================================
+-- RECREATE UPDATE TRIGGERS
+-- ========================================
+
+-- The old triggers stamped MODIFIED_AT := SYSTIMESTAMP on every update,
+-- which overwrote the local edit time pushed by sync and broke
+-- last-modified-wins. A sync MERGE now supplies ROW_VERSION and
+-- MODIFIED_AT itself; any other update is a central edit and gets a new
+-- version and timestamp here.
+
+-- EXPENSE version, modified_at and fiscal period trigger
+CREATE OR REPLACE TRIGGER trg_expense_bu
+BEFORE UPDATE ON finance_expense
+FOR EACH ROW
+BEGIN
+    IF :NEW.row_version = :OLD.row_version AND :NEW.modified_at = :OLD.modified_at THEN
+        :NEW.row_version := :OLD.row_version + 1;
+        :NEW.modified_at := SYSTIMESTAMP;
+    END IF;
+
+    :NEW.fiscal_year := EXTRACT(YEAR FROM :NEW.expense_date);
+    :NEW.fiscal_month := EXTRACT(MONTH FROM :NEW.expense_date);
+END;
+/
+
+-- INCOME version, modified_at and fiscal period trigger
+CREATE OR REPLACE TRIGGER trg_income_bu
+BEFORE UPDATE ON finance_income
+FOR EACH ROW
+BEGIN
+    IF :NEW.row_version = :OLD.row_version AND :NEW.modified_at = :OLD.modified_at THEN
+        :NEW.row_version := :OLD.row_version + 1;
+        :NEW.modified_at := SYSTIMESTAMP;
+    END IF;
+
+    :NEW.fiscal_year := EXTRACT(YEAR FROM :NEW.income_date);
+    :NEW.fiscal_month := EXTRACT(MONTH FROM :NEW.income_date);
+END;
+/
+
+-- BUDGET version and modified_at trigger
+CREATE OR REPLACE TRIGGER trg_budget_bu
+BEFORE UPDATE ON finance_budget
+FOR EACH ROW
+BEGIN
+    IF :NEW.row_version = :OLD.row_version AND :NEW.modified_at = :OLD.modified_at THEN
+        :NEW.row_version := :OLD.row_version + 1;
+        :NEW.modified_at := SYSTIMESTAMP;
+    END IF;
+END;
+/
+
+-- SAVINGS_GOAL version, modified_at and auto-complete trigger
+CREATE OR REPLACE TRIGGER trg_goal_bu
+BEFORE UPDATE ON finance_savings_goal
+FOR EACH ROW
+BEGIN
+    IF :NEW.row_version = :OLD.row_version AND :NEW.modified_at = :OLD.modified_at THEN
+        :NEW.row_version := :OLD.row_version + 1;
+        :NEW.modified_at := SYSTIMESTAMP;
+    END IF;
+
+    IF :NEW.current_amount >= :NEW.target_amount AND :NEW.status = 'Active' THEN
+        :NEW.status := 'Completed';
+        :NEW.completed_date := SYSDATE;
+    END IF;
+END;
+/
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT table_name, column_name, data_type, data_default
+FROM user_tab_columns
+WHERE column_name = 'ROW_VERSION'
+  AND table_name IN ('FINANCE_EXPENSE', 'FINANCE_INCOME', 'FINANCE_BUDGET', 'FINANCE_SAVINGS_GOAL')
+ORDER BY table_name;
+
+SELECT trigger_name, status
+FROM user_triggers
+WHERE trigger_name IN ('TRG_EXPENSE_BU', 'TRG_INCOME_BU', 'TRG_BUDGET_BU', 'TRG_GOAL_BU');
+
+COMMIT;
+
+SELECT 'Row version columns added successfully!' AS status FROM DUAL;
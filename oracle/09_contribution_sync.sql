@@ -0,0 +1,54 @@
+-- ========================================
+-- SAVINGS CONTRIBUTION SYNC - ORACLE
+-- Lets sync load contributions in batches without the per-row
+-- trigger adding them to the goal total a second time
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- ADD SYNC COLUMNS TO FINANCE_SAVINGS_CONTRIBUTION
+-- ========================================
+
+-- Rows loaded by sync are flagged 1; contributions entered centrally
+-- (pkg_finance_crud.add_contribution) keep the default 0
+ALTER TABLE finance_savings_contribution
+ADD (synced_from_local NUMBER(1) DEFAULT 0 NOT NULL);
+
+-- Used as the pull watermark for contributions
+ALTER TABLE finance_savings_contribution
+ADD (sync_timestamp TIMESTAMP DEFAULT SYSTIMESTAMP);
+
+CREATE INDEX idx_cont_sync ON finance_savings_contribution(sync_timestamp) TABLESPACE finance_index;
+
+-- ========================================
+-- RECREATE CONTRIBUTION TRIGGER
+-- ========================================
+
+-- Synced contributions arrive after their goal, whose current_amount
+-- already includes them, so only contributions entered centrally are
+-- added to the goal total here.
+CREATE OR REPLACE TRIGGER trg_contribution_ai
+AFTER INSERT ON finance_savings_contribution
+FOR EACH ROW
+WHEN (NEW.synced_from_local = 0)
+BEGIN
+    UPDATE finance_savings_goal
+    SET current_amount = current_amount + :NEW.contribution_amount
+    WHERE goal_id = :NEW.goal_id;
+END;
+/
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT column_name, data_type, data_default
+FROM user_tab_columns
+WHERE table_name = 'FINANCE_SAVINGS_CONTRIBUTION'
+ORDER BY column_id;
+
+SELECT trigger_name, status FROM user_triggers WHERE trigger_name = 'TRG_CONTRIBUTION_AI';
+
+COMMIT;
+
+SELECT 'Contribution sync columns added successfully!' AS status FROM DUAL;
@@ -0,0 +1,35 @@
+-- ========================================
+-- OFFLINE SYNC BUNDLES - ORACLE
+-- Log of changeset bundles applied centrally
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- CREATE TABLE
+-- ========================================
+
+-- SYNC_BUNDLE Table
+-- One row per applied bundle, written in the same transaction as the
+-- bundle's rows. The primary key makes applying a bundle twice a no-op
+-- and the highest sequence_no per source enforces apply order.
+CREATE TABLE finance_sync_bundle (
+    source_name VARCHAR2(100) NOT NULL,
+    sequence_no NUMBER(10) NOT NULL,
+    checksum VARCHAR2(64) NOT NULL,
+    row_count NUMBER(10) DEFAULT 0 NOT NULL,
+    applied_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT pk_sync_bundle PRIMARY KEY (source_name, sequence_no)
+) TABLESPACE finance_data;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT column_name, data_type, data_default
+FROM user_tab_columns
+WHERE table_name = 'FINANCE_SYNC_BUNDLE'
+ORDER BY column_id;
+
+COMMIT;
+
+SELECT 'Sync bundle table created successfully!' AS status FROM DUAL;
@@ -0,0 +1,52 @@
+-- ========================================
+-- SYNC METRICS - ORACLE
+-- Per-run counters on FINANCE_SYNC_LOG and per-phase timings in
+-- FINANCE_SYNC_PHASE
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- EXTEND FINANCE_SYNC_LOG TABLE
+-- ========================================
+
+ALTER TABLE finance_sync_log ADD (
+    round_trips NUMBER(10) DEFAULT 0 NOT NULL,
+    bytes_fetched NUMBER(15) DEFAULT 0 NOT NULL,
+    failed_rows NUMBER(10) DEFAULT 0 NOT NULL,
+    retry_count NUMBER(5) DEFAULT 0 NOT NULL
+);
+
+-- ========================================
+-- CREATE FINANCE_SYNC_PHASE TABLE
+-- ========================================
+
+-- SYNC_PHASE Table
+-- One row per phase of a sync run (connect, users, pull, each entity, commit)
+CREATE TABLE finance_sync_phase (
+    sync_log_id NUMBER(15) NOT NULL,
+    phase_order NUMBER(3) NOT NULL,
+    phase_name VARCHAR2(50) NOT NULL,
+    duration_ms NUMBER(12,3) NOT NULL,
+    rows_processed NUMBER(10) DEFAULT 0 NOT NULL,
+    round_trips NUMBER(10) DEFAULT 0 NOT NULL,
+    bytes_fetched NUMBER(15) DEFAULT 0 NOT NULL,
+    failed_rows NUMBER(10) DEFAULT 0 NOT NULL,
+    CONSTRAINT pk_sync_phase PRIMARY KEY (sync_log_id, phase_order),
+    CONSTRAINT fk_phase_sync_log FOREIGN KEY (sync_log_id)
+        REFERENCES finance_sync_log(sync_log_id) ON DELETE CASCADE
+) TABLESPACE finance_data;
+
+CREATE INDEX idx_sync_phase_name ON finance_sync_phase(phase_name) TABLESPACE finance_index;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT column_name, data_type, data_default
+FROM user_tab_columns
+WHERE table_name = 'FINANCE_SYNC_PHASE'
+ORDER BY column_id;
+
+COMMIT;
+
+SELECT 'Sync metrics tables created successfully!' AS status FROM DUAL;
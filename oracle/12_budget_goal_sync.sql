@@ -0,0 +1,37 @@
+-- ========================================
+-- BUDGET AND GOAL SYNC TIMESTAMP - ORACLE
+-- Lets sync pull budgets and goals that another device pushed with an
+-- older modified_at, like expenses and income already are
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- ADD SYNC COLUMNS
+-- ========================================
+
+-- Set to SYSTIMESTAMP by the sync MERGE; used with modified_at as the
+-- pull watermark, since modified_at is the client's edit time
+ALTER TABLE finance_budget
+ADD (sync_timestamp TIMESTAMP DEFAULT SYSTIMESTAMP);
+
+ALTER TABLE finance_savings_goal
+ADD (sync_timestamp TIMESTAMP DEFAULT SYSTIMESTAMP);
+
+CREATE INDEX idx_bud_sync ON finance_budget(user_id, sync_timestamp) TABLESPACE finance_index;
+CREATE INDEX idx_goal_sync ON finance_savings_goal(user_id, sync_timestamp) TABLESPACE finance_index;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT table_name, column_name, data_type, data_default
+FROM user_tab_columns
+WHERE table_name IN ('FINANCE_BUDGET', 'FINANCE_SAVINGS_GOAL')
+  AND column_name = 'SYNC_TIMESTAMP';
+
+SELECT index_name, table_name FROM user_indexes
+WHERE index_name IN ('IDX_BUD_SYNC', 'IDX_GOAL_SYNC');
+
+COMMIT;
+
+SELECT 'Budget and goal sync columns added successfully!' AS status FROM DUAL;
@@ -0,0 +1,42 @@
+-- ========================================
+-- SYNC SOURCE - ORACLE
+-- Records which device last pushed each row, so a device's pull skips
+-- the rows it pushed itself
+-- Run this in SQL Developer as finance_admin user
+-- ========================================
+
+-- ========================================
+-- ADD SYNC COLUMNS
+-- ========================================
+
+-- Set by the sync MERGE to the pushing device's source name (source_name
+-- under [bundle]); NULL for rows entered centrally
+ALTER TABLE finance_expense
+ADD (sync_source VARCHAR2(100));
+
+ALTER TABLE finance_income
+ADD (sync_source VARCHAR2(100));
+
+ALTER TABLE finance_budget
+ADD (sync_source VARCHAR2(100));
+
+ALTER TABLE finance_savings_goal
+ADD (sync_source VARCHAR2(100));
+
+ALTER TABLE finance_savings_contribution
+ADD (sync_source VARCHAR2(100));
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT table_name, column_name, data_type
+FROM user_tab_columns
+WHERE table_name IN ('FINANCE_EXPENSE', 'FINANCE_INCOME', 'FINANCE_BUDGET',
+                     'FINANCE_SAVINGS_GOAL', 'FINANCE_SAVINGS_CONTRIBUTION')
+  AND column_name = 'SYNC_SOURCE'
+ORDER BY table_name;
+
+COMMIT;
+
+SELECT 'Sync source columns added successfully!' AS status FROM DUAL;
@@ -0,0 +1,754 @@
+"""
+Synthetic Dataset Generator for Personal Finance Manager
+Generates N users x M years of realistic, reproducible data for performance
+testing, bulk-loads it into SQLite and optionally writes matching
+SQL*Loader files for Oracle
+"""
+
+import argparse
+import bisect
+import csv
+import math
+import os
+import random
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE = os.path.join(SCRIPT_DIR, '..', 'sqlite', 'finance_local.db')
+
+# Day-to-day spending: share of transactions, median amount (LKR) and the
+# spread of the log-normal amount distribution
+DAILY_CATEGORIES = {
+    'Food & Dining': (34, 1800, 0.75),
+    'Transportation': (22, 900, 0.8),
+    'Shopping': (10, 4500, 0.9),
+    'Entertainment': (8, 2500, 0.7),
+    'Personal Care': (6, 2200, 0.6),
+    'Healthcare': (5, 3500, 0.8),
+    'Education': (3, 6000, 0.7),
+    'Others': (4, 1500, 0.9),
+}
+
+# Bills paid once a month: category, description, day of month, median, spread
+MONTHLY_BILLS = [
+    ('Housing', 'Monthly rent payment', 1, 38000, 0.0),
+    ('Bills & Utilities', 'LECO electricity bill', 12, 6500, 0.3),
+    ('Bills & Utilities', 'Water Board bill', 15, 1800, 0.25),
+    ('Bills & Utilities', 'SLT internet & phone', 20, 4200, 0.1),
+    ('Bills & Utilities', 'Dialog mobile bill', 22, 1900, 0.2),
+]
+
+# Spending multiplier per month: Sinhala and Tamil New Year in April, Vesak
+# in May and the festive season in December
+MONTH_FACTORS = [0.95, 0.85, 1.0, 1.3, 1.1, 0.95, 0.95, 1.0, 0.95, 1.0, 1.1, 1.4]
+
+# Categories that swing harder than the overall month multiplier
+CATEGORY_MONTH_FACTORS = {
+    ('Shopping', 4): 1.8,
+    ('Shopping', 11): 1.3,
+    ('Shopping', 12): 2.0,
+    ('Food & Dining', 4): 1.4,
+    ('Entertainment', 12): 1.6,
+    ('Education', 1): 1.8,
+}
+
+WEEKEND_FACTOR = 1.3
+
+PAYMENT_METHODS = ['Cash', 'Credit Card', 'Debit Card', 'Online', 'Bank Transfer']
+PAYMENT_WEIGHTS = {
+    'Shopping': [20, 35, 25, 18, 2],
+    'Education': [10, 20, 25, 25, 20],
+    'Healthcare': [45, 20, 30, 3, 2],
+}
+DEFAULT_PAYMENT_WEIGHTS = [45, 18, 25, 10, 2]
+
+DESCRIPTIONS = {
+    'Food & Dining': ['Keells groceries', 'Rice & curry lunch', 'Kottu roti', 'Pizza Hut',
+                      'Cargills FoodCity', 'Seafood dinner', 'Bakery', 'Tea and short eats'],
+    'Transportation': ['Uber ride', 'PickMe to office', 'Bus fare', 'Fuel - Ceypetco',
+                       'Three-wheeler', 'Train ticket', 'Highway toll', 'Parking fee'],
+    'Shopping': ['Odel clothing', 'Singer electronics', 'Daraz online order',
+                 'Shoes from Bata', 'Mobile accessories', 'Kitchen items', 'Gift purchase'],
+    'Entertainment': ['Scope Cinema tickets', 'Netflix subscription', 'Cricket match tickets',
+                      'Concert at Nelum Pokuna', 'Books from Vijitha Yapa', 'Music lessons'],
+    'Personal Care': ['Salon visit', 'Toiletries', 'Gym session', 'Spa treatment'],
+    'Healthcare': ['Doctor consultation', 'Prescription medicines', 'Lab tests at Nawaloka',
+                   'Dental checkup', 'Pharmacy - Osu Sala', 'Vitamins & supplements'],
+    'Education': ['Udemy course subscription', 'English class monthly fee',
+                  'Books from Sarasavi', 'Tuition fees', 'Workshop fee'],
+    'Others': ['Donation', 'Temple offering', 'Miscellaneous purchase', 'Repairs'],
+}
+
+GOALS = [
+    ('House Down Payment', 2000000, 730, 'High'),
+    ('Emergency Fund', 750000, 365, 'High'),
+    ('New Vehicle', 1500000, 540, 'High'),
+    ('Wedding Expenses', 1800000, 450, 'High'),
+    ('Higher Education', 1000000, 600, 'Medium'),
+    ('Dream Vacation to Maldives', 500000, 240, 'Medium'),
+    ('Home Renovation', 800000, 365, 'Low'),
+]
+
+FIRST_NAMES = ['Kavinda', 'Dilini', 'Chamath', 'Nimali', 'Tharindu', 'Sachini', 'Ruwan',
+               'Ishara', 'Nuwan', 'Hasini', 'Kasun', 'Malsha', 'Lahiru', 'Piumi', 'Dinesh']
+LAST_NAMES = ['Silva', 'Fernando', 'Perera', 'Jayawardena', 'Bandara', 'Wickramasinghe',
+              'Gunasekara', 'Rajapaksa', 'Herath', 'Dissanayake', 'Senanayake', 'Kumara']
+
+# Share of generated rows edited after creation, and of rows soft deleted
+EDITED_SHARE = 0.03
+DELETED_SHARE = 0.005
+
+# SQLite insert statements; ids are assigned by the writer so the dataset
+# is identical whatever the number of worker processes
+SQLITE_INSERTS = {
+    'user': """
+        INSERT INTO user (user_id, username, password_hash, email, full_name, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'expense': """
+        INSERT INTO expense (expense_id, user_id, category_id, amount, expense_date,
+                             description, payment_method, created_at, modified_at,
+                             is_deleted, row_version, is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'income': """
+        INSERT INTO income (income_id, user_id, income_source, amount, income_date,
+                            description, created_at, modified_at, is_deleted,
+                            row_version, is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'budget': """
+        INSERT INTO budget (budget_id, user_id, category_id, budget_amount, start_date,
+                            end_date, created_at, modified_at, is_active, is_deleted,
+                            row_version, is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+    """,
+    'savings_goal': """
+        INSERT INTO savings_goal (goal_id, user_id, goal_name, target_amount,
+                                  current_amount, start_date, deadline, priority, status,
+                                  created_at, modified_at, is_deleted, row_version,
+                                  is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'savings_contribution': """
+        INSERT INTO savings_contribution (contribution_id, goal_id, contribution_amount,
+                                          contribution_date, description, created_at,
+                                          is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+ID_COLUMNS = {
+    'user': 'user_id',
+    'expense': 'expense_id',
+    'income': 'income_id',
+    'budget': 'budget_id',
+    'savings_goal': 'goal_id',
+    'savings_contribution': 'contribution_id',
+}
+
+# Oracle tables written as SQL*Loader data files, with the field list of
+# each control file
+DATE_FIELD = 'DATE "YYYY-MM-DD"'
+TIMESTAMP_FIELD = 'TIMESTAMP "YYYY-MM-DD HH24:MI:SS"'
+ORACLE_TABLES = {
+    'user': ('finance_user', [
+        ('user_id', ''), ('username', ''), ('password_hash', ''), ('email', ''),
+        ('full_name', ''), ('created_at', TIMESTAMP_FIELD),
+    ]),
+    'expense': ('finance_expense', [
+        ('expense_id', ''), ('user_id', ''), ('category_id', ''), ('amount', ''),
+        ('expense_date', DATE_FIELD), ('description', ''), ('payment_method', ''),
+        ('created_at', TIMESTAMP_FIELD), ('modified_at', TIMESTAMP_FIELD),
+        ('is_deleted', ''), ('row_version', ''), ('sync_timestamp', TIMESTAMP_FIELD),
+        ('fiscal_year', ''), ('fiscal_month', ''),
+    ]),
+    'income': ('finance_income', [
+        ('income_id', ''), ('user_id', ''), ('income_source', ''), ('amount', ''),
+        ('income_date', DATE_FIELD), ('description', ''),
+        ('created_at', TIMESTAMP_FIELD), ('modified_at', TIMESTAMP_FIELD),
+        ('is_deleted', ''), ('row_version', ''), ('sync_timestamp', TIMESTAMP_FIELD),
+        ('fiscal_year', ''), ('fiscal_month', ''),
+    ]),
+    'budget': ('finance_budget', [
+        ('budget_id', ''), ('user_id', ''), ('category_id', ''), ('budget_amount', ''),
+        ('start_date', DATE_FIELD), ('end_date', DATE_FIELD),
+        ('created_at', TIMESTAMP_FIELD), ('modified_at', TIMESTAMP_FIELD),
+        ('is_deleted', ''), ('row_version', ''), ('sync_timestamp', TIMESTAMP_FIELD),
+    ]),
+    'savings_goal': ('finance_savings_goal', [
+        ('goal_id', ''), ('user_id', ''), ('goal_name', ''), ('target_amount', ''),
+        ('current_amount', ''), ('start_date', DATE_FIELD), ('deadline', DATE_FIELD),
+        ('priority', ''), ('status', ''), ('created_at', TIMESTAMP_FIELD),
+        ('modified_at', TIMESTAMP_FIELD), ('is_deleted', ''), ('row_version', ''),
+        ('sync_timestamp', TIMESTAMP_FIELD),
+    ]),
+    'savings_contribution': ('finance_savings_contribution', [
+        ('contribution_id', ''), ('goal_id', ''), ('contribution_amount', ''),
+        ('contribution_date', DATE_FIELD), ('description', ''),
+        ('created_at', TIMESTAMP_FIELD), ('synced_from_local', ''),
+        ('sync_timestamp', TIMESTAMP_FIELD),
+    ]),
+}
+
+
+def poisson(rng, mean):
+    """Knuth's Poisson sampler; the daily means used here are small"""
+    limit = math.exp(-mean)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def stamp(rng, day):
+    """Creation time, between 07:00 and 23:00, of a row entered on `day` (ISO date)"""
+    seconds = rng.randrange(7 * 3600, 23 * 3600)
+    return f"{day} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def entry_state(rng, day, iso_day, end_date):
+    """(created_at, modified_at, is_deleted, row_version) of a row entered on `day`
+
+    A few rows are edited or soft deleted some days after they were
+    entered, so sync and conflict paths see realistic versions.
+    """
+    created_at = stamp(rng, iso_day)
+    roll = rng.random()
+    if roll >= EDITED_SHARE + DELETED_SHARE:
+        return created_at, created_at, 0, 1
+    edited_on = min(day + timedelta(days=rng.randint(0, 30)), end_date)
+    modified_at = max(stamp(rng, edited_on.isoformat()), created_at)
+    if roll < DELETED_SHARE:
+        return created_at, modified_at, 1, 2
+    return created_at, modified_at, 0, rng.randint(2, 3)
+
+
+def generate_user(rng, user_id, options):
+    """Generate every row of one user
+
+    Rows reference the user by its position in the shard; the writer
+    replaces it with the real id. Amounts are whole rupees for goals and
+    contributions so contribution totals never overshoot a target.
+    """
+    start_date, end_date = options['start_date'], options['end_date']
+    categories = options['categories']
+    synced = options['synced']
+
+    def sync_fields(modified_at):
+        return (1, modified_at) if synced else (0, None)
+
+    # Each user gets a spending scale, activity level and category mix
+    scale = rng.lognormvariate(0, 0.35)
+    daily_rate = rng.gammavariate(6, 0.38)
+    names = list(DAILY_CATEGORIES)
+    shares = [DAILY_CATEGORIES[name][0] * rng.uniform(0.5, 1.5) for name in names]
+    month_weights = []
+    for month in range(1, 13):
+        weights = [share * CATEGORY_MONTH_FACTORS.get((name, month), 1.0)
+                   for name, share in zip(names, shares)]
+        month_weights.append((sum(weights), [sum(weights[:i + 1]) for i in range(len(weights))]))
+    daily_total = sum(shares)
+
+    # Per-category constants of the hot loop, with cumulative payment
+    # method weights for bisect
+    profiles = {}
+    for name, (_, median, spread) in DAILY_CATEGORIES.items():
+        weights = PAYMENT_WEIGHTS.get(name, DEFAULT_PAYMENT_WEIGHTS)
+        profiles[name] = (categories[name], median * scale, spread, DESCRIPTIONS[name],
+                          [sum(weights[:i + 1]) for i in range(len(weights))], sum(weights))
+
+    expenses = []
+    day = start_date
+    while day <= end_date:
+        month_total, cum_weights = month_weights[day.month - 1]
+        mean = daily_rate * MONTH_FACTORS[day.month - 1] * month_total / daily_total
+        if day.weekday() >= 5:
+            mean *= WEEKEND_FACTOR
+        count = poisson(rng, mean)
+        if count:
+            iso_day = day.isoformat()
+            for name in rng.choices(names, cum_weights=cum_weights, k=count):
+                category_id, median, spread, descriptions, pay_weights, pay_total = profiles[name]
+                amount = round(max(50, median * rng.lognormvariate(0, spread)), 2)
+                method = PAYMENT_METHODS[bisect.bisect(pay_weights, rng.random() * pay_total)]
+                created_at, modified_at, is_deleted, row_version = entry_state(
+                    rng, day, iso_day, end_date)
+                expenses.append((user_id, category_id, amount, iso_day, rng.choice(descriptions),
+                                 method, created_at, modified_at, is_deleted, row_version)
+                                + sync_fields(modified_at))
+        day += timedelta(days=1)
+
+    # Monthly bills, salary and the other income streams
+    incomes = []
+    rent = round(38000 * scale, -2)
+    salary = round(rng.uniform(70000, 160000) * scale, -2)
+    yearly_raise = rng.uniform(0.03, 0.10)
+    freelance_rate = rng.uniform(0.2, 0.8) if rng.random() < 0.4 else 0
+    invests = rng.random() < 0.35
+    business = rng.random() < 0.1
+
+    def add_income(source, amount, day, description):
+        iso_day = day.isoformat()
+        created_at, modified_at, is_deleted, row_version = entry_state(rng, day, iso_day, end_date)
+        incomes.append((user_id, source, round(amount, 2), iso_day, description,
+                        created_at, modified_at, is_deleted, row_version) + sync_fields(modified_at))
+
+    month = month_start(start_date)
+    while month <= end_date:
+        for name, description, day_of_month, median, spread in MONTHLY_BILLS:
+            day = month.replace(day=day_of_month)
+            if start_date <= day <= end_date:
+                amount = rent if name == 'Housing' else round(
+                    median * scale * rng.lognormvariate(0, spread), 2)
+                iso_day = day.isoformat()
+                created_at, modified_at, is_deleted, row_version = entry_state(
+                    rng, day, iso_day, end_date)
+                expenses.append((user_id, categories[name], amount, iso_day, description,
+                                 rng.choice(['Online', 'Bank Transfer']), created_at,
+                                 modified_at, is_deleted, row_version) + sync_fields(modified_at))
+
+        payday = month.replace(day=25)
+        if start_date <= payday <= end_date:
+            years_in = (payday - start_date).days // 365
+            add_income('Salary', salary * (1 + yearly_raise) ** years_in, payday,
+                       'Monthly salary payment')
+            if month.month == 12 or month.month == 4:
+                if rng.random() < 0.5:
+                    add_income('Gift', rng.lognormvariate(math.log(10000), 0.5), payday,
+                               'Festival gift' if month.month == 4 else 'Holiday bonus')
+        if freelance_rate and rng.random() < freelance_rate:
+            day = month.replace(day=rng.randint(1, 28))
+            if start_date <= day <= end_date:
+                add_income('Freelance', rng.lognormvariate(math.log(45000), 0.5), day,
+                           rng.choice(['Web development project', 'Consulting work',
+                                       'Graphic design gig', 'Content writing']))
+        if invests and month.month % 3 == 0:
+            day = month.replace(day=28)
+            if start_date <= day <= end_date:
+                add_income('Investment', rng.lognormvariate(math.log(12000), 0.6), day,
+                           rng.choice(['Dividend payment', 'Interest earned']))
+        if business:
+            for _ in range(rng.randint(1, 4)):
+                day = month.replace(day=rng.randint(1, 28))
+                if start_date <= day <= end_date:
+                    add_income('Business', rng.lognormvariate(math.log(30000), 0.7), day,
+                               rng.choice(['Client payment', 'Product sales', 'Commission']))
+        month = next_month(month)
+
+    # Monthly budgets for the fixed bills and a few spending categories,
+    # sized around the user's expected spend
+    expected = {
+        name: daily_rate * 30.4 * share / daily_total * DAILY_CATEGORIES[name][1] * scale
+        * math.exp(DAILY_CATEGORIES[name][2] ** 2 / 2)
+        for name, share in zip(names, shares)
+    }
+    expected['Housing'] = rent
+    expected['Bills & Utilities'] = sum(bill[3] for bill in MONTHLY_BILLS[1:]) * scale
+    budgeted = ['Housing', 'Bills & Utilities', 'Food & Dining', 'Transportation']
+    budgeted += rng.sample(names[2:], rng.randint(1, 3))
+
+    budgets = []
+    month = month_start(start_date)
+    while month <= end_date:
+        last_day = next_month(month) - timedelta(days=1)
+        created_on = max(month - timedelta(days=rng.randint(0, 5)), start_date)
+        for name in budgeted:
+            created_at, modified_at, is_deleted, row_version = entry_state(
+                rng, created_on, created_on.isoformat(), end_date)
+            amount = max(500, round(expected[name] * rng.uniform(0.9, 1.25) / 500) * 500)
+            budgets.append((user_id, categories[name], amount, month.isoformat(),
+                            last_day.isoformat(), created_at, modified_at, is_deleted,
+                            row_version) + sync_fields(modified_at))
+        month = next_month(month)
+
+    # Savings goals with monthly contributions until the target or deadline
+    goals = []
+    span = (end_date - start_date).days
+    for goal_name, target, days, priority in rng.sample(GOALS, rng.randint(1, 4)):
+        target = round(target * scale, -3)
+        goal_start = start_date + timedelta(days=rng.randint(0, int(span * 0.75)))
+        deadline = goal_start + timedelta(days=int(days * rng.uniform(0.8, 1.5)))
+        monthly = target * 30.4 / (deadline - goal_start).days
+        created_at = stamp(rng, goal_start.isoformat())
+
+        contributions = []
+        total = 0
+        month = next_month(goal_start)
+        while month <= min(deadline, end_date) and total < target:
+            if rng.random() >= 0.15:
+                day = month.replace(day=rng.randint(26, 28))
+                if day > end_date:
+                    break
+                amount = min(target - total, max(100, round(monthly * rng.uniform(0.5, 1.3), -2)))
+                total += amount
+                contrib_at = stamp(rng, day.isoformat())
+                contributions.append((amount, day.isoformat(),
+                                      f'Monthly contribution {len(contributions) + 1}',
+                                      contrib_at) + sync_fields(contrib_at))
+            month = next_month(month)
+
+        modified_at = contributions[-1][3] if contributions else created_at
+        status = 'Completed' if total >= target else 'Active'
+        goals.append(((user_id, goal_name, target, total, goal_start.isoformat(),
+                       deadline.isoformat(), priority, status, created_at, modified_at, 0, 1)
+                      + sync_fields(modified_at), contributions))
+
+    return expenses, incomes, budgets, goals
+
+
+def generate_shard(task):
+    """Generate the rows of a contiguous range of users
+
+    Runs in a worker process. Every user has its own random generator
+    seeded from (seed, user number), so output does not depend on how
+    users are split into shards or across workers.
+    """
+    first_number, count, options = task
+    shard = {'user': [], 'expense': [], 'income': [], 'budget': [], 'goals': []}
+    prefix = options['prefix']
+    for position in range(count):
+        number = first_number + position
+        rng = random.Random(options['seed'] * 1000003 + number)
+        username = f"{prefix}{number:07d}"
+        full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        joined = options['start_date'] - timedelta(days=rng.randint(1, 60))
+        shard['user'].append((username, options['password_hash'],
+                              f"{username}@example.com", full_name, stamp(rng, joined.isoformat())))
+
+        expenses, incomes, budgets, goals = generate_user(rng, position, options)
+        shard['expense'].extend(expenses)
+        shard['income'].extend(incomes)
+        shard['budget'].extend(budgets)
+        shard['goals'].extend(goals)
+    return shard
+
+
+class OracleLoadFiles:
+    """SQL*Loader data and control files matching the rows loaded into SQLite"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.files = {}
+        self.writers = {}
+        for table, (oracle_table, _) in ORACLE_TABLES.items():
+            handle = open(os.path.join(output_dir, f"{oracle_table}.csv"), 'w',
+                          newline='', encoding='utf-8')
+            self.files[table] = handle
+            self.writers[table] = csv.writer(handle, lineterminator='\n')
+
+    def write(self, table, rows):
+        """Write rows given in the SQLite column order of SQLITE_INSERTS"""
+        if table == 'expense':
+            # Direct path loads skip the BEFORE INSERT trigger that fills
+            # the fiscal period, so it is written out here
+            rows = (row[:11] + (row[12] or row[8], int(row[4][:4]), int(row[4][5:7]))
+                    for row in rows)
+        elif table == 'income':
+            rows = (row[:10] + (row[11] or row[7], int(row[4][:4]), int(row[4][5:7]))
+                    for row in rows)
+        elif table == 'budget':
+            rows = (row[:10] + (row[11] or row[7],) for row in rows)
+        elif table == 'savings_goal':
+            rows = (row[:13] + (row[14] or row[10],) for row in rows)
+        elif table == 'savings_contribution':
+            rows = (row[:6] + (1, row[7] or row[5]) for row in rows)
+        self.writers[table].writerows(rows)
+
+    def close(self):
+        """Close the data files and write one control file per table"""
+        commands = []
+        for table, (oracle_table, fields) in ORACLE_TABLES.items():
+            self.files[table].close()
+            field_list = ',\n'.join(f"    {name} {spec}".rstrip() for name, spec in fields)
+            with open(os.path.join(self.output_dir, f"{oracle_table}.ctl"), 'w',
+                      encoding='utf-8') as control:
+                control.write(
+                    "-- Generated by scripts/generate_dataset.py\n"
+                    "OPTIONS (DIRECT=TRUE, ERRORS=0)\n"
+                    "LOAD DATA\n"
+                    "CHARACTERSET UTF8\n"
+                    f"INFILE '{oracle_table}.csv'\n"
+                    "APPEND\n"
+                    f"INTO TABLE {oracle_table}\n"
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'\n"
+                    "TRAILING NULLCOLS\n"
+                    f"(\n{field_list}\n)\n"
+                )
+            commands.append(f"sqlldr finance_admin control={oracle_table}.ctl")
+        return commands
+
+
+class DatasetWriter:
+    """Bulk-loads generated shards into SQLite
+
+    Ids continue after the largest existing id of each table, rows go in
+    with executemany and a transaction is committed every `commit_rows`.
+    """
+
+    def __init__(self, conn, commit_rows, oracle_files=None):
+        self.conn = conn
+        self.commit_rows = commit_rows
+        self.oracle_files = oracle_files
+        self.pending_rows = 0
+        self.counts = {table: 0 for table in SQLITE_INSERTS}
+        self.next_ids = {}
+        for table, column in ID_COLUMNS.items():
+            self.next_ids[table] = conn.execute(
+                f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+
+    def insert(self, table, rows, sqlite_rows=None):
+        """Assign ids to rows and load them; `sqlite_rows` overrides what
+        SQLite receives while the Oracle files still get `rows`"""
+        first_id = self.next_ids[table]
+        rows = [(first_id + index,) + row for index, row in enumerate(rows)]
+        if sqlite_rows is None:
+            sqlite_rows = rows
+        else:
+            sqlite_rows = [(first_id + index,) + row for index, row in enumerate(sqlite_rows)]
+        self.conn.executemany(SQLITE_INSERTS[table], sqlite_rows)
+        if self.oracle_files is not None:
+            self.oracle_files.write(table, rows)
+        self.next_ids[table] += len(rows)
+        self.counts[table] += len(rows)
+        self.pending_rows += len(rows)
+        return first_id
+
+    def write(self, shard):
+        """Insert one shard, mapping shard positions to the assigned user ids"""
+        first_user = self.insert('user', shard['user'])
+        for table in ('expense', 'income', 'budget'):
+            self.insert(table, [(first_user + row[0],) + row[1:] for row in shard[table]])
+
+        goals = []
+        pending_goals = []
+        contributions = []
+        goal_id = self.next_ids['savings_goal']
+        for goal, goal_contributions in shard['goals']:
+            goal = (first_user + goal[0],) + goal[1:]
+            goals.append(goal)
+            if not goal[12]:
+                # Pending contributions are added to the goal by
+                # trg_update_goal_amount as they are inserted
+                goal = goal[:3] + (0,) + goal[4:7] + ('Active',) + goal[8:]
+            pending_goals.append(goal)
+            contributions.extend((goal_id,) + row for row in goal_contributions)
+            goal_id += 1
+        self.insert('savings_goal', goals, pending_goals)
+        self.insert('savings_contribution', contributions)
+
+        if self.pending_rows >= self.commit_rows:
+            self.conn.commit()
+            self.pending_rows = 0
+
+    def total_rows(self):
+        return sum(self.counts.values())
+
+
+def open_database(path, synced=False):
+    """Open the target database tuned for a bulk load
+
+    A database that does not exist yet starts as a copy of the shipped
+    finance_local.db, so it has the full schema and triggers. Unless
+    `synced`, the copied rows are marked pending like the generated ones:
+    the shipped file says they are in its own central database, which a
+    fresh central store does not have, and pushing its contributions
+    without their goals would fail the foreign key.
+    """
+    if not os.path.exists(path):
+        template = sqlite3.connect(DEFAULT_DATABASE)
+        conn = sqlite3.connect(path)
+        template.backup(conn)
+        template.close()
+        if not synced:
+            reset_sync_state(conn)
+        print(f"✓ Created {path} from {os.path.normpath(DEFAULT_DATABASE)}")
+    else:
+        conn = sqlite3.connect(path)
+
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def reset_sync_state(conn):
+    """Mark every row as never synced"""
+    # Changing sync_timestamp keeps the modified_at and row_version
+    # triggers from treating this as a local edit
+    for table in SQLITE_INSERTS:
+        if table != 'user':
+            conn.execute(f"UPDATE {table} SET is_synced = 0, sync_timestamp = NULL")
+    conn.execute("UPDATE user SET last_sync = NULL")
+    conn.commit()
+
+
+def drop_indexes(conn):
+    """Drop the secondary indexes of the loaded tables, returning their DDL
+
+    Building an index once over sorted data is much faster than keeping
+    it up to date through tens of millions of inserts.
+    """
+    tables = [table for table in SQLITE_INSERTS if table != 'user']
+    rows = conn.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL
+          AND tbl_name IN ({', '.join('?' for _ in tables)})
+    """, tables).fetchall()
+    for name, _ in rows:
+        conn.execute(f"DROP INDEX {name}")
+    return [sql for _, sql in rows]
+
+
+def user_shards(first_number, users, shard_users, options):
+    for offset in range(0, users, shard_users):
+        yield first_number + offset, min(shard_users, users - offset), options
+
+
+def generate(tasks, workers):
+    """Yield shards in user order, generating at most 2 x workers ahead"""
+    if workers <= 1:
+        for task in tasks:
+            yield generate_shard(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(generate_shard, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Generate a reproducible synthetic dataset for performance testing")
+    parser.add_argument('--users', type=int, default=100, help="number of users (default: 100)")
+    parser.add_argument('--years', type=float, default=2, help="years of history (default: 2)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument('--end-date', type=date.fromisoformat, default=date.today(),
+                        help="last day of generated history, YYYY-MM-DD (default: today)")
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help="SQLite database to load; created from the shipped one if missing")
+    parser.add_argument('--prefix', default='perf', help="username prefix (default: perf)")
+    parser.add_argument('--password', default='fs123', help="password of every generated user")
+    parser.add_argument('--synced', action='store_true',
+                        help="mark rows as already synced instead of pending")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="generator processes (default: 1)")
+    parser.add_argument('--shard-users', type=int, default=50,
+                        help="users generated per task (default: 50)")
+    parser.add_argument('--commit-rows', type=int, default=500000,
+                        help="rows per SQLite transaction (default: 500000)")
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help="drop secondary indexes during the load and rebuild them after")
+    parser.add_argument('--oracle-dir',
+                        help="also write SQL*Loader data and control files to this directory")
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    conn = open_database(database, args.synced)
+    categories = dict(conn.execute("SELECT category_name, category_id FROM category"))
+    missing = [name for name in list(DAILY_CATEGORIES) + [bill[0] for bill in MONTHLY_BILLS]
+               if name not in categories]
+    if missing:
+        print(f"✗ Categories missing from {database}: {', '.join(sorted(set(missing)))}")
+        return 1
+
+    # User numbers continue after earlier runs with the same prefix, so a
+    # run can be repeated to grow a dataset without username clashes
+    first_number = conn.execute(
+        "SELECT COUNT(*) + 1 FROM user WHERE username LIKE ?", (f"{args.prefix}%",)
+    ).fetchone()[0]
+    end_date = args.end_date
+    start_date = end_date - timedelta(days=round(365.25 * args.years) - 1)
+    options = {
+        'seed': args.seed,
+        'prefix': args.prefix,
+        'password_hash': generate_password_hash(args.password),
+        'start_date': start_date,
+        'end_date': end_date,
+        'categories': categories,
+        'synced': args.synced,
+    }
+
+    print("=" * 60)
+    print("Synthetic Dataset Generator")
+    print("=" * 60)
+    print(f"Database: {database}")
+    print(f"Users: {args.users} ({args.prefix}{first_number:07d} onwards), "
+          f"history {start_date} to {end_date}, seed {args.seed}")
+    print(f"Workers: {args.workers}, {args.commit_rows} rows per transaction")
+
+    start_time = time.monotonic()
+    oracle_files = OracleLoadFiles(args.oracle_dir) if args.oracle_dir else None
+    writer = DatasetWriter(conn, args.commit_rows, oracle_files)
+    index_sql = drop_indexes(conn) if args.defer_indexes else []
+
+    try:
+        tasks = user_shards(first_number, args.users, args.shard_users, options)
+        for shard in generate(tasks, args.workers):
+            writer.write(shard)
+            elapsed = time.monotonic() - start_time
+            print(f"  {writer.counts['user']:>8} users {writer.total_rows():>12} rows "
+                  f"{writer.total_rows() / elapsed:>10.0f} rows/s", end='\r')
+        print()
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"\n✗ Generation failed, last transaction rolled back: {e}")
+        return 1
+
+    if index_sql:
+        print(f"Rebuilding {len(index_sql)} indexes...")
+        for sql in index_sql:
+            conn.execute(sql)
+        conn.commit()
+
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    commands = oracle_files.close() if oracle_files else []
+    elapsed = time.monotonic() - start_time
+
+    print("\n" + "=" * 60)
+    print("Dataset Generation Complete!")
+    print("=" * 60)
+    for table, count in writer.counts.items():
+        print(f"{table:<22} {count:>12}")
+    print(f"{'total':<22} {writer.total_rows():>12}")
+    print(f"Elapsed: {elapsed:.1f}s ({writer.total_rows() / elapsed:.0f} rows/s)")
+    if commands:
+        print(f"\nOracle load files written to {os.path.abspath(args.oracle_dir)}")
+        print("Load them in this order (parents before children):")
+        for command in commands:
+            print(f"  {command}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,511 @@
+"""
+Workload-Driven Index Advisor for Personal Finance Manager
+Replays a captured SQLite query workload against a copy of a database,
+evaluates candidate partial and covering indexes, and writes a migration
+that creates the indexes that pay off and drops the ones nothing uses
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+from glob import glob
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(SCRIPT_DIR, '..')
+DEFAULT_DATABASE = os.path.join(ROOT_DIR, 'sqlite', 'finance_local.db')
+DEFAULT_WORKLOAD = os.path.join(ROOT_DIR, 'logs', 'slow_queries.log*')
+
+# Sync's own SQLite queries are part of every workload
+sys.path.append(os.path.join(ROOT_DIR, 'synchronization'))
+
+# Parameter sets replayed per distinct statement
+SAMPLES_PER_STATEMENT = 5
+
+# Most columns a covering index candidate may have
+MAX_INDEX_COLUMNS = 6
+
+IDENTIFIER = r'[A-Za-z_]\w*'
+COLUMN = rf'(?:({IDENTIFIER})\.)?({IDENTIFIER})'
+VALUE = r"(\?|'(?:[^']|'')*'|-?\d+(?:\.\d+)?)"
+KEYWORDS = {
+    'WHERE', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'GROUP', 'ORDER',
+    'LIMIT', 'USING', 'SET', 'AND', 'OR', 'NOT', 'AS', 'UNION', 'HAVING', 'VALUES', 'SELECT',
+}
+
+TABLE_PATTERN = re.compile(
+    rf'\b(?:FROM|JOIN|UPDATE|INTO)\s+({IDENTIFIER})(?:\s+(?:AS\s+)?({IDENTIFIER}))?', re.I)
+EQUALITY_PATTERN = re.compile(rf'(?<![\w.]){COLUMN}\s*=\s*{VALUE}')
+JOIN_PATTERN = re.compile(rf'(?<![\w.]){COLUMN}\s*=\s*{COLUMN}(?![\w(])')
+RANGE_PATTERN = re.compile(rf'(?<![\w.]){COLUMN}\s*(?:>=|<=|>|<|\s+BETWEEN\b)', re.I)
+EXPRESSION_PATTERN = re.compile(
+    rf"strftime\(\s*('[^']*')\s*,\s*{COLUMN}\s*\)\s*=\s*\?", re.I)
+NOT_DELETED_PATTERN = re.compile(
+    rf'\(\s*{COLUMN}\s*=\s*0\s+OR\s+(?:{IDENTIFIER}\.)?\2\s+IS\s+NULL\s*\)', re.I)
+ORDER_BY_PATTERN = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\)|$)', re.I | re.S)
+STAR_PATTERN = re.compile(rf'\bSELECT\s+(?:DISTINCT\s+)?\*|(?<![\w.])({IDENTIFIER})\.\*', re.I)
+INDEX_USE_PATTERN = re.compile(r'\bUSING (?:COVERING )?INDEX (\w+)')
+
+# Literal-equality columns that make good partial index conditions, and
+# the name suffix of each condition
+PARTIAL_COLUMNS = {'is_synced', 'is_active', 'status'}
+CONDITION_TAGS = [
+    ('is_synced = 0', 'pending'),
+    ('is_active = 1', 'active'),
+    ("status = 'Active'", 'active'),
+    ('is_deleted = 0', 'live'),
+]
+
+
+def load_workload(patterns):
+    """Distinct statements of the slow query logs with counts and samples"""
+    statements = {}
+    for pattern in patterns:
+        for path in sorted(glob(pattern)):
+            with open(path, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    # Without log_parameters the values are not logged,
+                    # and a statement with placeholders cannot be replayed
+                    if 'statement' not in entry or (
+                            'parameters' not in entry and entry.get('parameter_types')):
+                        continue
+                    item = statements.setdefault(entry['statement'], {
+                        'statement': entry['statement'], 'count': 0, 'samples': [],
+                    })
+                    item['count'] += 1
+                    parameters = entry.get('parameters') or []
+                    if (len(item['samples']) < SAMPLES_PER_STATEMENT
+                            and parameters not in item['samples']):
+                        item['samples'].append(parameters)
+    return list(statements.values())
+
+
+def sync_workload(batch_size):
+    """The keyset-paged pending-row queries every sync run starts with"""
+    from sync_manager import CONTRIBUTION_STREAM, SYNC_ENTITIES, paged_pending_sql
+
+    streams = [(entity['sqlite_select'], entity['key']) for entity in SYNC_ENTITIES]
+    streams.append((CONTRIBUTION_STREAM['sqlite_select'], 'contribution_id'))
+    return [
+        {
+            'statement': ' '.join(paged_pending_sql(select_sql, key).split()),
+            'count': 1,
+            'samples': [[0, batch_size]],
+        }
+        for select_sql, key in streams
+    ]
+
+
+class Schema:
+    """Tables, columns and secondary indexes of the database under test"""
+
+    def __init__(self, conn):
+        self.columns = {}
+        self.primary_keys = {}
+        for (table,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%'"):
+            info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            self.columns[table] = [row[1] for row in info]
+            self.primary_keys[table] = {row[1] for row in info if row[5]}
+        self.indexes = dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+
+    def table_of(self, alias, column, aliases):
+        """Table a possibly qualified column belongs to, or None"""
+        if alias:
+            table = aliases.get(alias.lower())
+            return table if table and column in self.columns[table] else None
+        owners = {table for table in aliases.values() if column in self.columns[table]}
+        return owners.pop() if len(owners) == 1 else None
+
+
+class Candidate:
+    """A possible index: table, key columns, included columns, condition"""
+
+    def __init__(self, table, keys, where=None, included=()):
+        self.table = table
+        self.keys = list(keys)
+        self.included = list(included)
+        self.where = where
+        self.items = []
+        self.gain_ms = 0.0
+        self.statements = 0
+
+    @property
+    def name(self):
+        """Name in the style of the schema's own indexes: idx_expense_user_date"""
+        parts = []
+        for key in self.keys:
+            if key.startswith('strftime('):
+                parts.append('month')
+            else:
+                short = key[len(self.table) + 1:] if key.startswith(self.table + '_') else key
+                parts.append(short[:-3] if short.endswith('_id') else short)
+        if self.included:
+            parts.append('cov')
+        if self.where:
+            parts += [tag for term, tag in CONDITION_TAGS if term in self.where] or ['where']
+        return f"idx_{self.table}_{'_'.join(parts)}"
+
+    @property
+    def sql(self):
+        columns = ', '.join(self.keys + self.included)
+        sql = f"CREATE INDEX {self.name} ON {self.table}({columns})"
+        return f"{sql} WHERE {self.where}" if self.where else sql
+
+
+def statement_tables(statement, schema):
+    """alias -> table of every table a statement reads or writes"""
+    aliases = {}
+    for table, alias in TABLE_PATTERN.findall(statement):
+        if table not in schema.columns:
+            continue
+        aliases[table.lower()] = table
+        if alias and alias.upper() not in KEYWORDS:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def blank(pattern, text):
+    """Text with the matches of a pattern blanked out, positions kept"""
+    return pattern.sub(lambda match: ' ' * len(match.group(0)), text)
+
+
+def candidates_for(statement, schema):
+    """Index candidates suggested by the predicates of one statement
+
+    Per table: equality columns and strftime() expressions in statement
+    order, then a range column or the ORDER BY columns. Literal tests of
+    flag columns and the not-deleted test become partial index
+    conditions. Each key also gets a covering variant holding every
+    column of the table the statement touches, and a variant led by each
+    join column, which is how the inner side of a join is searched.
+    """
+    aliases = statement_tables(statement, schema)
+    if not aliases:
+        return []
+
+    found = {table: {'equal': [], 'range': [], 'order': [], 'join': [], 'where': [],
+                     'referenced': set()}
+             for table in set(aliases.values())}
+
+    def add(kind, alias, column, value='?'):
+        table = schema.table_of(alias, column, aliases)
+        if table is None:
+            return
+        if kind == 'equal' and value != '?' and column in PARTIAL_COLUMNS:
+            kind, column = 'where', f"{column} = {value}"
+        if column not in found[table][kind]:
+            found[table][kind].append(column)
+
+    for match in NOT_DELETED_PATTERN.finditer(statement):
+        table = schema.table_of(match.group(1), match.group(2), aliases)
+        condition = f"({match.group(2)} = 0 OR {match.group(2)} IS NULL)"
+        if table and condition not in found[table]['where']:
+            found[table]['where'].append(condition)
+
+    predicates = blank(NOT_DELETED_PATTERN, statement)
+    for match in JOIN_PATTERN.finditer(predicates):
+        add('join', match.group(1), match.group(2))
+        add('join', match.group(3), match.group(4))
+    predicates = blank(JOIN_PATTERN, predicates)
+
+    # Equality terms keep the order the statement lists them in
+    equalities = [(match.start(), match.group(2), match.group(3),
+                   f"strftime({match.group(1)}, {match.group(3)})")
+                  for match in EXPRESSION_PATTERN.finditer(predicates)]
+    predicates = blank(EXPRESSION_PATTERN, predicates)
+    equalities += [(match.start(), match.group(1), match.group(2), match.group(3))
+                   for match in EQUALITY_PATTERN.finditer(predicates)]
+    for _, alias, column, value in sorted(equalities):
+        if value.startswith('strftime('):
+            table = schema.table_of(alias, column, aliases)
+            if table and value not in found[table]['equal']:
+                found[table]['equal'].append(value)
+                found[table]['referenced'].add(column)
+        else:
+            add('equal', alias, column, value)
+    for alias, column in RANGE_PATTERN.findall(predicates):
+        add('range', alias, column)
+    order_by = ORDER_BY_PATTERN.search(statement)
+    if order_by:
+        for term in order_by.group(1).split(','):
+            match = re.match(rf'\s*{COLUMN}', term)
+            if match:
+                add('order', match.group(1), match.group(2))
+
+    starred = set()
+    for match in STAR_PATTERN.finditer(statement):
+        if match.group(1):
+            starred.add(aliases.get(match.group(1).lower()))
+        elif len(set(aliases.values())) == 1:
+            starred.update(aliases.values())
+    for match in re.finditer(COLUMN, statement):
+        table = schema.table_of(match.group(1), match.group(2), aliases)
+        if table:
+            found[table]['referenced'].add(match.group(2))
+
+    candidates = []
+    for table, terms in found.items():
+        primary_key = list(schema.primary_keys[table])
+        candidates += [Candidate(table, [column]) for column in terms['join']
+                       if column not in primary_key]
+
+        keys = [column for column in terms['equal'] if column not in primary_key]
+        tail = terms['range'][:1] or terms['order']
+        keys += [column for column in tail if column not in keys and column not in primary_key]
+        if not keys:
+            continue
+
+        where = ' AND '.join(terms['where']) or None
+        conditions = [None, where] if where else [None]
+        candidates += [Candidate(table, keys, condition) for condition in conditions]
+        candidates += [Candidate(table, [column] + keys, condition)
+                       for column in terms['join'] if column not in primary_key + keys
+                       for condition in conditions]
+        if table not in starred:
+            condition_columns = {column for column in terms['referenced']
+                                 if where and column in where}
+            extra = sorted(terms['referenced'] - set(keys + primary_key) - condition_columns)
+            if extra and len(keys) + len(extra) <= MAX_INDEX_COLUMNS:
+                candidates += [Candidate(table, keys, condition, extra)
+                               for condition in conditions]
+    return candidates
+
+
+class Replayer:
+    """Times workload statements on a scratch copy of the database"""
+
+    def __init__(self, path, repeat):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.repeat = repeat
+
+    def run_once(self, item):
+        statement = item['statement']
+        is_write = not statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+        start = time.perf_counter()
+        for parameters in item['samples']:
+            if is_write:
+                self.conn.execute("SAVEPOINT replay")
+            try:
+                self.conn.execute(statement, parameters).fetchall()
+            finally:
+                if is_write:
+                    self.conn.execute("ROLLBACK TO replay")
+                    self.conn.execute("RELEASE replay")
+        return (time.perf_counter() - start) / len(item['samples'])
+
+    def time(self, item):
+        """Fastest of `repeat` runs, in ms per execution"""
+        return min(self.run_once(item) for _ in range(self.repeat)) * 1000
+
+    def indexes_used(self, item):
+        try:
+            plan = self.conn.execute(f"EXPLAIN QUERY PLAN {item['statement']}",
+                                     item['samples'][0]).fetchall()
+        except sqlite3.Error:
+            return set()
+        return {name for row in plan for name in INDEX_USE_PATTERN.findall(row[3])}
+
+
+def advise(replayer, workload, schema, min_gain):
+    """Greedily pick the candidates that cut the workload's time the most
+
+    Each round tries every remaining candidate on the statements of its
+    table, writes included, and keeps the best one if the planner uses it
+    and it saves at least `min_gain` of those statements' time. Counts
+    weight the times, so frequent statements matter most. Indexes a
+    later pick made redundant are dropped again at the end.
+    """
+    costs = {item['statement']: replayer.time(item) for item in workload}
+    candidates = {}
+    for item in workload:
+        for candidate in candidates_for(item['statement'], schema):
+            if candidate.name not in schema.indexes:
+                candidates.setdefault(candidate.name, candidate)
+    for candidate in candidates.values():
+        candidate.items = [item for item in workload
+                           if candidate.table in statement_tables(item['statement'],
+                                                                  schema).values()]
+
+    chosen = []
+    while candidates:
+        best = None
+        for candidate in candidates.values():
+            before = sum(costs[item['statement']] * item['count'] for item in candidate.items)
+            replayer.conn.execute(candidate.sql)
+            try:
+                users = [item for item in candidate.items
+                         if candidate.name in replayer.indexes_used(item)]
+                after = {item['statement']: replayer.time(item) for item in candidate.items}
+            finally:
+                replayer.conn.execute(f"DROP INDEX {candidate.name}")
+            gain = sum((costs[item['statement']] - after[item['statement']]) * item['count']
+                       for item in candidate.items)
+            if users and gain > before * min_gain and (best is None or gain > best[1]):
+                best = (candidate, gain, after, len(users))
+        if best is None:
+            break
+
+        candidate, gain, after, statements = best
+        replayer.conn.execute(candidate.sql)
+        replayer.conn.execute("ANALYZE")
+        costs = {item['statement']: replayer.time(item) for item in workload}
+        candidate.gain_ms = gain
+        candidate.statements = statements
+        chosen.append(candidate)
+        del candidates[candidate.name]
+        print(f"  + {candidate.name:<48} saves {gain:>9.3f} ms per workload run")
+
+    used = set()
+    for item in workload:
+        used |= replayer.indexes_used(item)
+    for candidate in [candidate for candidate in chosen if candidate.name not in used]:
+        replayer.conn.execute(f"DROP INDEX {candidate.name}")
+        chosen.remove(candidate)
+        print(f"  ~ {candidate.name:<48} superseded by a later pick")
+    return chosen
+
+
+def unused_indexes(replayer, workload, schema, keep):
+    """Existing secondary indexes no workload statement's plan uses"""
+    used = set()
+    for item in workload:
+        used |= replayer.indexes_used(item)
+    return sorted(name for name in schema.indexes if name not in used and name not in keep)
+
+
+def write_migration(path, chosen, dropped, workload, before_ms, after_ms):
+    executions = sum(item['count'] for item in workload)
+    lines = [
+        "-- ========================================",
+        "-- WORKLOAD INDEXES - SQLITE",
+        f"-- Generated by scripts/index_advisor.py on {date.today()} from",
+        f"-- {len(workload)} statements ({executions} executions): "
+        f"{before_ms:.1f} ms -> {after_ms:.1f} ms per workload run",
+        "-- ========================================",
+        "",
+    ]
+    if chosen:
+        lines += [
+            "-- ========================================",
+            "-- CREATE INDEXES",
+            "-- ========================================",
+            "",
+        ]
+        for candidate in chosen:
+            lines.append(f"-- Used by {candidate.statements} statements, "
+                         f"saves {candidate.gain_ms:.2f} ms per workload run")
+            lines.append(candidate.sql.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS') + ';')
+            lines.append("")
+    if dropped:
+        lines += [
+            "-- ========================================",
+            "-- DROP UNUSED INDEXES",
+            "-- ========================================",
+            "",
+            "-- No statement of the workload uses these; each costs a write per",
+            "-- insert, update and delete of its table",
+        ]
+        lines += [f"DROP INDEX IF EXISTS {name};" for name in dropped]
+        lines.append("")
+    lines += ["-- Refresh planner statistics for the new indexes", "ANALYZE;", ""]
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write('\n'.join(lines))
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Suggest SQLite indexes from a captured query workload")
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help="database to evaluate against; only a copy is modified")
+    parser.add_argument('--workload', nargs='+', default=[DEFAULT_WORKLOAD],
+                        help="slow query log files or glob patterns "
+                             "(default: logs/slow_queries.log*)")
+    parser.add_argument('--output', help="migration file to write")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per statement, fastest kept (default: 5)")
+    parser.add_argument('--min-gain', type=float, default=0.1,
+                        help="least share of its statements' time an index must save "
+                             "(default: 0.1)")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="sync batch size used for the pending-row queries (default: 100)")
+    parser.add_argument('--keep', nargs='*', default=[],
+                        help="indexes never dropped, e.g. ones used outside the workload")
+    args = parser.parse_args()
+
+    captured = load_workload(args.workload)
+    if not captured:
+        print("✗ No statements in the workload. Record one with threshold_ms = 0 and "
+              "log_parameters = true under [slow_queries] and use the app.")
+        return 1
+    workload = captured + sync_workload(args.batch_size)
+
+    print("=" * 60)
+    print("Index Advisor")
+    print("=" * 60)
+    print(f"Database: {os.path.abspath(args.database)}")
+    print(f"Workload: {len(captured)} captured statements "
+          f"({sum(item['count'] for item in captured)} executions) + sync queries")
+
+    scratch_dir = tempfile.mkdtemp(prefix='index_advisor_')
+    try:
+        scratch = os.path.join(scratch_dir, 'advisor.db')
+        source = sqlite3.connect(args.database)
+        target = sqlite3.connect(scratch)
+        source.backup(target)
+        source.close()
+        target.close()
+
+        replayer = Replayer(scratch, args.repeat)
+        replayer.conn.execute("ANALYZE")
+        schema = Schema(replayer.conn)
+
+        baseline = {item['statement']: replayer.time(item) for item in workload}
+        before_ms = sum(baseline[item['statement']] * item['count'] for item in workload)
+
+        print("\nCandidate indexes:")
+        chosen = advise(replayer, workload, schema, args.min_gain)
+        if not chosen:
+            print("  (none pays off)")
+
+        dropped = unused_indexes(replayer, workload, schema, set(args.keep))
+        for name in dropped:
+            replayer.conn.execute(f"DROP INDEX {name}")
+            print(f"  - {name:<48} unused")
+        replayer.conn.execute("ANALYZE")
+
+        costs = {item['statement']: replayer.time(item) for item in workload}
+        after_ms = sum(costs[item['statement']] * item['count'] for item in workload)
+        replayer.conn.close()
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    print(f"\nWorkload: {before_ms:.1f} ms -> {after_ms:.1f} ms per run")
+    print("Slowest statements after:")
+    for item in sorted(workload, key=lambda item: costs[item['statement']] * item['count'],
+                       reverse=True)[:5]:
+        print(f"  {baseline[item['statement']]:>8.3f} -> {costs[item['statement']]:>8.3f} ms"
+              f" x{item['count']:<5} {item['statement'][:70]}")
+
+    if args.output:
+        write_migration(args.output, chosen, dropped, workload, before_ms, after_ms)
+        print(f"\n✓ Migration written to {args.output}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,145 @@
+-- ========================================
+-- BIDIRECTIONAL SYNC SUPPORT - SQLITE
+-- Lets the sync pull phase write Oracle rows into SQLite
+-- without the local triggers treating them as user edits
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- ADD sync_timestamp COLUMN TO TABLES
+-- ========================================
+
+-- expense and income already carry sync_timestamp; budgets and
+-- goals need it so every synced table can be stamped the same way
+
+-- BUDGET Table
+ALTER TABLE budget ADD COLUMN sync_timestamp TEXT;
+
+-- SAVINGS_GOAL Table
+ALTER TABLE savings_goal ADD COLUMN sync_timestamp TEXT;
+
+-- ========================================
+-- RECREATE TRIGGERS
+-- ========================================
+
+-- Writes made by the sync engine always stamp sync_timestamp.
+-- Those writes must keep the modified_at and is_synced values they
+-- carry, otherwise a pulled row would look like a fresh local edit
+-- and last-writer-wins on modified_at would stop working.
+
+DROP TRIGGER IF EXISTS trg_expense_modified_at;
+DROP TRIGGER IF EXISTS trg_income_modified_at;
+DROP TRIGGER IF EXISTS trg_budget_modified_at;
+DROP TRIGGER IF EXISTS trg_goal_modified_at;
+DROP TRIGGER IF EXISTS trg_expense_reset_sync;
+DROP TRIGGER IF EXISTS trg_income_reset_sync;
+DROP TRIGGER IF EXISTS trg_budget_reset_sync;
+DROP TRIGGER IF EXISTS trg_goal_reset_sync;
+
+-- Trigger: Auto-update modified_at for EXPENSE
+CREATE TRIGGER trg_expense_modified_at
+AFTER UPDATE ON expense
+FOR EACH ROW
+WHEN NEW.modified_at = OLD.modified_at
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE expense SET modified_at = datetime('now', 'localtime')
+    WHERE expense_id = NEW.expense_id;
+END;
+
+-- Trigger: Auto-update modified_at for INCOME
+CREATE TRIGGER trg_income_modified_at
+AFTER UPDATE ON income
+FOR EACH ROW
+WHEN NEW.modified_at = OLD.modified_at
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE income SET modified_at = datetime('now', 'localtime')
+    WHERE income_id = NEW.income_id;
+END;
+
+-- Trigger: Auto-update modified_at for BUDGET
+CREATE TRIGGER trg_budget_modified_at
+AFTER UPDATE ON budget
+FOR EACH ROW
+WHEN NEW.modified_at = OLD.modified_at
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE budget SET modified_at = datetime('now', 'localtime')
+    WHERE budget_id = NEW.budget_id;
+END;
+
+-- Trigger: Auto-update modified_at for SAVINGS_GOAL
+CREATE TRIGGER trg_goal_modified_at
+AFTER UPDATE ON savings_goal
+FOR EACH ROW
+WHEN NEW.modified_at = OLD.modified_at
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE savings_goal SET modified_at = datetime('now', 'localtime')
+    WHERE goal_id = NEW.goal_id;
+END;
+
+-- Trigger: Reset sync status on EXPENSE modification
+CREATE TRIGGER trg_expense_reset_sync
+AFTER UPDATE ON expense
+FOR EACH ROW
+WHEN (OLD.amount != NEW.amount
+   OR OLD.category_id != NEW.category_id
+   OR OLD.expense_date != NEW.expense_date
+   OR OLD.description != NEW.description)
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE expense SET is_synced = 0
+    WHERE expense_id = NEW.expense_id;
+END;
+
+-- Trigger: Reset sync status on INCOME modification
+CREATE TRIGGER trg_income_reset_sync
+AFTER UPDATE ON income
+FOR EACH ROW
+WHEN (OLD.amount != NEW.amount
+   OR OLD.income_source != NEW.income_source
+   OR OLD.income_date != NEW.income_date)
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE income SET is_synced = 0
+    WHERE income_id = NEW.income_id;
+END;
+
+-- Trigger: Reset sync status on BUDGET modification
+CREATE TRIGGER trg_budget_reset_sync
+AFTER UPDATE ON budget
+FOR EACH ROW
+WHEN (OLD.budget_amount != NEW.budget_amount
+   OR OLD.start_date != NEW.start_date
+   OR OLD.end_date != NEW.end_date)
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE budget SET is_synced = 0
+    WHERE budget_id = NEW.budget_id;
+END;
+
+-- Trigger: Reset sync status on SAVINGS_GOAL modification
+CREATE TRIGGER trg_goal_reset_sync
+AFTER UPDATE ON savings_goal
+FOR EACH ROW
+WHEN (OLD.target_amount != NEW.target_amount
+   OR OLD.current_amount != NEW.current_amount
+   OR OLD.deadline != NEW.deadline)
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+BEGIN
+    UPDATE savings_goal SET is_synced = 0
+    WHERE goal_id = NEW.goal_id;
+END;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+PRAGMA table_info(budget);
+PRAGMA table_info(savings_goal);
+
+SELECT 'Bidirectional sync schema applied' AS status;
@@ -0,0 +1,118 @@
+-- ========================================
+-- ROW VERSIONS - SQLITE
+-- Monotonic row_version on every synced table so sync can skip
+-- unchanged rows and detect real conflicts cheaply
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- ADD row_version COLUMN TO TABLES
+-- ========================================
+
+-- EXPENSE Table
+ALTER TABLE expense ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+
+-- INCOME Table
+ALTER TABLE income ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+
+-- BUDGET Table
+ALTER TABLE budget ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+
+-- SAVINGS_GOAL Table
+ALTER TABLE savings_goal ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1;
+
+-- ========================================
+-- CREATE TRIGGERS
+-- ========================================
+
+-- A local edit bumps row_version. Writes from the sync engine carry
+-- the version of the copy they apply (and stamp sync_timestamp), so
+-- they are left alone.
+
+DROP TRIGGER IF EXISTS trg_expense_row_version;
+DROP TRIGGER IF EXISTS trg_income_row_version;
+DROP TRIGGER IF EXISTS trg_budget_row_version;
+DROP TRIGGER IF EXISTS trg_goal_row_version;
+
+-- Trigger: Bump row_version on EXPENSE modification
+CREATE TRIGGER trg_expense_row_version
+AFTER UPDATE ON expense
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+ AND (OLD.amount IS NOT NEW.amount
+   OR OLD.category_id IS NOT NEW.category_id
+   OR OLD.expense_date IS NOT NEW.expense_date
+   OR OLD.description IS NOT NEW.description
+   OR OLD.payment_method IS NOT NEW.payment_method
+   OR OLD.is_deleted IS NOT NEW.is_deleted)
+BEGIN
+    UPDATE expense SET row_version = OLD.row_version + 1
+    WHERE expense_id = NEW.expense_id;
+END;
+
+-- Trigger: Bump row_version on INCOME modification
+CREATE TRIGGER trg_income_row_version
+AFTER UPDATE ON income
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+ AND (OLD.amount IS NOT NEW.amount
+   OR OLD.income_source IS NOT NEW.income_source
+   OR OLD.income_date IS NOT NEW.income_date
+   OR OLD.description IS NOT NEW.description
+   OR OLD.is_deleted IS NOT NEW.is_deleted)
+BEGIN
+    UPDATE income SET row_version = OLD.row_version + 1
+    WHERE income_id = NEW.income_id;
+END;
+
+-- Trigger: Bump row_version on BUDGET modification
+CREATE TRIGGER trg_budget_row_version
+AFTER UPDATE ON budget
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+ AND (OLD.budget_amount IS NOT NEW.budget_amount
+   OR OLD.category_id IS NOT NEW.category_id
+   OR OLD.start_date IS NOT NEW.start_date
+   OR OLD.end_date IS NOT NEW.end_date
+   OR OLD.is_active IS NOT NEW.is_active
+   OR OLD.is_deleted IS NOT NEW.is_deleted)
+BEGIN
+    UPDATE budget SET row_version = OLD.row_version + 1
+    WHERE budget_id = NEW.budget_id;
+END;
+
+-- Trigger: Bump row_version on SAVINGS_GOAL modification
+CREATE TRIGGER trg_goal_row_version
+AFTER UPDATE ON savings_goal
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version
+ AND NEW.sync_timestamp IS OLD.sync_timestamp
+ AND (OLD.goal_name IS NOT NEW.goal_name
+   OR OLD.target_amount IS NOT NEW.target_amount
+   OR OLD.current_amount IS NOT NEW.current_amount
+   OR OLD.start_date IS NOT NEW.start_date
+   OR OLD.deadline IS NOT NEW.deadline
+   OR OLD.priority IS NOT NEW.priority
+   OR OLD.status IS NOT NEW.status
+   OR OLD.is_deleted IS NOT NEW.is_deleted)
+BEGIN
+    UPDATE savings_goal SET row_version = OLD.row_version + 1
+    WHERE goal_id = NEW.goal_id;
+END;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT 'expense' AS table_name, MIN(row_version), MAX(row_version) FROM expense
+UNION ALL
+SELECT 'income', MIN(row_version), MAX(row_version) FROM income
+UNION ALL
+SELECT 'budget', MIN(row_version), MAX(row_version) FROM budget
+UNION ALL
+SELECT 'savings_goal', MIN(row_version), MAX(row_version) FROM savings_goal;
@@ -0,0 +1,55 @@
+-- ========================================
+-- SAVINGS CONTRIBUTION SYNC - SQLITE
+-- Track sync state of contributions and stop pulled contributions
+-- from being added to the goal total a second time
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- ADD SYNC COLUMNS TO savings_contribution
+-- ========================================
+
+ALTER TABLE savings_contribution ADD COLUMN is_synced INTEGER NOT NULL DEFAULT 0 CHECK (is_synced IN (0, 1));
+
+ALTER TABLE savings_contribution ADD COLUMN sync_timestamp TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_contribution_synced ON savings_contribution(is_synced);
+
+-- ========================================
+-- RECREATE GOAL AMOUNT TRIGGER
+-- ========================================
+
+-- Contributions pulled from Oracle arrive with is_synced = 1 after their
+-- goal, whose current_amount already includes them.
+
+DROP TRIGGER IF EXISTS trg_update_goal_amount;
+
+-- Trigger: Auto-update savings goal amount and status
+CREATE TRIGGER trg_update_goal_amount
+AFTER INSERT ON savings_contribution
+FOR EACH ROW
+WHEN NEW.is_synced = 0
+BEGIN
+    -- Update current amount
+    UPDATE savings_goal
+    SET current_amount = current_amount + NEW.contribution_amount,
+        modified_at = datetime('now', 'localtime')
+    WHERE goal_id = NEW.goal_id;
+
+    -- Auto-complete goal if target reached
+    UPDATE savings_goal
+    SET status = 'Completed'
+    WHERE goal_id = NEW.goal_id
+    AND current_amount >= target_amount
+    AND status = 'Active';
+END;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+PRAGMA table_info(savings_contribution);
+
+SELECT COUNT(*) AS pending_contributions FROM savings_contribution WHERE is_synced = 0;
@@ -0,0 +1,42 @@
+-- ========================================
+-- OFFLINE SYNC BUNDLES - SQLITE
+-- Export and apply logs for changeset bundle files
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- CREATE TABLES
+-- ========================================
+
+-- SYNC_BUNDLE_EXPORT Table
+-- One row per bundle written by this device. sequence_no orders the
+-- bundles of a device and is never reused.
+CREATE TABLE IF NOT EXISTS sync_bundle_export (
+    sequence_no INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_name TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- SYNC_BUNDLE_APPLIED Table
+-- Bundles applied to this database when it is the receiving side.
+-- The primary key makes applying the same bundle twice a no-op.
+CREATE TABLE IF NOT EXISTS sync_bundle_applied (
+    source_name TEXT NOT NULL,
+    sequence_no INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    applied_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (source_name, sequence_no)
+);
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT name FROM sqlite_master
+WHERE type = 'table' AND name IN ('sync_bundle_export', 'sync_bundle_applied');
@@ -0,0 +1,53 @@
+-- ========================================
+-- SYNC METRICS - SQLITE
+-- Per-run counters on sync_log and per-phase timings in sync_phase
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- EXTEND SYNC_LOG TABLE
+-- ========================================
+
+ALTER TABLE sync_log ADD COLUMN duration_seconds REAL;
+
+ALTER TABLE sync_log ADD COLUMN round_trips INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE sync_log ADD COLUMN bytes_fetched INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE sync_log ADD COLUMN failed_rows INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE sync_log ADD COLUMN retry_count INTEGER NOT NULL DEFAULT 0;
+
+-- sync_log_id of the same run in Oracle's finance_sync_log
+ALTER TABLE sync_log ADD COLUMN oracle_sync_log_id INTEGER;
+
+-- ========================================
+-- CREATE SYNC_PHASE TABLE
+-- ========================================
+
+-- SYNC_PHASE Table
+-- One row per phase of a sync run (connect, users, pull, each entity, commit)
+CREATE TABLE IF NOT EXISTS sync_phase (
+    sync_log_id INTEGER NOT NULL,
+    phase_order INTEGER NOT NULL,
+    phase_name TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    round_trips INTEGER NOT NULL DEFAULT 0,
+    bytes_fetched INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sync_log_id, phase_order),
+    FOREIGN KEY (sync_log_id) REFERENCES sync_log(sync_log_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_phase_name ON sync_phase(phase_name);
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+PRAGMA table_info(sync_log);
+
+PRAGMA table_info(sync_phase);
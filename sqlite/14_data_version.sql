@@ -0,0 +1,248 @@
+-- ========================================
+-- DATA VERSION - SQLITE
+-- Per-user counter bumped by every write to the user's rows and by
+-- every sync run, so the web app can answer repeat requests with
+-- 304 Not Modified instead of recomputing them
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- CREATE USER_DATA_VERSION TABLE
+-- ========================================
+
+-- USER_DATA_VERSION Table
+-- Only ever increases; a user without a row is at version 0
+CREATE TABLE IF NOT EXISTS user_data_version (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+);
+
+-- ========================================
+-- CREATE TRIGGERS
+-- ========================================
+
+-- Local edits and writes from the sync engine alike bump the version.
+-- Soft deletes are updates; hard deletes are caught as well.
+
+DROP TRIGGER IF EXISTS trg_expense_data_version_ai;
+DROP TRIGGER IF EXISTS trg_expense_data_version_au;
+DROP TRIGGER IF EXISTS trg_expense_data_version_ad;
+DROP TRIGGER IF EXISTS trg_income_data_version_ai;
+DROP TRIGGER IF EXISTS trg_income_data_version_au;
+DROP TRIGGER IF EXISTS trg_income_data_version_ad;
+DROP TRIGGER IF EXISTS trg_budget_data_version_ai;
+DROP TRIGGER IF EXISTS trg_budget_data_version_au;
+DROP TRIGGER IF EXISTS trg_budget_data_version_ad;
+DROP TRIGGER IF EXISTS trg_goal_data_version_ai;
+DROP TRIGGER IF EXISTS trg_goal_data_version_au;
+DROP TRIGGER IF EXISTS trg_goal_data_version_ad;
+DROP TRIGGER IF EXISTS trg_contribution_data_version_ai;
+DROP TRIGGER IF EXISTS trg_contribution_data_version_au;
+DROP TRIGGER IF EXISTS trg_contribution_data_version_ad;
+DROP TRIGGER IF EXISTS trg_user_data_version_ai;
+DROP TRIGGER IF EXISTS trg_user_data_version_au;
+DROP TRIGGER IF EXISTS trg_sync_log_data_version_ai;
+DROP TRIGGER IF EXISTS trg_sync_log_data_version_au;
+DROP TRIGGER IF EXISTS trg_category_data_version_ai;
+DROP TRIGGER IF EXISTS trg_category_data_version_au;
+DROP TRIGGER IF EXISTS trg_category_data_version_ad;
+
+-- EXPENSE
+CREATE TRIGGER trg_expense_data_version_ai
+AFTER INSERT ON expense
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_expense_data_version_au
+AFTER UPDATE ON expense
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_expense_data_version_ad
+AFTER DELETE ON expense
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1 WHERE user_id = OLD.user_id;
+END;
+
+-- INCOME
+CREATE TRIGGER trg_income_data_version_ai
+AFTER INSERT ON income
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_income_data_version_au
+AFTER UPDATE ON income
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_income_data_version_ad
+AFTER DELETE ON income
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1 WHERE user_id = OLD.user_id;
+END;
+
+-- BUDGET
+CREATE TRIGGER trg_budget_data_version_ai
+AFTER INSERT ON budget
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_budget_data_version_au
+AFTER UPDATE ON budget
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_budget_data_version_ad
+AFTER DELETE ON budget
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1 WHERE user_id = OLD.user_id;
+END;
+
+-- SAVINGS_GOAL
+CREATE TRIGGER trg_goal_data_version_ai
+AFTER INSERT ON savings_goal
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_goal_data_version_au
+AFTER UPDATE ON savings_goal
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_goal_data_version_ad
+AFTER DELETE ON savings_goal
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1 WHERE user_id = OLD.user_id;
+END;
+
+-- SAVINGS_CONTRIBUTION (owned through its goal)
+CREATE TRIGGER trg_contribution_data_version_ai
+AFTER INSERT ON savings_contribution
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version)
+    SELECT user_id, 1 FROM savings_goal WHERE goal_id = NEW.goal_id
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_contribution_data_version_au
+AFTER UPDATE ON savings_contribution
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1
+    WHERE user_id IN (SELECT user_id FROM savings_goal WHERE goal_id IN (OLD.goal_id, NEW.goal_id));
+END;
+
+CREATE TRIGGER trg_contribution_data_version_ad
+AFTER DELETE ON savings_contribution
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1
+    WHERE user_id = (SELECT user_id FROM savings_goal WHERE goal_id = OLD.goal_id);
+END;
+
+-- USER (new users get their row at once, so category changes, which
+-- only bump existing rows, reach them too; then profile changes and
+-- last_sync)
+CREATE TRIGGER trg_user_data_version_ai
+AFTER INSERT ON user
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_user_data_version_au
+AFTER UPDATE ON user
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- SYNC_LOG (every sync run ends with a log row, even one that changed nothing)
+CREATE TRIGGER trg_sync_log_data_version_ai
+AFTER INSERT ON sync_log
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_sync_log_data_version_au
+AFTER UPDATE ON sync_log
+FOR EACH ROW
+BEGIN
+    INSERT INTO user_data_version (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- CATEGORY (shared by every user, so every version moves)
+CREATE TRIGGER trg_category_data_version_ai
+AFTER INSERT ON category
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_category_data_version_au
+AFTER UPDATE ON category
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_category_data_version_ad
+AFTER DELETE ON category
+FOR EACH ROW
+BEGIN
+    UPDATE user_data_version SET version = version + 1;
+END;
+
+-- ========================================
+-- SEED EXISTING USERS
+-- ========================================
+
+INSERT OR IGNORE INTO user_data_version (user_id, version)
+SELECT user_id, 1 FROM user;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT name FROM sqlite_master
+WHERE type = 'trigger' AND name LIKE '%data_version%'
+ORDER BY name;
+
+SELECT * FROM user_data_version;
@@ -0,0 +1,59 @@
+-- ========================================
+-- CATEGORY CATALOG VERSION - SQLITE
+-- Single-row counter bumped by every change to the category table, so
+-- the web app can keep the catalog in memory and reload it only after
+-- a change
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- CREATE CATEGORY_CATALOG_VERSION TABLE
+-- ========================================
+
+-- CATEGORY_CATALOG_VERSION Table
+CREATE TABLE IF NOT EXISTS category_catalog_version (
+    catalog_id INTEGER PRIMARY KEY CHECK (catalog_id = 1),
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+INSERT OR IGNORE INTO category_catalog_version (catalog_id, version) VALUES (1, 1);
+
+-- ========================================
+-- CREATE TRIGGERS
+-- ========================================
+
+DROP TRIGGER IF EXISTS trg_category_catalog_version_ai;
+DROP TRIGGER IF EXISTS trg_category_catalog_version_au;
+DROP TRIGGER IF EXISTS trg_category_catalog_version_ad;
+
+-- Trigger: Bump the catalog version on CATEGORY insert
+CREATE TRIGGER trg_category_catalog_version_ai
+AFTER INSERT ON category
+FOR EACH ROW
+BEGIN
+    UPDATE category_catalog_version SET version = version + 1 WHERE catalog_id = 1;
+END;
+
+-- Trigger: Bump the catalog version on CATEGORY modification
+CREATE TRIGGER trg_category_catalog_version_au
+AFTER UPDATE ON category
+FOR EACH ROW
+BEGIN
+    UPDATE category_catalog_version SET version = version + 1 WHERE catalog_id = 1;
+END;
+
+-- Trigger: Bump the catalog version on CATEGORY delete
+CREATE TRIGGER trg_category_catalog_version_ad
+AFTER DELETE ON category
+FOR EACH ROW
+BEGIN
+    UPDATE category_catalog_version SET version = version + 1 WHERE catalog_id = 1;
+END;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT * FROM category_catalog_version;
@@ -0,0 +1,129 @@
+-- ========================================
+-- DATE KEYS - SQLITE
+-- Integer date keys generated from the TEXT dates, so month filters and
+-- group-bys are index range scans instead of strftime() on every row:
+--   year_month  YYYYMM, e.g. 202510
+--   day_number  days since 1970-01-01
+-- ========================================
+
+-- ALTER TABLE can only add VIRTUAL generated columns; a STORED column
+-- would mean rebuilding each table. The values are computed on read,
+-- but every index below stores them, so indexed lookups never compute
+-- them.
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- ADD GENERATED COLUMNS
+-- ========================================
+
+-- EXPENSE Table
+ALTER TABLE expense ADD COLUMN year_month INTEGER
+    GENERATED ALWAYS AS (CAST(strftime('%Y%m', expense_date) AS INTEGER)) VIRTUAL;
+ALTER TABLE expense ADD COLUMN day_number INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(expense_date) - 2440587.5 AS INTEGER)) VIRTUAL;
+
+-- INCOME Table
+ALTER TABLE income ADD COLUMN year_month INTEGER
+    GENERATED ALWAYS AS (CAST(strftime('%Y%m', income_date) AS INTEGER)) VIRTUAL;
+ALTER TABLE income ADD COLUMN day_number INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(income_date) - 2440587.5 AS INTEGER)) VIRTUAL;
+
+-- SAVINGS_CONTRIBUTION Table
+ALTER TABLE savings_contribution ADD COLUMN year_month INTEGER
+    GENERATED ALWAYS AS (CAST(strftime('%Y%m', contribution_date) AS INTEGER)) VIRTUAL;
+ALTER TABLE savings_contribution ADD COLUMN day_number INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(contribution_date) - 2440587.5 AS INTEGER)) VIRTUAL;
+
+-- ========================================
+-- CREATE INDEXES
+-- ========================================
+
+-- Monthly totals and the month filters of the dashboard
+CREATE INDEX IF NOT EXISTS idx_expense_user_year_month ON expense(user_id, year_month);
+CREATE INDEX IF NOT EXISTS idx_income_user_year_month ON income(user_id, year_month);
+
+-- Date ranges per category (budget periods); income has no category
+CREATE INDEX IF NOT EXISTS idx_expense_user_category_day ON expense(user_id, category_id, day_number);
+CREATE INDEX IF NOT EXISTS idx_income_user_day ON income(user_id, day_number);
+
+-- Contributions have no user of their own; they are bucketed per goal
+CREATE INDEX IF NOT EXISTS idx_contribution_goal_year_month ON savings_contribution(goal_id, year_month);
+
+-- Replaced by the year_month indexes; created by earlier versions of
+-- sqlite/13_workload_indexes.sql
+DROP INDEX IF EXISTS idx_expense_user_month;
+DROP INDEX IF EXISTS idx_income_user_month;
+
+-- ========================================
+-- UPDATE VIEWS
+-- ========================================
+
+DROP VIEW IF EXISTS v_monthly_summary;
+DROP VIEW IF EXISTS v_budget_performance;
+
+-- View: Monthly Summary
+CREATE VIEW v_monthly_summary AS
+SELECT
+    u.user_id,
+    u.username,
+    printf('%04d-%02d', e.year_month / 100, e.year_month % 100) AS month,
+    printf('%04d', e.year_month / 100) AS year,
+    printf('%02d', e.year_month % 100) AS month_num,
+    SUM(e.amount) AS total_expenses,
+    COUNT(e.expense_id) AS expense_count,
+    AVG(e.amount) AS avg_expense,
+    MIN(e.amount) AS min_expense,
+    MAX(e.amount) AS max_expense
+FROM user u
+LEFT JOIN expense e ON u.user_id = e.user_id
+WHERE e.year_month IS NOT NULL
+GROUP BY u.user_id, u.username, e.year_month
+ORDER BY month DESC;
+
+-- View: Budget Performance
+CREATE VIEW v_budget_performance AS
+SELECT
+    b.budget_id,
+    b.user_id,
+    u.username,
+    c.category_name,
+    b.budget_amount,
+    b.start_date,
+    b.end_date,
+    COALESCE(SUM(e.amount), 0) AS actual_spent,
+    b.budget_amount - COALESCE(SUM(e.amount), 0) AS remaining,
+    ROUND((COALESCE(SUM(e.amount), 0) / b.budget_amount) * 100, 2) AS utilization_percent,
+    CASE
+        WHEN COALESCE(SUM(e.amount), 0) > b.budget_amount THEN 'Over Budget'
+        WHEN (COALESCE(SUM(e.amount), 0) / b.budget_amount) * 100 >= 80 THEN 'Near Limit'
+        ELSE 'Within Budget'
+    END AS budget_status,
+    COUNT(e.expense_id) AS transaction_count
+FROM budget b
+JOIN user u ON b.user_id = u.user_id
+JOIN category c ON b.category_id = c.category_id
+LEFT JOIN expense e ON e.user_id = b.user_id
+    AND e.category_id = b.category_id
+    AND e.day_number BETWEEN CAST(julianday(b.start_date) - 2440587.5 AS INTEGER)
+                         AND CAST(julianday(b.end_date) - 2440587.5 AS INTEGER)
+    AND (e.is_deleted = 0 OR e.is_deleted IS NULL)
+WHERE b.is_active = 1
+  AND (b.is_deleted = 0 OR b.is_deleted IS NULL)
+GROUP BY b.budget_id, b.user_id, u.username, c.category_name,
+         b.budget_amount, b.start_date, b.end_date;
+
+-- Refresh planner statistics for the new indexes
+ANALYZE;
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT expense_date, year_month, day_number FROM expense LIMIT 3;
+
+EXPLAIN QUERY PLAN
+SELECT year_month, SUM(amount) FROM expense
+WHERE user_id = 1 AND (is_deleted = 0 OR is_deleted IS NULL)
+GROUP BY year_month;
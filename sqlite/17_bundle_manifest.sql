@@ -0,0 +1,30 @@
+-- ========================================
+-- BUNDLE EXPORT MANIFEST - SQLITE
+-- Remembers which rows each exported bundle carried, so a bundle the
+-- central side rejected can be exported again under its sequence
+-- ========================================
+
+-- Enable foreign key constraints
+PRAGMA foreign_keys = ON;
+
+-- ========================================
+-- CREATE TABLES
+-- ========================================
+
+-- SYNC_BUNDLE_EXPORT_ROW Table
+-- One row per local row written to a bundle; table_name is the local
+-- table and row_key its primary key
+CREATE TABLE IF NOT EXISTS sync_bundle_export_row (
+    sequence_no INTEGER NOT NULL,
+    table_name TEXT NOT NULL,
+    row_key INTEGER NOT NULL,
+    PRIMARY KEY (sequence_no, table_name, row_key),
+    FOREIGN KEY (sequence_no) REFERENCES sync_bundle_export(sequence_no) ON DELETE CASCADE
+);
+
+-- ========================================
+-- VERIFY CHANGES
+-- ========================================
+
+SELECT name FROM sqlite_master
+WHERE type = 'table' AND name = 'sync_bundle_export_row';
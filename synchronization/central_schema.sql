@@ -0,0 +1,367 @@
+-- ========================================
+-- LOCAL CENTRAL STORE - SQLITE
+-- Stand-in for the Oracle central database with the same tables,
+-- constraints and trigger behaviour (oracle/01 to oracle/12), used by
+-- the local backend of central_store.py
+-- Applied automatically when the store file is first opened, and
+-- again after SCHEMA_UPGRADES when an older store is opened
+-- ========================================
+
+-- Dates are stored as 'YYYY-MM-DD' and timestamps as
+-- 'YYYY-MM-DD HH:MM:SS[.fff]' text, so they compare in time order and
+-- are returned as datetime objects like cx_Oracle does
+
+CREATE TABLE IF NOT EXISTS dual (
+    dummy TEXT NOT NULL DEFAULT 'X'
+);
+
+INSERT INTO dual (dummy) SELECT 'X' WHERE NOT EXISTS (SELECT 1 FROM dual);
+
+-- ========================================
+-- TABLES
+-- ========================================
+
+CREATE TABLE IF NOT EXISTS finance_user (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    full_name TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    last_sync TIMESTAMP,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    last_login TIMESTAMP,
+    CONSTRAINT chk_user_email CHECK (email LIKE '%@%'),
+    CONSTRAINT chk_user_active CHECK (is_active IN (0, 1))
+);
+
+CREATE TABLE IF NOT EXISTS finance_category (
+    category_id INTEGER PRIMARY KEY,
+    category_name TEXT NOT NULL UNIQUE,
+    category_type TEXT NOT NULL,
+    description TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    display_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    CONSTRAINT chk_cat_type CHECK (category_type IN ('EXPENSE', 'INCOME')),
+    CONSTRAINT chk_cat_active CHECK (is_active IN (0, 1))
+);
+
+-- Fiscal period columns are derived from the date, as trg_expense_bi
+-- and trg_expense_bu do on Oracle
+CREATE TABLE IF NOT EXISTS finance_expense (
+    expense_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    expense_date DATE NOT NULL,
+    description TEXT,
+    payment_method TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    modified_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    synced_from_local INTEGER DEFAULT 1,
+    sync_timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    sync_source TEXT,
+    fiscal_year INTEGER GENERATED ALWAYS AS (CAST(substr(expense_date, 1, 4) AS INTEGER)) STORED,
+    fiscal_month INTEGER GENERATED ALWAYS AS (CAST(substr(expense_date, 6, 2) AS INTEGER)) STORED,
+    is_deleted INTEGER NOT NULL DEFAULT 0 CHECK (is_deleted IN (0, 1)),
+    row_version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT fk_exp_user FOREIGN KEY (user_id)
+        REFERENCES finance_user(user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_exp_category FOREIGN KEY (category_id)
+        REFERENCES finance_category(category_id),
+    CONSTRAINT chk_exp_amount CHECK (amount > 0),
+    CONSTRAINT chk_exp_payment CHECK (payment_method IN
+        ('Cash', 'Credit Card', 'Debit Card', 'Online', 'Bank Transfer'))
+);
+
+CREATE TABLE IF NOT EXISTS finance_income (
+    income_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    income_source TEXT NOT NULL,
+    amount REAL NOT NULL,
+    income_date DATE NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    modified_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    synced_from_local INTEGER DEFAULT 1,
+    sync_timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    sync_source TEXT,
+    fiscal_year INTEGER GENERATED ALWAYS AS (CAST(substr(income_date, 1, 4) AS INTEGER)) STORED,
+    fiscal_month INTEGER GENERATED ALWAYS AS (CAST(substr(income_date, 6, 2) AS INTEGER)) STORED,
+    is_deleted INTEGER NOT NULL DEFAULT 0 CHECK (is_deleted IN (0, 1)),
+    row_version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT fk_inc_user FOREIGN KEY (user_id)
+        REFERENCES finance_user(user_id) ON DELETE CASCADE,
+    CONSTRAINT chk_inc_amount CHECK (amount > 0),
+    CONSTRAINT chk_inc_source CHECK (income_source IN
+        ('Salary', 'Freelance', 'Investment', 'Gift', 'Business', 'Other'))
+);
+
+CREATE TABLE IF NOT EXISTS finance_budget (
+    budget_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    budget_amount REAL NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    modified_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    is_active INTEGER NOT NULL DEFAULT 1,
+    alert_threshold INTEGER DEFAULT 80,
+    synced_from_local INTEGER DEFAULT 1,
+    sync_timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    sync_source TEXT,
+    is_deleted INTEGER NOT NULL DEFAULT 0 CHECK (is_deleted IN (0, 1)),
+    row_version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT fk_bud_user FOREIGN KEY (user_id)
+        REFERENCES finance_user(user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_bud_category FOREIGN KEY (category_id)
+        REFERENCES finance_category(category_id),
+    CONSTRAINT chk_bud_amount CHECK (budget_amount > 0),
+    CONSTRAINT chk_bud_dates CHECK (end_date > start_date),
+    CONSTRAINT chk_bud_active CHECK (is_active IN (0, 1)),
+    CONSTRAINT chk_bud_threshold CHECK (alert_threshold BETWEEN 1 AND 100)
+);
+
+CREATE TABLE IF NOT EXISTS finance_savings_goal (
+    goal_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    goal_name TEXT NOT NULL,
+    target_amount REAL NOT NULL,
+    current_amount REAL NOT NULL DEFAULT 0,
+    start_date DATE NOT NULL,
+    deadline DATE NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Active',
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    modified_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    completed_date DATE,
+    synced_from_local INTEGER DEFAULT 1,
+    sync_timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    sync_source TEXT,
+    is_deleted INTEGER NOT NULL DEFAULT 0 CHECK (is_deleted IN (0, 1)),
+    row_version INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT fk_goal_user FOREIGN KEY (user_id)
+        REFERENCES finance_user(user_id) ON DELETE CASCADE,
+    CONSTRAINT chk_goal_target CHECK (target_amount > 0),
+    CONSTRAINT chk_goal_current CHECK (current_amount >= 0),
+    CONSTRAINT chk_goal_amounts CHECK (current_amount <= target_amount),
+    CONSTRAINT chk_goal_priority CHECK (priority IN ('High', 'Medium', 'Low')),
+    CONSTRAINT chk_goal_status CHECK (status IN ('Active', 'Completed', 'Cancelled'))
+);
+
+CREATE TABLE IF NOT EXISTS finance_savings_contribution (
+    contribution_id INTEGER PRIMARY KEY,
+    goal_id INTEGER NOT NULL,
+    contribution_amount REAL NOT NULL,
+    contribution_date DATE NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    synced_from_local INTEGER NOT NULL DEFAULT 0,
+    sync_timestamp TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    sync_source TEXT,
+    CONSTRAINT fk_cont_goal FOREIGN KEY (goal_id)
+        REFERENCES finance_savings_goal(goal_id) ON DELETE CASCADE,
+    CONSTRAINT chk_cont_amount CHECK (contribution_amount > 0)
+);
+
+CREATE TABLE IF NOT EXISTS finance_sync_log (
+    sync_log_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    sync_start_time TIMESTAMP NOT NULL,
+    sync_end_time TIMESTAMP,
+    records_synced INTEGER NOT NULL DEFAULT 0,
+    sync_status TEXT NOT NULL,
+    error_message TEXT,
+    sync_type TEXT NOT NULL,
+    sync_duration_seconds INTEGER,
+    round_trips INTEGER NOT NULL DEFAULT 0,
+    bytes_fetched INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT fk_sync_user FOREIGN KEY (user_id)
+        REFERENCES finance_user(user_id) ON DELETE CASCADE,
+    CONSTRAINT chk_sync_status CHECK (sync_status IN ('Success', 'Failed', 'Partial')),
+    CONSTRAINT chk_sync_type CHECK (sync_type IN ('Manual', 'Automatic'))
+);
+
+CREATE TABLE IF NOT EXISTS finance_sync_phase (
+    sync_log_id INTEGER NOT NULL,
+    phase_order INTEGER NOT NULL,
+    phase_name TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    round_trips INTEGER NOT NULL DEFAULT 0,
+    bytes_fetched INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT pk_sync_phase PRIMARY KEY (sync_log_id, phase_order),
+    CONSTRAINT fk_phase_sync_log FOREIGN KEY (sync_log_id)
+        REFERENCES finance_sync_log(sync_log_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS finance_sync_bundle (
+    source_name TEXT NOT NULL,
+    sequence_no INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    applied_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    CONSTRAINT pk_sync_bundle PRIMARY KEY (source_name, sequence_no)
+);
+
+-- ========================================
+-- INDEXES
+-- ========================================
+
+CREATE INDEX IF NOT EXISTS idx_user_active ON finance_user(is_active);
+
+CREATE INDEX IF NOT EXISTS idx_cat_type ON finance_category(category_type);
+CREATE INDEX IF NOT EXISTS idx_cat_active ON finance_category(is_active);
+
+CREATE INDEX IF NOT EXISTS idx_exp_user ON finance_expense(user_id);
+CREATE INDEX IF NOT EXISTS idx_exp_category ON finance_expense(category_id);
+CREATE INDEX IF NOT EXISTS idx_exp_date ON finance_expense(expense_date);
+CREATE INDEX IF NOT EXISTS idx_exp_user_date ON finance_expense(user_id, expense_date);
+CREATE INDEX IF NOT EXISTS idx_exp_fiscal ON finance_expense(fiscal_year, fiscal_month);
+CREATE INDEX IF NOT EXISTS idx_exp_amount ON finance_expense(amount);
+
+CREATE INDEX IF NOT EXISTS idx_inc_user ON finance_income(user_id);
+CREATE INDEX IF NOT EXISTS idx_inc_date ON finance_income(income_date);
+CREATE INDEX IF NOT EXISTS idx_inc_user_date ON finance_income(user_id, income_date);
+CREATE INDEX IF NOT EXISTS idx_inc_fiscal ON finance_income(fiscal_year, fiscal_month);
+CREATE INDEX IF NOT EXISTS idx_inc_source ON finance_income(income_source);
+
+CREATE INDEX IF NOT EXISTS idx_bud_user ON finance_budget(user_id);
+CREATE INDEX IF NOT EXISTS idx_bud_category ON finance_budget(category_id);
+CREATE INDEX IF NOT EXISTS idx_bud_dates ON finance_budget(start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_bud_active ON finance_budget(is_active);
+
+CREATE INDEX IF NOT EXISTS idx_goal_user ON finance_savings_goal(user_id);
+CREATE INDEX IF NOT EXISTS idx_goal_status ON finance_savings_goal(status);
+CREATE INDEX IF NOT EXISTS idx_goal_deadline ON finance_savings_goal(deadline);
+CREATE INDEX IF NOT EXISTS idx_goal_priority ON finance_savings_goal(priority);
+
+CREATE INDEX IF NOT EXISTS idx_cont_goal ON finance_savings_contribution(goal_id);
+CREATE INDEX IF NOT EXISTS idx_cont_date ON finance_savings_contribution(contribution_date);
+CREATE INDEX IF NOT EXISTS idx_cont_sync ON finance_savings_contribution(sync_timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_sync_user ON finance_sync_log(user_id);
+CREATE INDEX IF NOT EXISTS idx_sync_status ON finance_sync_log(sync_status);
+CREATE INDEX IF NOT EXISTS idx_sync_time ON finance_sync_log(sync_start_time);
+
+CREATE INDEX IF NOT EXISTS idx_sync_phase_name ON finance_sync_phase(phase_name);
+
+-- ========================================
+-- TRIGGERS
+-- ========================================
+
+-- SQLite triggers cannot assign :NEW, so the Oracle BEFORE UPDATE
+-- triggers become AFTER UPDATE triggers that correct the row in one
+-- statement. A sync MERGE supplies ROW_VERSION and MODIFIED_AT itself;
+-- any other update is a central edit and gets a new version and
+-- timestamp (oracle/08_row_version.sql).
+
+CREATE TRIGGER IF NOT EXISTS trg_expense_au
+AFTER UPDATE ON finance_expense
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at
+BEGIN
+    UPDATE finance_expense
+    SET row_version = OLD.row_version + 1,
+        modified_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+    WHERE expense_id = NEW.expense_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_income_au
+AFTER UPDATE ON finance_income
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at
+BEGIN
+    UPDATE finance_income
+    SET row_version = OLD.row_version + 1,
+        modified_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+    WHERE income_id = NEW.income_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_budget_au
+AFTER UPDATE ON finance_budget
+FOR EACH ROW
+WHEN NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at
+BEGIN
+    UPDATE finance_budget
+    SET row_version = OLD.row_version + 1,
+        modified_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+    WHERE budget_id = NEW.budget_id;
+END;
+
+-- Version bump and auto-complete in one statement, so completing a
+-- synced goal does not count as a central edit
+CREATE TRIGGER IF NOT EXISTS trg_goal_au
+AFTER UPDATE ON finance_savings_goal
+FOR EACH ROW
+WHEN (NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at)
+  OR (NEW.current_amount >= NEW.target_amount AND NEW.status = 'Active')
+BEGIN
+    UPDATE finance_savings_goal
+    SET row_version = CASE
+            WHEN NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at
+            THEN OLD.row_version + 1 ELSE NEW.row_version END,
+        modified_at = CASE
+            WHEN NEW.row_version = OLD.row_version AND NEW.modified_at = OLD.modified_at
+            THEN strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime') ELSE NEW.modified_at END,
+        status = CASE
+            WHEN NEW.current_amount >= NEW.target_amount AND NEW.status = 'Active'
+            THEN 'Completed' ELSE NEW.status END,
+        completed_date = CASE
+            WHEN NEW.current_amount >= NEW.target_amount AND NEW.status = 'Active'
+            THEN date('now', 'localtime') ELSE NEW.completed_date END
+    WHERE goal_id = NEW.goal_id;
+END;
+
+-- Contributions entered centrally add to their goal; synced ones are
+-- already included in the goal total (oracle/09_contribution_sync.sql)
+CREATE TRIGGER IF NOT EXISTS trg_contribution_ai
+AFTER INSERT ON finance_savings_contribution
+FOR EACH ROW
+WHEN NEW.synced_from_local = 0
+BEGIN
+    UPDATE finance_savings_goal
+    SET current_amount = current_amount + NEW.contribution_amount
+    WHERE goal_id = NEW.goal_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sync_log_au
+AFTER UPDATE OF sync_end_time ON finance_sync_log
+FOR EACH ROW
+WHEN NEW.sync_end_time IS NOT NULL AND OLD.sync_end_time IS NULL
+BEGIN
+    UPDATE finance_sync_log
+    SET sync_duration_seconds = CAST(ROUND(
+            (julianday(NEW.sync_end_time) - julianday(NEW.sync_start_time)) * 86400) AS INTEGER)
+    WHERE sync_log_id = NEW.sync_log_id;
+END;
+
+-- ========================================
+-- DEFAULT CATEGORIES (oracle/99_fix_categories.sql)
+-- ========================================
+
+INSERT OR IGNORE INTO finance_category
+    (category_id, category_name, category_type, description, is_active, display_order)
+VALUES
+    (1, 'Food & Dining', 'EXPENSE', 'Groceries, restaurants, food delivery', 1, 1),
+    (2, 'Transportation', 'EXPENSE', 'Fuel, public transport, vehicle maintenance', 1, 2),
+    (3, 'Entertainment', 'EXPENSE', 'Movies, games, hobbies, subscriptions', 1, 3),
+    (4, 'Bills & Utilities', 'EXPENSE', 'Electricity, water, internet, phone bills', 1, 4),
+    (5, 'Healthcare', 'EXPENSE', 'Medical expenses, insurance, pharmacy', 1, 5),
+    (6, 'Shopping', 'EXPENSE', 'Clothing, electronics, household items', 1, 6),
+    (7, 'Education', 'EXPENSE', 'Books, courses, tuition fees', 1, 7),
+    (8, 'Housing', 'EXPENSE', 'Rent, mortgage, home maintenance', 1, 8),
+    (9, 'Personal Care', 'EXPENSE', 'Salon, gym, wellness', 1, 9),
+    (10, 'Others', 'EXPENSE', 'Miscellaneous expenses', 1, 10),
+    (11, 'Salary', 'INCOME', 'Monthly salary income', 1, 1),
+    (12, 'Freelance', 'INCOME', 'Freelance project income', 1, 2),
+    (13, 'Investment', 'INCOME', 'Returns from investments', 1, 3),
+    (14, 'Gift', 'INCOME', 'Money received as gifts', 1, 4),
+    (15, 'Business', 'INCOME', 'Business revenue', 1, 5);
+
+PRAGMA user_version = 3;
@@ -0,0 +1,535 @@
+"""
+Personal Finance Management System
+Synchronization Module - Central Store
+Backends for the central database: Oracle, or a local SQLite file with
+the same schema and semantics for development and benchmarking
+"""
+
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+from datetime import date, datetime
+
+# Imported on first use by oracle_driver(): loading it pulls in the Oracle
+# client libraries, which the web app and local-store syncs may never need
+cx_Oracle = None
+
+from metrics_registry import REGISTRY
+from sync_logging import LOGGER_NAME
+
+# Shares the sync logger without starting its listener, so the web app
+# can import this module without taking over sync logging
+logger = logging.getLogger(LOGGER_NAME)
+
+BACKENDS = ('oracle', 'local')
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'central_schema.sql')
+SCHEMA_VERSION = 3
+# Columns the schema file cannot add to an existing store, by the
+# version that introduced them; everything else in it is re-runnable
+SCHEMA_UPGRADES = {
+    2: [
+        "ALTER TABLE finance_budget ADD COLUMN sync_timestamp TIMESTAMP",
+        "ALTER TABLE finance_savings_goal ADD COLUMN sync_timestamp TIMESTAMP",
+    ],
+    3: [
+        f"ALTER TABLE {table} ADD COLUMN sync_source TEXT"
+        for table in ('finance_expense', 'finance_income', 'finance_budget',
+                      'finance_savings_goal', 'finance_savings_contribution')
+    ],
+}
+DEFAULT_LOCAL_PATH = os.path.join('..', 'sqlite', 'finance_central.db')
+
+# Counted by the callers that catch the failure: the web app and the sync engine
+CONNECT_FAILURES = REGISTRY.counter(
+    'spendly_central_connect_failures_total', "Failed connections to the central store",
+    ['backend'])
+
+
+def oracle_driver():
+    """The cx_Oracle module, imported on first call"""
+    global cx_Oracle
+    if cx_Oracle is None:
+        try:
+            import cx_Oracle as driver
+        except ImportError:
+            raise RuntimeError("cx_Oracle is not installed") from None
+        cx_Oracle = driver
+    return cx_Oracle
+
+
+def open_store(config):
+    """Central store selected by `backend` under [central] (default: oracle)"""
+    backend = config.get('central', 'backend', fallback='oracle').strip().lower()
+    if backend == 'local':
+        return LocalStore(config.get('central', 'database_path', fallback=DEFAULT_LOCAL_PATH))
+    if backend == 'oracle':
+        return OracleStore(config)
+    raise ValueError(f"Unknown central backend '{backend}', expected one of {BACKENDS}")
+
+
+class CentralStore:
+    """The driver operations that differ between central backends
+
+    Everything else is plain DB-API on the connection returned by
+    connect(): cursors, execute, fetch, commit and rollback. The SQL the
+    sync engine and the reports send is written for Oracle; the local
+    backend translates it.
+    """
+
+    name = None
+    label = None
+
+    def connect(self):
+        """Open a new connection"""
+        raise NotImplementedError
+
+    def create_pool(self, size, threaded=False):
+        """Pool of `size` connections with acquire() and release(connection)
+
+        Closing a connection taken from the pool hands it back.
+        """
+        raise NotImplementedError
+
+    def number_list_type(self, connection):
+        """Type handle passed to number_list, looked up once per connection"""
+        raise NotImplementedError
+
+    def number_list(self, list_type, values):
+        """Bind value for a list of numbers read with TABLE(:name)"""
+        raise NotImplementedError
+
+    def execute_batch(self, cursor, sql, rows, row_counts=False):
+        """Execute a statement for every row without stopping at failed rows
+
+        Returns ({offset: error message} of the failed rows, rows affected
+        by each successful row in order, or None without row_counts).
+        """
+        raise NotImplementedError
+
+    def create_sync_log(self, cursor, user_id, sync_type):
+        """Insert a 'Partial' finance_sync_log entry, commit, and return its id"""
+        raise NotImplementedError
+
+    def complete_sync_log(self, cursor, sync_log_id, records_synced, status, error_message=None):
+        """Close a finance_sync_log entry and commit"""
+        raise NotImplementedError
+
+
+class OracleStore(CentralStore):
+    """Oracle through cx_Oracle, configured under [oracle]"""
+
+    name = 'oracle'
+    label = 'Oracle'
+
+    def __init__(self, config):
+        self.config = config
+
+    def require_driver(self):
+        oracle_driver()
+
+    def get_dsn(self):
+        """Build the Oracle DSN from the SID or service name in the config"""
+        self.require_driver()
+        host = self.config['oracle']['host']
+        port = self.config['oracle']['port']
+
+        # Check if using SID or service_name
+        if 'sid' in self.config['oracle']:
+            sid = self.config['oracle']['sid']
+            logger.info("Connecting to Oracle database: %s:%s/%s", host, port, sid)
+            return cx_Oracle.makedsn(host, port, sid=sid)
+        service_name = self.config['oracle']['service_name']
+        logger.info("Connecting to Oracle database: %s:%s/%s", host, port, service_name)
+        return cx_Oracle.makedsn(host, port, service_name=service_name)
+
+    def connect(self):
+        self.require_driver()
+        return cx_Oracle.connect(
+            self.config['oracle']['username'],
+            self.config['oracle']['password'],
+            self.get_dsn()
+        )
+
+    def create_pool(self, size, threaded=False):
+        self.require_driver()
+        return cx_Oracle.SessionPool(
+            self.config['oracle']['username'],
+            self.config['oracle']['password'],
+            self.get_dsn(),
+            min=size,
+            max=size,
+            increment=0,
+            threaded=threaded,
+            getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT
+        )
+
+    def number_list_type(self, connection):
+        return connection.gettype('SYS.ODCINUMBERLIST')
+
+    def number_list(self, list_type, values):
+        number_list = list_type.newobject()
+        number_list.extend(values)
+        return number_list
+
+    def execute_batch(self, cursor, sql, rows, row_counts=False):
+        cursor.executemany(sql, rows, batcherrors=True, arraydmlrowcounts=row_counts)
+        failed = {error.offset: error.message for error in cursor.getbatcherrors()}
+        return failed, cursor.getarraydmlrowcounts() if row_counts else None
+
+    def create_sync_log(self, cursor, user_id, sync_type):
+        sync_log_id_var = cursor.var(cx_Oracle.NUMBER)
+        cursor.callproc('pkg_finance_crud.create_sync_log', [
+            user_id,
+            sync_type,
+            sync_log_id_var
+        ])
+        return int(sync_log_id_var.getvalue())
+
+    def complete_sync_log(self, cursor, sync_log_id, records_synced, status, error_message=None):
+        cursor.callproc('pkg_finance_crud.complete_sync_log', [
+            sync_log_id,
+            records_synced,
+            status,
+            error_message
+        ])
+
+
+# ============================================
+# LOCAL BACKEND
+# ============================================
+
+# Oracle date format elements used by the sync engine and the reports
+ORACLE_FORMAT_ELEMENTS = {
+    'YYYY': '%Y', 'MM': '%m', 'DD': '%d', 'HH24': '%H', 'MI': '%M', 'SS': '%S',
+    'FF6': '%f', 'FF': '%f',
+}
+ORACLE_FORMAT_PATTERN = re.compile('|'.join(sorted(ORACLE_FORMAT_ELEMENTS, key=len, reverse=True)))
+
+# Formats whose output is a prefix of the stored text
+PREFIX_FORMATS = {'YYYY-MM-DD': 10, 'YYYY-MM-DD HH24:MI:SS': 19}
+
+STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+POSITIONAL_BIND = re.compile(r':\d+\b')
+TABLE_BIND = re.compile(r'\bTABLE\s*\(\s*:(\w+)\s*\)', re.IGNORECASE)
+
+# Oracle expressions and their SQLite equivalents, outside string literals
+DIALECT_REPLACEMENTS = [
+    (re.compile(r'\bSYSTIMESTAMP\b', re.IGNORECASE),
+     "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"),
+    (re.compile(r'\bSYSDATE\b', re.IGNORECASE), "datetime('now', 'localtime')"),
+    (re.compile(r'\bNVL\s*\(', re.IGNORECASE), 'IFNULL('),
+    (re.compile(r'\bLEAST\s*\(', re.IGNORECASE), 'MIN('),
+    (re.compile(r'\bGREATEST\s*\(', re.IGNORECASE), 'MAX('),
+    # SQLite needs AS before an UPDATE's table alias
+    (re.compile(r'\bUPDATE\s+(\w+)\s+(?!SET\b|AS\b)(\w+)\s+SET\b', re.IGNORECASE),
+     r'UPDATE \1 AS \2 SET'),
+]
+
+MERGE_PATTERN = re.compile(r"""
+    ^\s*MERGE\s+INTO\s+(?P<table>\w+)\s+(?P<target>\w+)\s+
+    USING\s+\((?P<source>.*)\)\s+(?P<alias>\w+)\s+
+    ON\s+\((?P<on>[^)]*)\)\s+
+    (?:WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+(?P<update>.*?)\s+)?
+    WHEN\s+NOT\s+MATCHED\s+THEN\s+INSERT\s*\((?P<columns>[^)]*)\)\s*
+    VALUES\s*\((?P<values>.*)\)\s*$
+""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+
+def oracle_to_strftime(oracle_format):
+    return ORACLE_FORMAT_PATTERN.sub(lambda match: ORACLE_FORMAT_ELEMENTS[match.group()],
+                                     oracle_format)
+
+
+def parse_datetime(text, oracle_format=None):
+    """Parse stored or bound date text; the ISO forms skip strptime"""
+    if oracle_format is None or oracle_format in PREFIX_FORMATS:
+        return datetime.fromisoformat(text)
+    return datetime.strptime(text, oracle_to_strftime(oracle_format))
+
+
+def to_char(value, oracle_format=None):
+    """TO_CHAR for stored dates and timestamps, and numbers without a format"""
+    if value is None:
+        return None
+    if oracle_format is None:
+        return str(value)
+    length = PREFIX_FORMATS.get(oracle_format)
+    if length and isinstance(value, str) and len(value) >= length:
+        return value[:length]
+    return parse_datetime(value).strftime(oracle_to_strftime(oracle_format))
+
+
+def to_date(text, oracle_format=None):
+    """TO_DATE, stored as 'YYYY-MM-DD' or with the time when it has one"""
+    if text is None:
+        return None
+    value = parse_datetime(text, oracle_format)
+    if value.time() == datetime.min.time():
+        return value.date().isoformat()
+    return value.isoformat(' ', 'seconds')
+
+
+def to_timestamp(text, oracle_format=None):
+    """TO_TIMESTAMP, stored as 'YYYY-MM-DD HH:MM:SS[.ffffff]'"""
+    if text is None:
+        return None
+    return parse_datetime(text, oracle_format).isoformat(' ')
+
+
+def split_top_level(text):
+    """Split a comma separated SQL list, ignoring commas inside parentheses"""
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:index].strip())
+            start = index + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def merge_to_upsert(sql):
+    """Rewrite a single-source Oracle MERGE as an SQLite upsert
+
+    The USING query becomes the INSERT's SELECT, the first ON column the
+    conflict target, and source columns in the UPDATE become the
+    excluded values of the columns they are inserted into. Further ON
+    columns must match for the UPDATE to apply; where Oracle would insert
+    and fail on the key instead, the row is left alone.
+    """
+    match = MERGE_PATTERN.match(sql)
+    if not match:
+        raise ValueError("Unsupported MERGE statement for the local central store")
+    target, alias = match.group('target'), match.group('alias')
+
+    keys = re.findall(rf'\b{target}\.(\w+)\s*=\s*{alias}\.\w+', match.group('on'))
+    columns = split_top_level(match.group('columns'))
+    values = split_top_level(match.group('values'))
+    inserted_as = {}
+    for column, value in zip(columns, values):
+        source_column = re.fullmatch(rf'{alias}\.(\w+)', value)
+        if source_column:
+            inserted_as[source_column.group(1)] = column
+
+    def excluded(match_source):
+        name = match_source.group(1)
+        if name not in inserted_as:
+            raise ValueError(f"MERGE updates from {alias}.{name}, which is not inserted")
+        return f'excluded.{inserted_as[name]}'
+
+    source_column = re.compile(rf'\b{alias}\.(\w+)')
+    if match.group('update'):
+        parts = re.split(r'\s+WHERE\s+', match.group('update'), maxsplit=1, flags=re.IGNORECASE)
+        assignments = []
+        for assignment in split_top_level(parts[0]):
+            column, expression = assignment.split('=', 1)
+            column = re.sub(rf'^{target}\.', '', column.strip())
+            assignments.append(f"{column} = {source_column.sub(excluded, expression.strip())}")
+        action = 'DO UPDATE SET ' + ', '.join(assignments)
+        conditions = [f"{target}.{key} = excluded.{key}" for key in keys[1:]]
+        if len(parts) > 1:
+            conditions.append(f"({source_column.sub(excluded, parts[1])})")
+        if conditions:
+            action += ' WHERE ' + ' AND '.join(conditions)
+    else:
+        action = 'DO NOTHING'
+
+    # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+    return (
+        f"INSERT INTO {match.group('table')} AS {target} ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM ({match.group('source')}) AS {alias} WHERE true "
+        f"ON CONFLICT ({keys[0]}) {action}"
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def translate(sql):
+    """Translate a statement in the Oracle dialect used here to SQLite
+
+    Positional binds (:1, :2, ...) bind by position as they do in Oracle,
+    so a repeated :1 takes the next value. Named binds pass through, and
+    TABLE(:name) reads a JSON array bound by number_list.
+    """
+    if re.match(r'\s*MERGE\b', sql, re.IGNORECASE):
+        sql = merge_to_upsert(sql)
+
+    parts = STRING_LITERAL.split(sql)
+    for index in range(0, len(parts), 2):
+        code = POSITIONAL_BIND.sub('?', parts[index])
+        code = TABLE_BIND.sub(r'(SELECT value AS column_value FROM json_each(:\1))', code)
+        for pattern, replacement in DIALECT_REPLACEMENTS:
+            code = pattern.sub(replacement, code)
+        parts[index] = code
+    return ''.join(parts)
+
+
+def convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+# DATE and TIMESTAMP columns come back as datetime, as from cx_Oracle;
+# bound datetimes are stored in the same text form
+sqlite3.register_converter('DATE', convert_datetime)
+sqlite3.register_converter('TIMESTAMP', convert_datetime)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+
+class LocalCursor(sqlite3.Cursor):
+    """Cursor that accepts the Oracle dialect and named binds as keywords"""
+
+    def execute(self, sql, parameters=(), **binds):
+        # A savepoint opening the transaction takes the write lock up
+        # front, so concurrent appliers wait instead of failing mid-way
+        if not self.connection.in_transaction and re.match(r'\s*SAVEPOINT\b', sql, re.IGNORECASE):
+            super().execute('BEGIN IMMEDIATE')
+        return super().execute(translate(sql), binds or parameters)
+
+    def executemany(self, sql, rows):
+        return super().executemany(translate(sql), rows)
+
+
+class LocalConnection(sqlite3.Connection):
+    """Connection to the local store; closing a pooled one returns it to its pool"""
+
+    pool = None
+
+    def cursor(self, factory=LocalCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), **binds):
+        return self.cursor().execute(sql, parameters, **binds)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+
+class LocalPool:
+    """Keeps up to `size` idle local connections for reuse"""
+
+    def __init__(self, store, size):
+        self.store = store
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            connection = self.store.connect()
+            connection.pool = self
+            return connection
+
+    def release(self, connection):
+        connection.rollback()
+        try:
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            connection.pool = None
+            connection.close()
+
+
+class LocalStore(CentralStore):
+    """SQLite file with the central schema, created on first use
+
+    Statements are translated from the Oracle dialect (MERGE, TABLE()
+    binds, SYSTIMESTAMP, NVL, TO_CHAR, ...) as they are executed, so the
+    callers' SQL is the same for both backends.
+    """
+
+    name = 'local'
+    label = 'Local central store'
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+
+    def connect(self):
+        directory = os.path.dirname(self.database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.database_path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level='IMMEDIATE',
+            check_same_thread=False,
+            factory=LocalConnection
+        )
+        connection.create_function('TO_CHAR', -1, to_char, deterministic=True)
+        connection.create_function('TO_DATE', -1, to_date, deterministic=True)
+        connection.create_function('TO_TIMESTAMP', -1, to_timestamp, deterministic=True)
+        connection.execute('PRAGMA foreign_keys = ON')
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            # A new store gets the columns from the CREATE TABLEs instead
+            upgrades = [statement
+                        for step in range(version + 1, SCHEMA_VERSION + 1)
+                        for statement in SCHEMA_UPGRADES.get(step, [])] if version else []
+            with open(SCHEMA_FILE, encoding='utf-8') as handle:
+                connection.executescript(
+                    "BEGIN IMMEDIATE;\n"
+                    + ''.join(f"{statement};\n" for statement in upgrades)
+                    + f"{handle.read()}\nCOMMIT;")
+            if version:
+                logger.info("Upgraded local central store to schema %d: %s",
+                            SCHEMA_VERSION, self.database_path)
+            else:
+                logger.info("Created local central store: %s", self.database_path)
+        return connection
+
+    def create_pool(self, size, threaded=False):
+        return LocalPool(self, size)
+
+    def number_list_type(self, connection):
+        return None
+
+    def number_list(self, list_type, values):
+        return json.dumps(list(values))
+
+    def execute_batch(self, cursor, sql, rows, row_counts=False):
+        # A failed statement is rolled back on its own, like one row of
+        # an Oracle batch with batcherrors
+        failed = {}
+        counts = []
+        for offset, row in enumerate(rows):
+            try:
+                cursor.execute(sql, row)
+            except sqlite3.DatabaseError as e:
+                failed[offset] = str(e)
+                continue
+            counts.append(cursor.rowcount)
+        return failed, counts if row_counts else None
+
+    def create_sync_log(self, cursor, user_id, sync_type):
+        cursor.execute("""
+            INSERT INTO finance_sync_log (user_id, sync_start_time, sync_type, sync_status)
+            VALUES (:1, SYSTIMESTAMP, :2, 'Partial')
+        """, [user_id, sync_type])
+        sync_log_id = cursor.lastrowid
+        cursor.connection.commit()
+        return sync_log_id
+
+    def complete_sync_log(self, cursor, sync_log_id, records_synced, status, error_message=None):
+        cursor.execute("""
+            UPDATE finance_sync_log
+            SET sync_end_time = SYSTIMESTAMP,
+                records_synced = :1,
+                sync_status = :2,
+                error_message = :3
+            WHERE sync_log_id = :4
+        """, [records_synced, status, error_message, sync_log_id])
+        cursor.connection.commit()
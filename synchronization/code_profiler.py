@@ -0,0 +1,142 @@
+"""
+Personal Finance Management System
+Synchronization Module - Code Profiler
+Runs one web request or sync run under cProfile or a stack sampler and
+writes the result to logs/profiles/, as .pstats or as collapsed stacks
+for flame graphs
+"""
+
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path(__file__).resolve().parent.parent / 'logs' / 'profiles'
+
+# cprofile: every call, exact counts, slows pure-Python code noticeably
+# sample: the profiled thread's stack every interval, low overhead
+MODES = ('cprofile', 'sample')
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+LABEL_PATTERN = re.compile(r'[^\w.-]+')
+
+# One cProfile run per process: from Python 3.12 a profiler is global to
+# the interpreter, and a second one cannot be enabled while it runs
+CPROFILE_LOCK = threading.Lock()
+
+
+def output_path(label, suffix, profile_dir=PROFILE_DIR):
+    """logs/profiles/<timestamp>_<label><suffix>, creating the folder"""
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+    label = LABEL_PATTERN.sub('_', label).strip('_') or 'run'
+    return profile_dir / f"{stamp}_{label}{suffix}"
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread
+
+    Stacks are counted as 'outer;...;inner' strings, the collapsed format
+    read by flamegraph.pl, speedscope and most flame graph viewers. The
+    profiled thread is never interrupted, so the overhead is the sampler
+    thread waking up once per interval.
+    """
+
+    def __init__(self, thread_id=None, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.counts = {}
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name='stack-sampler')
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                             f"{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            for stack, count in sorted(self.counts.items()):
+                handle.write(f"{stack} {count}\n")
+
+
+class CodeProfile:
+    """One profiled request or sync run of the calling thread"""
+
+    def __init__(self, mode, label, interval=DEFAULT_SAMPLE_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.label = label
+        self.interval = interval
+        self.profiler = None
+
+    def start(self):
+        """Start profiling; RuntimeError if another cProfile run is active"""
+        if self.mode == 'cprofile':
+            if not CPROFILE_LOCK.acquire(blocking=False):
+                raise RuntimeError("Another cProfile run is active in this process")
+            import cProfile  # only loaded when a profile is asked for
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = StackSampler(interval=self.interval)
+            self.profiler.start()
+
+    def stop(self):
+        """Stop profiling and write the output file; returns its path"""
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+            CPROFILE_LOCK.release()
+            path = output_path(self.label, '.pstats')
+            self.profiler.dump_stats(path)
+        else:
+            self.profiler.stop()
+            path = output_path(self.label, '.collapsed')
+            self.profiler.write_collapsed(path)
+        return path
+
+    def cancel(self):
+        """Stop profiling without writing anything"""
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+            CPROFILE_LOCK.release()
+        else:
+            self.profiler.stop()
+
+
+@contextmanager
+def profiled(mode, label, interval=DEFAULT_SAMPLE_INTERVAL, report=print):
+    """Profile a block when `mode` is set, reporting where the output went"""
+    if not mode:
+        yield None
+        return
+    profile = CodeProfile(mode, label, interval)
+    profile.start()
+    try:
+        yield profile
+    finally:
+        path = profile.stop()
+        report(f"Profile ({mode}) written to {path}")
@@ -0,0 +1,200 @@
+"""
+Personal Finance Management System
+Synchronization Module - Fleet Sync
+Non-interactive sync of many local SQLite databases (one per branch or
+device image) in parallel across a process pool
+"""
+
+import argparse
+import configparser
+import glob
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from sync_logging import get_sync_logger
+from sync_manager import DatabaseSync, logger
+
+# Central store session pool of the current worker process, created once
+# by init_worker and reused for every database the process syncs
+_oracle_pool = None
+
+
+def init_worker(config_file):
+    """Create the worker process's log listener and single-session Oracle pool"""
+    global _oracle_pool
+    get_sync_logger()
+    _oracle_pool = DatabaseSync(config_file).store.create_pool(1)
+
+
+def discover_databases(patterns):
+    """Expand glob patterns to SQLite files, largest first
+
+    Starting the biggest databases first keeps one slow branch from
+    finishing alone at the end of the run.
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths, key=os.path.getsize, reverse=True)
+
+
+def sync_database(config_file, db_path, retry_attempts, backoff_seconds):
+    """Sync every user of one SQLite database, retrying with backoff
+
+    Runs in a worker process. Returns a result dict for the fleet report.
+    """
+    result = {
+        'database': db_path,
+        'users': 0,
+        'records': 0,
+        'conflicts': 0,
+        'failed_rows': 0,
+        'attempts': 0,
+        'success': False,
+        'error': None,
+    }
+    start_time = time.monotonic()
+
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            user_ids = [row[0] for row in conn.execute("SELECT user_id FROM user ORDER BY user_id")]
+    except sqlite3.Error as e:
+        result['error'] = f"Cannot read users: {str(e)}"
+        result['duration'] = time.monotonic() - start_time
+        return result
+    result['users'] = len(user_ids)
+
+    pending_users = list(user_ids)
+    last_failures = {}
+    for attempt in range(1, retry_attempts + 1):
+        result['attempts'] = attempt
+        result['failed_rows'] = 0
+        failed_users = []
+        for user_id in pending_users:
+            sync = DatabaseSync(config_file, sqlite_path=db_path, oracle_pool=_oracle_pool)
+            # The branch databases share this host, so each needs its own
+            # source name for its pulls to skip only its own rows
+            sync.source_name = f"{sync.source_name}/{Path(db_path).stem}"
+            sync.metrics.retries = attempt - 1
+            # A partial sync commits what went through, so its records
+            # count, but the user is retried for the rest
+            synced = sync.sync_all(user_id, 'Automatic')
+            result['records'] += sync.records_synced
+            if synced:
+                result['conflicts'] += sum(len(rows) for rows in sync.conflicts.values())
+            else:
+                failed_users.append(user_id)
+                last_failures[user_id] = sync.failure_summary() or sync.status
+                # Every run pushes the whole database's pending rows, so
+                # each user's run meets the same rejected rows
+                result['failed_rows'] = max(result['failed_rows'], sync.failed_row_count())
+
+        pending_users = failed_users
+        if not pending_users:
+            result['success'] = True
+            break
+        if attempt < retry_attempts:
+            # Exponential backoff with jitter so failing branches do not
+            # retry against Oracle in lockstep
+            delay = backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.warning("%s: users %s failed, retrying in %.1fs", db_path, pending_users, delay)
+            time.sleep(delay)
+
+    if pending_users:
+        result['error'] = f"Users not synced after {retry_attempts} attempts: " + ', '.join(
+            f"{user_id} ({last_failures[user_id]})" for user_id in pending_users)
+    result['duration'] = time.monotonic() - start_time
+    return result
+
+
+def print_report(results, wall_seconds):
+    """Print the aggregated fleet report"""
+    total_records = sum(result['records'] for result in results)
+    succeeded = [result for result in results if result['success']]
+    failed = [result for result in results if not result['success']]
+
+    print("\n" + "=" * 78)
+    print(f"Fleet Sync Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 78)
+    print(f"{'Database':<40} {'Users':>5} {'Records':>8} {'Tries':>5} {'Secs':>7} {'Rows/s':>8}")
+    print("-" * 78)
+    for result in sorted(results, key=lambda item: item['duration'], reverse=True):
+        rate = result['records'] / result['duration'] if result['duration'] else 0
+        status = '' if result['success'] else '  FAILED'
+        print(f"{os.path.basename(result['database'])[:40]:<40} {result['users']:>5} "
+              f"{result['records']:>8} {result['attempts']:>5} {result['duration']:>7.1f} "
+              f"{rate:>8.1f}{status}")
+    print("-" * 78)
+    print(f"Databases: {len(results)} ({len(succeeded)} succeeded, {len(failed)} failed)")
+    print(f"Records synced: {total_records}")
+    print(f"Conflicts left for the next pull: {sum(result['conflicts'] for result in results)}")
+    print(f"Rows rejected by Oracle: {sum(result['failed_rows'] for result in results)}")
+    print(f"Wall time: {wall_seconds:.1f}s, "
+          f"throughput: {total_records / wall_seconds if wall_seconds else 0:.1f} rows/s")
+    for result in failed:
+        print(f"  ✗ {result['database']}: {result['error']}")
+    print("=" * 78)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Sync many local databases to Oracle in parallel")
+    parser.add_argument('patterns', nargs='*',
+                        help="glob patterns of SQLite databases (default: [fleet] databases)")
+    parser.add_argument('--config', default='config.ini', help="sync configuration file")
+    parser.add_argument('--workers', type=int, help="worker processes (default: [fleet] workers)")
+    args = parser.parse_args()
+    get_sync_logger()
+
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    patterns = args.patterns or [
+        pattern.strip()
+        for pattern in config.get('fleet', 'databases', fallback='').split(',')
+        if pattern.strip()
+    ]
+    workers = args.workers or config.getint('fleet', 'workers', fallback=os.cpu_count() or 1)
+    retry_attempts = config.getint('sync', 'retry_attempts', fallback=3)
+    backoff_seconds = config.getfloat('fleet', 'backoff_seconds', fallback=5)
+
+    databases = discover_databases(patterns)
+    if not databases:
+        print("No databases found. Pass glob patterns or set databases under [fleet].")
+        return 1
+    workers = max(1, min(workers, len(databases)))
+    logger.info("Fleet sync of %s databases with %s workers", len(databases), workers)
+
+    start_time = time.monotonic()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(args.config,)) as executor:
+        futures = {
+            executor.submit(sync_database, args.config, db_path, retry_attempts, backoff_seconds):
+                db_path
+            for db_path in databases
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'database': futures[future], 'users': 0, 'records': 0,
+                          'conflicts': 0, 'failed_rows': 0, 'attempts': 0, 'success': False,
+                          'error': str(e), 'duration': 0.0}
+            results.append(result)
+            logger.info(
+                "Finished %s: %s records, %s",
+                result['database'], result['records'], 'ok' if result['success'] else 'failed'
+            )
+
+    print_report(results, time.monotonic() - start_time)
+    return 0 if all(result['success'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
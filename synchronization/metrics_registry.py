@@ -0,0 +1,217 @@
+"""
+Personal Finance Management System
+Synchronization Module - Metrics Registry
+In-process counters, gauges and histograms shared by the web app and the
+sync modules, rendered in the Prometheus text exposition format
+"""
+
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; suits web requests and report queries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return f"{value:.1f}"
+    return repr(value)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class CounterValue:
+    """One labelled counter series"""
+
+    __slots__ = ('lock', 'value')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name, label_names, label_values):
+        yield f"{name}{format_labels(label_names, label_values)} {format_value(self.value)}"
+
+
+class GaugeValue(CounterValue):
+    """One labelled gauge series"""
+
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class HistogramValue:
+    """One labelled histogram series; buckets are counted singly and summed on render"""
+
+    __slots__ = ('lock', 'bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, name, label_names, label_values):
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            labels = format_labels(label_names, label_values, [('le', format_value(bound))])
+            yield f"{name}_bucket{labels} {cumulative}"
+        labels = format_labels(label_names, label_values)
+        yield f"{name}_sum{labels} {format_value(total)}"
+        yield f"{name}_count{labels} {cumulative}"
+
+
+class Metric:
+    """A named metric family; `labels()` returns the series for some label values
+
+    Each series has its own lock, held only for a single update, so
+    requests recording different series never wait on each other and a
+    scrape only waits for one update at a time. A metric without labels
+    is updated directly.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        value = self.series.get(values)
+        if value is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            with self.lock:
+                value = self.series.setdefault(values, self.new_value())
+        return value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, value in list(self.series.items()):
+            yield from value.samples(self.name, self.label_names, values)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def new_value(self):
+        return CounterValue()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def new_value(self):
+        return GaugeValue()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def new_value(self):
+        return HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class Registry:
+    """Metric families of this process, by name"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, or return the one already registered under its name
+
+        Modules may be imported more than once (e.g. as a script and as a
+        module); they then share one family instead of failing.
+        """
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"{metric.name} is already registered as a {existing.kind}")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+# Registry of this process, scraped on /metrics
+REGISTRY = Registry()
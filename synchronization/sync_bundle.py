@@ -0,0 +1,592 @@
+"""
+Personal Finance Management System
+Synchronization Module - Offline Sync Bundles
+Exports pending SQLite changes to compressed, checksummed bundle files and
+applies them to Oracle or another SQLite database in bulk
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from sync_manager import (
+    CONTRIBUTION_STREAM,
+    REFERENCE_STREAMS,
+    SYNC_ENTITIES,
+    DatabaseSync,
+    logger,
+)
+
+# Bump when the payload layout changes
+BUNDLE_FORMAT = 1
+BUNDLE_SUFFIX = '.bundle.json.gz'
+
+USER_STREAM = next(stream for stream in REFERENCE_STREAMS if stream['name'] == 'users')
+
+# Users are exported in full (a handful of rows) so foreign keys resolve
+# wherever the bundle is applied. Existing users are never overwritten.
+USERS_SELECT = """
+    SELECT user_id, username, password_hash, email, full_name, created_at
+    FROM user
+"""
+
+ORACLE_USER_MERGE = """
+    MERGE INTO finance_user t
+    USING (
+        SELECT :1 AS user_id, :2 AS username, :3 AS password_hash, :4 AS email,
+               :5 AS full_name, TO_TIMESTAMP(:6, 'YYYY-MM-DD HH24:MI:SS') AS created_at
+        FROM DUAL
+    ) s
+    ON (t.user_id = s.user_id)
+    WHEN NOT MATCHED THEN INSERT
+        (user_id, username, password_hash, email, full_name, created_at)
+    VALUES
+        (s.user_id, s.username, s.password_hash, s.email, s.full_name, s.created_at)
+"""
+
+
+def payload_checksum(payload):
+    """SHA-256 of the canonical JSON form of a bundle payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def parse_bundle(data, name='bundle', max_size=None):
+    """Decompress bundle bytes and verify their format and checksum
+
+    With max_size, decompression stops one byte past that many bytes and
+    the bundle is refused, so a small upload cannot expand without bound.
+    """
+    try:
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as unpacked:
+            content = unpacked.read(-1 if max_size is None else max_size + 1)
+        if max_size is not None and len(content) > max_size:
+            raise ValueError(f"{name}: larger than {max_size} bytes uncompressed")
+        bundle = json.loads(content.decode('utf-8'))
+    except (OSError, EOFError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"{name}: not a valid bundle ({str(e)})")
+
+    if not isinstance(bundle, dict) or bundle.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{name}: unsupported bundle format")
+    if 'payload' not in bundle or payload_checksum(bundle['payload']) != bundle.get('checksum'):
+        raise ValueError(f"{name}: checksum mismatch, bundle is corrupt or incomplete")
+    return bundle
+
+
+def read_bundle(path):
+    """Load a bundle file and verify its format and checksum"""
+    return parse_bundle(Path(path).read_bytes(), str(path))
+
+
+def bundle_row_count(payload):
+    """Number of rows carried by a bundle payload, users excluded"""
+    count = len(payload['contributions'])
+    for changes in payload['entities'].values():
+        count += len(changes['rows']) + len(changes['tombstones'])
+    return count
+
+
+class BundleSync(DatabaseSync):
+    """Writes and applies offline changeset bundles
+
+    Export and apply reuse the entity definitions of DatabaseSync, so a
+    bundle applied to Oracle goes through the same compare-and-set MERGE
+    as a live push, and a bundle applied to SQLite through the same
+    newer-wins upsert as a pull.
+    """
+
+    def __init__(self, config_file='config.ini', sqlite_path=None):
+        super().__init__(config_file, sqlite_path=sqlite_path)
+        # Relative to the config file, so the web app and the command line
+        # use the same folder whatever their working directory
+        self.output_dir = os.path.join(
+            os.path.dirname(os.path.abspath(config_file)),
+            self.config.get('bundle', 'output_dir', fallback='bundles')
+        )
+
+    def collect_pending(self):
+        """Read every pending local row into a bundle payload"""
+        payload = {'users': [], 'entities': {}, 'contributions': []}
+
+        payload['users'] = [list(row) for row in self.sqlite_conn.execute(USERS_SELECT)]
+        for entity in SYNC_ENTITIES:
+            rows = [list(row) for row in self.sqlite_conn.execute(entity['sqlite_select'])]
+            # is_deleted is the last column of every entity
+            payload['entities'][entity['name']] = {
+                'rows': [row for row in rows if not row[-1]],
+                'tombstones': [row for row in rows if row[-1]],
+            }
+        payload['contributions'] = [
+            list(row) for row in self.sqlite_conn.execute(CONTRIBUTION_STREAM['sqlite_select'])
+        ]
+        return payload
+
+    def mark_exported(self, payload, sequence):
+        """Mark the rows of an exported payload as synced and list them under its sequence"""
+        cursor = self.sqlite_conn.cursor()
+        for entity in SYNC_ENTITIES:
+            changes = payload['entities'][entity['name']]
+            rows = changes['rows'] + changes['tombstones']
+            cursor.executemany(f"""
+                UPDATE {entity['table']}
+                SET is_synced = 1, sync_timestamp = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                WHERE {entity['key']} = ? AND row_version = ?
+            """, [(row[0], row[1]) for row in rows])
+            cursor.executemany("""
+                INSERT INTO sync_bundle_export_row (sequence_no, table_name, row_key)
+                VALUES (?, ?, ?)
+            """, [(sequence, entity['table'], row[0]) for row in rows])
+        cursor.executemany("""
+            UPDATE savings_contribution
+            SET is_synced = 1, sync_timestamp = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE contribution_id = ?
+        """, [(row[0],) for row in payload['contributions']])
+        cursor.executemany("""
+            INSERT INTO sync_bundle_export_row (sequence_no, table_name, row_key)
+            VALUES (?, 'savings_contribution', ?)
+        """, [(sequence, row[0]) for row in payload['contributions']])
+
+    def mark_pending(self, sequence):
+        """Put the rows an exported bundle carried back to pending and forget its manifest
+
+        sync_timestamp changes with is_synced, so the local triggers do not
+        take this for an edit.
+        """
+        cursor = self.sqlite_conn.cursor()
+        for table, key in ([(entity['table'], entity['key']) for entity in SYNC_ENTITIES]
+                           + [('savings_contribution', 'contribution_id')]):
+            cursor.execute(f"""
+                UPDATE {table}
+                SET is_synced = 0, sync_timestamp = NULL
+                WHERE is_synced = 1
+                  AND {key} IN (SELECT row_key FROM sync_bundle_export_row
+                                WHERE sequence_no = ? AND table_name = ?)
+            """, [sequence, table])
+        cursor.execute("DELETE FROM sync_bundle_export_row WHERE sequence_no = ?", [sequence])
+
+    def export_bundle(self, output_dir=None, sequence=None):
+        """Write all pending local changes to the next bundle file
+
+        The rows are read, the sequence number allocated and the rows marked
+        as synced in one SQLite transaction that only commits once the file
+        is completely on disk. Returns the bundle path, or None if nothing
+        was pending.
+
+        With sequence, an earlier bundle the central side rejected is
+        written again under the same sequence: its rows, in their current
+        state, plus whatever else is pending now.
+        """
+        if not self.connect_sqlite():
+            return None
+
+        output_dir = Path(output_dir or self.output_dir)
+        written_path = None
+        temp_path = None
+        try:
+            # Hold the write lock so no local edit slips between read and mark
+            self.sqlite_conn.execute("BEGIN IMMEDIATE")
+            cursor = self.sqlite_conn.cursor()
+            if sequence is not None:
+                exported = cursor.execute(
+                    "SELECT 1 FROM sync_bundle_export WHERE sequence_no = ? AND source_name = ?",
+                    [sequence, self.source_name]
+                ).fetchone()
+                if not exported:
+                    raise ValueError(f"No bundle {sequence} was exported from {self.source_name}")
+                self.mark_pending(sequence)
+
+            payload = self.collect_pending()
+            row_count = bundle_row_count(payload)
+            if row_count == 0 and sequence is None:
+                self.sqlite_conn.rollback()
+                logger.info("No pending changes, no bundle written")
+                return None
+
+            checksum = payload_checksum(payload)
+            if sequence is None:
+                cursor.execute("""
+                    INSERT INTO sync_bundle_export (source_name, file_name, checksum, row_count)
+                    VALUES (?, '', ?, ?)
+                """, [self.source_name, checksum, row_count])
+                sequence = cursor.lastrowid
+
+            bundle_path = output_dir / f"{self.source_name}_{sequence:06d}{BUNDLE_SUFFIX}"
+            cursor.execute("""
+                UPDATE sync_bundle_export
+                SET file_name = ?, checksum = ?, row_count = ?,
+                    created_at = datetime('now', 'localtime')
+                WHERE sequence_no = ?
+            """, [bundle_path.name, checksum, row_count, sequence])
+            self.mark_exported(payload, sequence)
+
+            bundle = {
+                'format': BUNDLE_FORMAT,
+                'source': self.source_name,
+                'sequence': sequence,
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'row_count': row_count,
+                'checksum': checksum,
+                'payload': payload,
+            }
+            output_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = bundle_path.with_name(bundle_path.name + '.tmp')
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as bundle_file:
+                json.dump(bundle, bundle_file, separators=(',', ':'))
+            os.replace(temp_path, bundle_path)
+            written_path = bundle_path
+
+            self.sqlite_conn.commit()
+            logger.info(
+                "Exported bundle %s (%s rows, sequence %s)",
+                bundle_path, row_count, sequence
+            )
+            return bundle_path
+
+        except Exception as e:
+            logger.error("Bundle export failed: %s", e)
+            self.sqlite_conn.rollback()
+            for path in (temp_path, written_path):
+                if path and path.exists():
+                    path.unlink()
+            return None
+
+        finally:
+            self.sqlite_conn.close()
+            self.sqlite_conn = None
+
+    def last_applied_sequence(self, target, source):
+        """Highest bundle sequence of a source already applied to the target"""
+        if target == 'oracle':
+            cursor = self.oracle_conn.cursor()
+            cursor.execute("""
+                SELECT NVL(MAX(sequence_no), 0) FROM finance_sync_bundle WHERE source_name = :1
+            """, [source])
+        else:
+            cursor = self.sqlite_conn.execute("""
+                SELECT COALESCE(MAX(sequence_no), 0) FROM sync_bundle_applied WHERE source_name = ?
+            """, [source])
+        return cursor.fetchone()[0]
+
+    def apply_to_oracle(self, bundle):
+        """Apply one bundle to Oracle and record it; the caller commits
+
+        A bundle is applied whole or not at all: if Oracle rejects any of
+        its rows this raises, so the caller rolls the bundle back and its
+        sequence is not recorded. Rows older than Oracle are conflicts,
+        not failures, and do not stop the bundle.
+        """
+        payload = bundle['payload']
+        cursor = self.oracle_conn.cursor()
+        failed_before = self.failed_row_count()
+
+        if payload['users']:
+            cursor.executemany(ORACLE_USER_MERGE, [tuple(row) for row in payload['users']])
+
+        applied_count = 0
+        for entity in SYNC_ENTITIES:
+            changes = payload['entities'].get(entity['name'], {'rows': [], 'tombstones': []})
+            rows = [tuple(row) for row in changes['rows'] + changes['tombstones']]
+            for start in range(0, len(rows), self.batch_size):
+                applied_count += len(self.push_batch(entity, rows[start:start + self.batch_size],
+                                                     source=bundle['source']))
+
+        contributions = [tuple(row) for row in payload['contributions']]
+        for start in range(0, len(contributions), self.batch_size):
+            applied_count += len(
+                self.push_contribution_batch(contributions[start:start + self.batch_size],
+                                             source=bundle['source'])
+            )
+
+        failed = self.failed_row_count() - failed_before
+        if failed:
+            raise ValueError(f"Oracle rejected {failed} of the bundle's rows")
+
+        cursor.execute("""
+            INSERT INTO finance_sync_bundle (source_name, sequence_no, checksum, row_count)
+            VALUES (:1, :2, :3, :4)
+        """, [bundle['source'], bundle['sequence'], bundle['checksum'], applied_count])
+        return applied_count
+
+    def apply_to_sqlite(self, bundle):
+        """Apply one bundle to the SQLite database and record it, in one transaction"""
+        payload = bundle['payload']
+        cursor = self.sqlite_conn.cursor()
+
+        cursor.executemany(USER_STREAM['sqlite_upsert'], payload['users'])
+
+        applied_count = 0
+        for entity in SYNC_ENTITIES:
+            changes = payload['entities'].get(entity['name'], {'rows': [], 'tombstones': []})
+            cursor.executemany(entity['sqlite_upsert'], changes['rows'] + changes['tombstones'])
+            applied_count += max(cursor.rowcount, 0)
+
+        cursor.executemany(CONTRIBUTION_STREAM['sqlite_upsert'], payload['contributions'])
+        applied_count += max(cursor.rowcount, 0)
+
+        cursor.execute("""
+            INSERT INTO sync_bundle_applied (source_name, sequence_no, checksum, row_count)
+            VALUES (?, ?, ?, ?)
+        """, [bundle['source'], bundle['sequence'], bundle['checksum'], applied_count])
+        self.sqlite_conn.commit()
+        return applied_count
+
+    def apply_bundles(self, paths, target='oracle'):
+        """Apply bundle files to Oracle or SQLite in source and sequence order
+
+        Bundles already applied are skipped, so a directory can be applied
+        again safely. A gap in a source's sequence stops that source until
+        the missing bundle arrives; other sources carry on.
+        """
+        connected = self.connect_oracle() if target == 'oracle' else self.connect_sqlite()
+        if not connected:
+            return False
+        conn = self.oracle_conn if target == 'oracle' else self.sqlite_conn
+
+        try:
+            bundles = []
+            for path in paths:
+                try:
+                    bundles.append((path, read_bundle(path)))
+                except (OSError, ValueError) as e:
+                    logger.error("Skipping bundle %s: %s", path, e)
+            bundles.sort(key=lambda item: (item[1]['source'], item[1]['sequence']))
+
+            last_applied = {}
+            blocked = set()
+            for path, bundle in bundles:
+                source, sequence = bundle['source'], bundle['sequence']
+                if source in blocked:
+                    continue
+                if source not in last_applied:
+                    last_applied[source] = self.last_applied_sequence(target, source)
+
+                if sequence <= last_applied[source]:
+                    logger.info("Bundle %s already applied, skipping", path)
+                    continue
+                if sequence != last_applied[source] + 1:
+                    logger.error(
+                        "Bundles %s..%s from %s are missing, not applying %s past sequence %s",
+                        last_applied[source] + 1, sequence - 1, source, source, last_applied[source]
+                    )
+                    blocked.add(source)
+                    continue
+
+                try:
+                    if target == 'oracle':
+                        applied_count = self.apply_to_oracle(bundle)
+                        self.oracle_conn.commit()
+                    else:
+                        applied_count = self.apply_to_sqlite(bundle)
+                except Exception as e:
+                    logger.error("Failed to apply bundle %s: %s", path, e)
+                    conn.rollback()
+                    blocked.add(source)
+                    continue
+
+                last_applied[source] = sequence
+                self.records_synced += applied_count
+                logger.info(
+                    "Applied bundle %s: %s of %s rows",
+                    path, applied_count, bundle['row_count']
+                )
+
+            logger.info("Total records applied from bundles: %s", self.records_synced)
+            for name, conflicts in self.conflicts.items():
+                logger.warning("%s %s were older than Oracle and not applied", len(conflicts), name)
+            return not blocked
+
+        finally:
+            self.close()
+
+    def skip_bundle(self, source, sequence, target='oracle'):
+        """Record a source's next bundle as applied without applying any of its rows
+
+        Unblocks a source whose bundle was lost or keeps being rejected, so
+        its later bundles apply. The skipped bundle's rows stay missing on
+        the target until they are edited and exported again.
+        """
+        connected = self.connect_oracle() if target == 'oracle' else self.connect_sqlite()
+        if not connected:
+            return False
+
+        try:
+            last = self.last_applied_sequence(target, source)
+            if sequence != last + 1:
+                logger.error("Bundle %s/%s is not the next one to apply, %s/%s is",
+                             source, sequence, source, last + 1)
+                return False
+
+            if target == 'oracle':
+                self.oracle_conn.cursor().execute("""
+                    INSERT INTO finance_sync_bundle (source_name, sequence_no, checksum, row_count)
+                    VALUES (:1, :2, 'skipped', 0)
+                """, [source, sequence])
+                self.oracle_conn.commit()
+            else:
+                self.sqlite_conn.execute("""
+                    INSERT INTO sync_bundle_applied (source_name, sequence_no, checksum, row_count)
+                    VALUES (?, ?, 'skipped', 0)
+                """, [source, sequence])
+                self.sqlite_conn.commit()
+            logger.warning("Bundle %s/%s skipped; later bundles from %s will apply",
+                           source, sequence, source)
+            return True
+
+        except Exception as e:
+            logger.error("Failed to skip bundle %s/%s: %s", source, sequence, e)
+            return False
+
+        finally:
+            self.close()
+
+    def server_request(self, url, data=None):
+        """Call the sync ingestion server, retrying while it is busy or unreachable"""
+        token = self.config.get('bundle', 'token', fallback='')
+        timeout = self.config.getint('sync', 'timeout_seconds', fallback=30)
+        attempts = self.config.getint('sync', 'retry_attempts', fallback=3)
+
+        headers = {'Authorization': f"Bearer {token}"}
+        if data is not None:
+            headers['Content-Type'] = 'application/gzip'
+
+        for attempt in range(1, attempts + 1):
+            request = urllib.request.Request(url, data=data, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    return json.loads(response.read().decode('utf-8'))
+            except urllib.error.HTTPError as e:
+                # 503 means the server queue is full; anything else is final
+                if e.code != 503 or attempt == attempts:
+                    raise
+                delay = int(e.headers.get('Retry-After', 5))
+            except urllib.error.URLError:
+                if attempt == attempts:
+                    raise
+                delay = 2 ** attempt
+            logger.warning("Sync server busy or unreachable, retrying in %ss", delay)
+            time.sleep(delay)
+
+    def upload_bundles(self, paths, server_url=None):
+        """Send bundle files to the sync ingestion server in sequence order
+
+        Only bundles past the last sequence the server has applied for their
+        source are sent. Bundles the server has not applied yet are sent
+        again on the next upload.
+        """
+        server_url = (server_url or self.config.get('bundle', 'server_url', fallback='')).rstrip('/')
+        if not server_url:
+            logger.error("No sync server configured (server_url under [bundle])")
+            return False
+
+        try:
+            bundles = sorted(
+                ((read_bundle(path), path) for path in paths),
+                key=lambda item: (item[0]['source'], item[0]['sequence'])
+            )
+            last_applied = {}
+            uploaded = 0
+            for bundle, path in bundles:
+                source = bundle['source']
+                if source not in last_applied:
+                    status = self.server_request(
+                        f"{server_url}/sync/status/{urllib.parse.quote(source)}"
+                    )
+                    last_applied[source] = status['last_sequence']
+                if bundle['sequence'] <= last_applied[source]:
+                    continue
+
+                result = self.server_request(
+                    f"{server_url}/sync/bundles/{urllib.parse.quote(source)}",
+                    Path(path).read_bytes()
+                )
+                logger.info("Uploaded bundle %s: %s", path, result['status'])
+                uploaded += 1
+
+            logger.info("Bundles uploaded to sync server: %s", uploaded)
+            return True
+
+        except Exception as e:
+            logger.error("Bundle upload failed: %s", e)
+            return False
+
+
+def expand_bundle_paths(paths):
+    """Turn files and directories given on the command line into bundle files"""
+    bundle_paths = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            bundle_paths.extend(sorted(path.glob(f"*{BUNDLE_SUFFIX}")))
+        else:
+            bundle_paths.append(path)
+    return bundle_paths
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Offline sync bundles")
+    parser.add_argument('--config', default='config.ini', help="sync configuration file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="write pending local changes to a bundle")
+    export_parser.add_argument('--output-dir', help="directory for bundle files")
+    export_parser.add_argument('--sequence', type=int,
+                               help="write a rejected bundle again under its sequence")
+
+    apply_parser = commands.add_parser('apply', help="apply bundle files")
+    apply_parser.add_argument('--target', choices=['oracle', 'sqlite'], default='oracle')
+    apply_parser.add_argument('--database', help="SQLite database to apply to (sqlite target)")
+    apply_parser.add_argument('paths', nargs='+', help="bundle files or directories")
+
+    skip_parser = commands.add_parser('skip', help="unblock a source by skipping its next bundle")
+    skip_parser.add_argument('--target', choices=['oracle', 'sqlite'], default='oracle')
+    skip_parser.add_argument('--database', help="SQLite database to record the skip in (sqlite target)")
+    skip_parser.add_argument('source', help="source name of the bundle")
+    skip_parser.add_argument('sequence', type=int, help="sequence of the bundle to skip")
+
+    upload_parser = commands.add_parser('upload', help="send bundles to the sync server")
+    upload_parser.add_argument('--server-url', help="sync server base URL")
+    upload_parser.add_argument('paths', nargs='*', help="bundle files or directories")
+    args = parser.parse_args()
+
+    bundle_sync = BundleSync(args.config, sqlite_path=getattr(args, 'database', None))
+    if args.command == 'export':
+        bundle_path = bundle_sync.export_bundle(args.output_dir, args.sequence)
+        if bundle_path:
+            print(f"\n✓ Bundle written: {bundle_path}")
+            return 0
+        return 0 if args.sequence is None else 1
+
+    if args.command == 'skip':
+        if bundle_sync.skip_bundle(args.source, args.sequence, args.target):
+            print(f"\n✓ Bundle {args.source}/{args.sequence} skipped")
+            return 0
+        print("\n✗ Bundle not skipped. Check logs/sync_log.txt for details.")
+        return 1
+
+    if args.command == 'upload':
+        paths = expand_bundle_paths(args.paths or [bundle_sync.output_dir])
+        if bundle_sync.upload_bundles(paths, args.server_url):
+            print("\n✓ Bundles uploaded successfully!")
+            return 0
+        print("\n✗ Bundle upload failed. Check logs/sync_log.txt for details.")
+        return 1
+
+    success = bundle_sync.apply_bundles(expand_bundle_paths(args.paths), args.target)
+    if success:
+        print("\n✓ Bundles applied successfully!")
+        return 0
+    print("\n✗ Some bundles were not applied. Check logs/sync_log.txt for details.")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
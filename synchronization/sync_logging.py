@@ -0,0 +1,129 @@
+"""
+Personal Finance Management System
+Synchronization Module - Logging
+Dedicated sync logger whose file and console output is written by a
+background QueueListener, off the sync critical path
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from pathlib import Path
+
+LOGGER_NAME = 'finance.sync'
+LOG_DIR = Path(__file__).resolve().parent.parent / 'logs'
+LOG_FILE = 'sync_log.txt'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Listener of the current process and the pid it was started in; a
+# forked worker process gets its own listener on first use
+_listener = None
+_listener_pid = None
+_setup_lock = threading.Lock()
+
+# Passed as extra= by warnings logged once per row, the only ones sampled
+SAMPLED = {'sampled': True}
+
+
+class RepeatedWarningSampler(logging.Filter):
+    """Samples per-row warnings that repeat the same message template
+
+    Only warnings logged with extra=SAMPLED are counted: one failed row
+    after another all share a template, because messages are formatted
+    lazily. The first `first` of each are kept, then one in every `every`,
+    tagged with the running count. Other warnings, such as the once-per-run
+    summaries, and every other level always pass. reset() starts the counts
+    over, once per sync run.
+    """
+
+    def __init__(self, first=10, every=100):
+        super().__init__()
+        self.first = first
+        self.every = every
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def filter(self, record):
+        if record.levelno != logging.WARNING or not getattr(record, 'sampled', False):
+            return True
+
+        key = (record.name, record.msg)
+        with self.lock:
+            count = self.counts.get(key, 0) + 1
+            self.counts[key] = count
+
+        if count <= self.first:
+            return True
+        if count % self.every == 0 and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (%d similar warnings so far)"
+            record.args = record.args + (count,)
+            return True
+        return False
+
+
+# One sampler per process, shared by every handler the logger gets
+_sampler = RepeatedWarningSampler()
+
+
+def reset_warning_sampler():
+    """Start the per-row warning counts over, at the start of each sync run"""
+    _sampler.reset()
+
+
+def get_sync_logger():
+    """Return the sync logger, starting its queue listener once per process
+
+    The logger does not propagate, so importing the sync modules from the
+    web app leaves the application's own logging untouched.
+    """
+    global _listener, _listener_pid
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            return logger
+
+        # Only needed once a process logs sync output
+        from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+        # Drop handlers inherited from a parent process; its listener
+        # thread does not exist here
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = RotatingFileHandler(
+            LOG_DIR / LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        file_handler.setFormatter(formatter)
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(_sampler)
+
+        logger.addHandler(queue_handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+        _listener = QueueListener(log_queue, file_handler, console_handler)
+        _listener.start()
+        _listener_pid = os.getpid()
+        atexit.register(_listener.stop)
+
+    return logger
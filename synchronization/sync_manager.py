@@ -1,113 +1,509 @@
 """
 Personal Finance Management System
-Synchronization Module - SQLite to Oracle
+Synchronization Module - SQLite <-> Oracle
 Handles bidirectional data synchronization with conflict resolution
 """
 
 import sqlite3
-import cx_Oracle
 import configparser
 import logging
+import socket
 from datetime import datetime
 from pathlib import Path
 import sys
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('sync_log.txt'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from central_store import CONNECT_FAILURES, open_store
+from code_profiler import MODES as PROFILE_MODES, profiled
+from sync_logging import LOGGER_NAME, SAMPLED, get_sync_logger, reset_warning_sampler
+from sync_metrics import SyncMetrics, row_bytes
 
-logger = logging.getLogger(__name__)
+# Queued sync logger writing to logs/sync_log.txt and the console; its
+# listener starts with the first DatabaseSync, not on import
+logger = logging.getLogger(LOGGER_NAME)
+
+# Reference data pulled from Oracle so foreign keys resolve locally.
+# Existing local rows are never overwritten.
+REFERENCE_STREAMS = [
+    {
+        'name': 'categories',
+        'oracle_select': """
+            SELECT category_id, category_name, category_type, description, is_active
+            FROM finance_category
+        """,
+        'sqlite_upsert': """
+            INSERT INTO category (category_id, category_name, category_type, description, is_active)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """,
+    },
+    {
+        'name': 'users',
+        'oracle_select': """
+            SELECT user_id, username, password_hash, email, full_name,
+                   TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS')
+            FROM finance_user
+            WHERE user_id = :user_id
+        """,
+        'sqlite_upsert': """
+            INSERT INTO user (user_id, username, password_hash, email, full_name, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """,
+    },
+]
+
+# Versioned entities synced in both directions, in foreign key order.
+#
+# Every statement of an entity uses the same column order, starting with
+# (key, row_version, modified_at), so rows read from one side can be
+# written to the other unchanged:
+#   sqlite_select  - local rows waiting to be pushed
+#   oracle_merge   - compare-and-set push; only replaces the Oracle row
+#                    of the same user when the local (row_version,
+#                    modified_at) is newer. Binds the selected columns plus
+#                    the pushing device's source name
+#   oracle_select  - Oracle rows changed since the user's pull watermark,
+#                    except those this device pushed itself (:source)
+#   sqlite_upsert  - applies pulled rows with the same newer-wins rule
+SYNC_ENTITIES = [
+    {
+        'name': 'expenses',
+        'table': 'expense',
+        'key': 'expense_id',
+        'oracle_table': 'finance_expense',
+        'sqlite_select': """
+            SELECT expense_id, row_version, modified_at, user_id, category_id, amount,
+                   expense_date, description, payment_method, created_at,
+                   COALESCE(is_deleted, 0)
+            FROM expense
+            WHERE is_synced = 0
+        """,
+        'oracle_merge': """
+            MERGE INTO finance_expense t
+            USING (
+                SELECT :1 AS expense_id, :2 AS row_version,
+                       TO_TIMESTAMP(:3, 'YYYY-MM-DD HH24:MI:SS') AS modified_at,
+                       :4 AS user_id, :5 AS category_id, :6 AS amount,
+                       TO_DATE(:7, 'YYYY-MM-DD') AS expense_date, :8 AS description,
+                       :9 AS payment_method,
+                       TO_TIMESTAMP(:10, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+                       :11 AS is_deleted, :12 AS sync_source
+                FROM DUAL
+            ) s
+            ON (t.expense_id = s.expense_id AND t.user_id = s.user_id)
+            WHEN MATCHED THEN UPDATE SET
+                t.category_id = s.category_id, t.amount = s.amount,
+                t.expense_date = s.expense_date, t.description = s.description,
+                t.payment_method = s.payment_method, t.is_deleted = s.is_deleted,
+                t.row_version = s.row_version, t.modified_at = s.modified_at,
+                t.sync_timestamp = SYSTIMESTAMP, t.sync_source = s.sync_source
+                WHERE s.row_version > t.row_version
+                   OR (s.row_version = t.row_version AND s.modified_at > t.modified_at)
+            WHEN NOT MATCHED THEN INSERT
+                (expense_id, row_version, modified_at, user_id, category_id, amount,
+                 expense_date, description, payment_method, created_at, is_deleted,
+                 sync_timestamp, sync_source)
+            VALUES
+                (s.expense_id, s.row_version, s.modified_at, s.user_id, s.category_id, s.amount,
+                 s.expense_date, s.description, s.payment_method, s.created_at, s.is_deleted,
+                 SYSTIMESTAMP, s.sync_source)
+        """,
+        'oracle_select': """
+            SELECT expense_id, row_version,
+                   TO_CHAR(modified_at, 'YYYY-MM-DD HH24:MI:SS'),
+                   user_id, category_id, amount,
+                   TO_CHAR(expense_date, 'YYYY-MM-DD'), description, payment_method,
+                   TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'), is_deleted
+            FROM finance_expense
+            WHERE user_id = :user_id
+              AND (modified_at >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                   OR (sync_timestamp >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                       AND NVL(sync_source, ' ') <> :source))
+        """,
+        'sqlite_upsert': """
+            INSERT INTO expense (expense_id, row_version, modified_at, user_id, category_id,
+                                 amount, expense_date, description, payment_method,
+                                 created_at, is_deleted, is_synced, sync_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+            ON CONFLICT(expense_id) DO UPDATE SET
+                category_id = excluded.category_id, amount = excluded.amount,
+                expense_date = excluded.expense_date, description = excluded.description,
+                payment_method = excluded.payment_method, is_deleted = excluded.is_deleted,
+                row_version = excluded.row_version, modified_at = excluded.modified_at,
+                is_synced = 1, sync_timestamp = excluded.sync_timestamp
+            WHERE (excluded.row_version, excluded.modified_at)
+                > (expense.row_version, expense.modified_at)
+              AND excluded.user_id = expense.user_id
+        """,
+    },
+    {
+        'name': 'income',
+        'table': 'income',
+        'key': 'income_id',
+        'oracle_table': 'finance_income',
+        'sqlite_select': """
+            SELECT income_id, row_version, modified_at, user_id, income_source, amount,
+                   income_date, description, created_at, COALESCE(is_deleted, 0)
+            FROM income
+            WHERE is_synced = 0
+        """,
+        'oracle_merge': """
+            MERGE INTO finance_income t
+            USING (
+                SELECT :1 AS income_id, :2 AS row_version,
+                       TO_TIMESTAMP(:3, 'YYYY-MM-DD HH24:MI:SS') AS modified_at,
+                       :4 AS user_id, :5 AS income_source, :6 AS amount,
+                       TO_DATE(:7, 'YYYY-MM-DD') AS income_date, :8 AS description,
+                       TO_TIMESTAMP(:9, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+                       :10 AS is_deleted, :11 AS sync_source
+                FROM DUAL
+            ) s
+            ON (t.income_id = s.income_id AND t.user_id = s.user_id)
+            WHEN MATCHED THEN UPDATE SET
+                t.income_source = s.income_source, t.amount = s.amount,
+                t.income_date = s.income_date, t.description = s.description,
+                t.is_deleted = s.is_deleted, t.row_version = s.row_version,
+                t.modified_at = s.modified_at, t.sync_timestamp = SYSTIMESTAMP,
+                t.sync_source = s.sync_source
+                WHERE s.row_version > t.row_version
+                   OR (s.row_version = t.row_version AND s.modified_at > t.modified_at)
+            WHEN NOT MATCHED THEN INSERT
+                (income_id, row_version, modified_at, user_id, income_source, amount,
+                 income_date, description, created_at, is_deleted, sync_timestamp, sync_source)
+            VALUES
+                (s.income_id, s.row_version, s.modified_at, s.user_id, s.income_source, s.amount,
+                 s.income_date, s.description, s.created_at, s.is_deleted, SYSTIMESTAMP,
+                 s.sync_source)
+        """,
+        'oracle_select': """
+            SELECT income_id, row_version,
+                   TO_CHAR(modified_at, 'YYYY-MM-DD HH24:MI:SS'),
+                   user_id, income_source, amount,
+                   TO_CHAR(income_date, 'YYYY-MM-DD'), description,
+                   TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'), is_deleted
+            FROM finance_income
+            WHERE user_id = :user_id
+              AND (modified_at >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                   OR (sync_timestamp >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                       AND NVL(sync_source, ' ') <> :source))
+        """,
+        'sqlite_upsert': """
+            INSERT INTO income (income_id, row_version, modified_at, user_id, income_source,
+                                amount, income_date, description, created_at, is_deleted,
+                                is_synced, sync_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+            ON CONFLICT(income_id) DO UPDATE SET
+                income_source = excluded.income_source, amount = excluded.amount,
+                income_date = excluded.income_date, description = excluded.description,
+                is_deleted = excluded.is_deleted, row_version = excluded.row_version,
+                modified_at = excluded.modified_at, is_synced = 1,
+                sync_timestamp = excluded.sync_timestamp
+            WHERE (excluded.row_version, excluded.modified_at)
+                > (income.row_version, income.modified_at)
+              AND excluded.user_id = income.user_id
+        """,
+    },
+    {
+        'name': 'budgets',
+        'table': 'budget',
+        'key': 'budget_id',
+        'oracle_table': 'finance_budget',
+        'sqlite_select': """
+            SELECT budget_id, row_version, modified_at, user_id, category_id, budget_amount,
+                   start_date, end_date, is_active, created_at, COALESCE(is_deleted, 0)
+            FROM budget
+            WHERE is_synced = 0
+        """,
+        'oracle_merge': """
+            MERGE INTO finance_budget t
+            USING (
+                SELECT :1 AS budget_id, :2 AS row_version,
+                       TO_TIMESTAMP(:3, 'YYYY-MM-DD HH24:MI:SS') AS modified_at,
+                       :4 AS user_id, :5 AS category_id, :6 AS budget_amount,
+                       TO_DATE(:7, 'YYYY-MM-DD') AS start_date,
+                       TO_DATE(:8, 'YYYY-MM-DD') AS end_date, :9 AS is_active,
+                       TO_TIMESTAMP(:10, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+                       :11 AS is_deleted, :12 AS sync_source
+                FROM DUAL
+            ) s
+            ON (t.budget_id = s.budget_id AND t.user_id = s.user_id)
+            WHEN MATCHED THEN UPDATE SET
+                t.category_id = s.category_id, t.budget_amount = s.budget_amount,
+                t.start_date = s.start_date, t.end_date = s.end_date,
+                t.is_active = s.is_active, t.is_deleted = s.is_deleted,
+                t.row_version = s.row_version, t.modified_at = s.modified_at,
+                t.sync_timestamp = SYSTIMESTAMP, t.sync_source = s.sync_source
+                WHERE s.row_version > t.row_version
+                   OR (s.row_version = t.row_version AND s.modified_at > t.modified_at)
+            WHEN NOT MATCHED THEN INSERT
+                (budget_id, row_version, modified_at, user_id, category_id, budget_amount,
+                 start_date, end_date, is_active, created_at, is_deleted, sync_timestamp,
+                 sync_source)
+            VALUES
+                (s.budget_id, s.row_version, s.modified_at, s.user_id, s.category_id,
+                 s.budget_amount, s.start_date, s.end_date, s.is_active, s.created_at,
+                 s.is_deleted, SYSTIMESTAMP, s.sync_source)
+        """,
+        'oracle_select': """
+            SELECT budget_id, row_version,
+                   TO_CHAR(modified_at, 'YYYY-MM-DD HH24:MI:SS'),
+                   user_id, category_id, budget_amount,
+                   TO_CHAR(start_date, 'YYYY-MM-DD'), TO_CHAR(end_date, 'YYYY-MM-DD'),
+                   is_active, TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'), is_deleted
+            FROM finance_budget
+            WHERE user_id = :user_id
+              AND (modified_at >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                   OR (sync_timestamp >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                       AND NVL(sync_source, ' ') <> :source))
+        """,
+        'sqlite_upsert': """
+            INSERT INTO budget (budget_id, row_version, modified_at, user_id, category_id,
+                                budget_amount, start_date, end_date, is_active, created_at,
+                                is_deleted, is_synced, sync_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+            ON CONFLICT(budget_id) DO UPDATE SET
+                category_id = excluded.category_id, budget_amount = excluded.budget_amount,
+                start_date = excluded.start_date, end_date = excluded.end_date,
+                is_active = excluded.is_active, is_deleted = excluded.is_deleted,
+                row_version = excluded.row_version, modified_at = excluded.modified_at,
+                is_synced = 1, sync_timestamp = excluded.sync_timestamp
+            WHERE (excluded.row_version, excluded.modified_at)
+                > (budget.row_version, budget.modified_at)
+              AND excluded.user_id = budget.user_id
+        """,
+    },
+    {
+        'name': 'savings goals',
+        'table': 'savings_goal',
+        'key': 'goal_id',
+        'oracle_table': 'finance_savings_goal',
+        'sqlite_select': """
+            SELECT goal_id, row_version, modified_at, user_id, goal_name, target_amount,
+                   current_amount, start_date, deadline, priority, status, created_at,
+                   COALESCE(is_deleted, 0)
+            FROM savings_goal
+            WHERE is_synced = 0
+        """,
+        'oracle_merge': """
+            MERGE INTO finance_savings_goal t
+            USING (
+                SELECT :1 AS goal_id, :2 AS row_version,
+                       TO_TIMESTAMP(:3, 'YYYY-MM-DD HH24:MI:SS') AS modified_at,
+                       :4 AS user_id, :5 AS goal_name, :6 AS target_amount,
+                       :7 AS current_amount, TO_DATE(:8, 'YYYY-MM-DD') AS start_date,
+                       TO_DATE(:9, 'YYYY-MM-DD') AS deadline, :10 AS priority,
+                       :11 AS status,
+                       TO_TIMESTAMP(:12, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+                       :13 AS is_deleted, :14 AS sync_source
+                FROM DUAL
+            ) s
+            ON (t.goal_id = s.goal_id AND t.user_id = s.user_id)
+            WHEN MATCHED THEN UPDATE SET
+                t.goal_name = s.goal_name, t.target_amount = s.target_amount,
+                t.current_amount = s.current_amount, t.start_date = s.start_date,
+                t.deadline = s.deadline, t.priority = s.priority, t.status = s.status,
+                t.is_deleted = s.is_deleted, t.row_version = s.row_version,
+                t.modified_at = s.modified_at, t.sync_timestamp = SYSTIMESTAMP,
+                t.sync_source = s.sync_source
+                WHERE s.row_version > t.row_version
+                   OR (s.row_version = t.row_version AND s.modified_at > t.modified_at)
+            WHEN NOT MATCHED THEN INSERT
+                (goal_id, row_version, modified_at, user_id, goal_name, target_amount,
+                 current_amount, start_date, deadline, priority, status, created_at,
+                 is_deleted, sync_timestamp, sync_source)
+            VALUES
+                (s.goal_id, s.row_version, s.modified_at, s.user_id, s.goal_name,
+                 s.target_amount, s.current_amount, s.start_date, s.deadline, s.priority,
+                 s.status, s.created_at, s.is_deleted, SYSTIMESTAMP, s.sync_source)
+        """,
+        'oracle_select': """
+            SELECT goal_id, row_version,
+                   TO_CHAR(modified_at, 'YYYY-MM-DD HH24:MI:SS'),
+                   user_id, goal_name, target_amount, current_amount,
+                   TO_CHAR(start_date, 'YYYY-MM-DD'), TO_CHAR(deadline, 'YYYY-MM-DD'),
+                   priority, status, TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'),
+                   is_deleted
+            FROM finance_savings_goal
+            WHERE user_id = :user_id
+              AND (modified_at >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                   OR (sync_timestamp >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+                       AND NVL(sync_source, ' ') <> :source))
+        """,
+        'sqlite_upsert': """
+            INSERT INTO savings_goal (goal_id, row_version, modified_at, user_id, goal_name,
+                                      target_amount, current_amount, start_date, deadline,
+                                      priority, status, created_at, is_deleted,
+                                      is_synced, sync_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+            ON CONFLICT(goal_id) DO UPDATE SET
+                goal_name = excluded.goal_name, target_amount = excluded.target_amount,
+                current_amount = excluded.current_amount, start_date = excluded.start_date,
+                deadline = excluded.deadline, priority = excluded.priority,
+                status = excluded.status, is_deleted = excluded.is_deleted,
+                row_version = excluded.row_version, modified_at = excluded.modified_at,
+                is_synced = 1, sync_timestamp = excluded.sync_timestamp
+            WHERE (excluded.row_version, excluded.modified_at)
+                > (savings_goal.row_version, savings_goal.modified_at)
+              AND excluded.user_id = savings_goal.user_id
+        """,
+    },
+]
+
+# Savings contributions are insert-only and carry no row version. They
+# are pushed after goals (foreign key) with an insert-only MERGE flagged
+# synced_from_local = 1, so trg_contribution_ai does not add them to the
+# goal a second time: the goal row pushed before them already carries
+# the device's total, just as a pulled goal carries central's. Pulled
+# contributions are inserted with is_synced = 1, which
+# trg_update_goal_amount skips locally.
+CONTRIBUTION_STREAM = {
+    'name': 'savings contributions',
+    'sqlite_select': """
+        SELECT contribution_id, goal_id, contribution_amount, contribution_date,
+               description, created_at
+        FROM savings_contribution
+        WHERE is_synced = 0
+        ORDER BY goal_id, contribution_id
+    """,
+    'oracle_merge': """
+        MERGE INTO finance_savings_contribution t
+        USING (
+            SELECT :1 AS contribution_id, :2 AS goal_id, :3 AS contribution_amount,
+                   TO_DATE(:4, 'YYYY-MM-DD') AS contribution_date, :5 AS description,
+                   TO_TIMESTAMP(:6, 'YYYY-MM-DD HH24:MI:SS') AS created_at,
+                   :7 AS sync_source
+            FROM DUAL
+        ) s
+        ON (t.contribution_id = s.contribution_id)
+        WHEN NOT MATCHED THEN INSERT
+            (contribution_id, goal_id, contribution_amount, contribution_date,
+             description, created_at, synced_from_local, sync_timestamp, sync_source)
+        VALUES
+            (s.contribution_id, s.goal_id, s.contribution_amount, s.contribution_date,
+             s.description, s.created_at, 1, SYSTIMESTAMP, s.sync_source)
+    """,
+    'oracle_select': """
+        SELECT c.contribution_id, c.goal_id, c.contribution_amount,
+               TO_CHAR(c.contribution_date, 'YYYY-MM-DD'), c.description,
+               TO_CHAR(c.created_at, 'YYYY-MM-DD HH24:MI:SS')
+        FROM finance_savings_contribution c
+        JOIN finance_savings_goal g ON g.goal_id = c.goal_id
+        WHERE g.user_id = :user_id
+          AND NVL(c.sync_timestamp, c.created_at) >= TO_TIMESTAMP(:since, 'YYYY-MM-DD HH24:MI:SS')
+          AND NVL(c.sync_source, ' ') <> :source
+    """,
+    'sqlite_upsert': """
+        INSERT INTO savings_contribution (contribution_id, goal_id, contribution_amount,
+                                          contribution_date, description, created_at,
+                                          is_synced, sync_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        ON CONFLICT(contribution_id) DO NOTHING
+    """,
+}
+
+# Position of user_id in the sqlite_select of every SYNC_ENTITIES entry,
+# right after (key, row_version, modified_at)
+USER_COLUMN = 3
+
+# Fixed round trips of one user's sync besides the entity batches: users,
+# create/complete sync log and the pull watermark
+FIXED_ROUND_TRIPS = 4
+
+# Watermark used when a user has never pulled before (full bootstrap)
+INITIAL_WATERMARK = '1900-01-01 00:00:00'
+
+
+def paged_pending_sql(select_sql, key):
+    """Keyset-paged form of a pending-rows query, bound as (last key, limit)"""
+    return f"SELECT * FROM ({select_sql}) WHERE {key} > ? ORDER BY {key} LIMIT ?"
 
 
 class DatabaseSync:
     """Handles synchronization between SQLite and Oracle databases"""
     
-    def __init__(self, config_file='config.ini'):
-        """Initialize database connections"""
+    def __init__(self, config_file='config.ini', sqlite_path=None, oracle_pool=None):
+        """Initialize database connections
+        
+        sqlite_path overrides the database in the config file, and with an
+        oracle_pool the Oracle connection is borrowed from the pool (closing
+        it hands it back) instead of opened per run.
+        
+        "Oracle" is the central store selected under [central]: Oracle
+        itself, or the local stand-in with the same schema.
+        """
+        get_sync_logger()
         self.config = configparser.ConfigParser()
         self.config.read(config_file)
+        self.sqlite_path = sqlite_path
+        self.oracle_pool = oracle_pool
+        self.store = open_store(self.config)
+        # Stamped on the rows this device pushes, so its pulls skip them
+        self.source_name = (self.config.get('bundle', 'source_name', fallback='')
+                            or socket.gethostname())
         
         self.sqlite_conn = None
         self.oracle_conn = None
         self.sync_log_id = None
         self.records_synced = 0
+        self.batch_size = self.config.getint('sync', 'batch_size', fallback=500)
+        self.number_list_type = None
+        self.conflicts = {}
+        self.failed_rows = {}
+        self.failed_phases = []
+        self.status = None
+        self.unchanged_skipped = 0
+        self.metrics = SyncMetrics()
         
     def connect_sqlite(self):
         """Connect to SQLite database"""
         try:
-            db_path = self.config['sqlite']['database_path']
+            db_path = self.sqlite_path or self.config['sqlite']['database_path']
             self.sqlite_conn = sqlite3.connect(db_path)
             self.sqlite_conn.row_factory = sqlite3.Row
-            logger.info(f"Connected to SQLite database: {db_path}")
+            logger.info("Connected to SQLite database: %s", db_path)
             return True
         except Exception as e:
-            logger.error(f"SQLite connection failed: {str(e)}")
+            logger.error("SQLite connection failed: %s", e)
             return False
     
     def connect_oracle(self):
-        """Connect to Oracle database"""
+        """Connect to the central store"""
         try:
-            username = self.config['oracle']['username']
-            password = self.config['oracle']['password']
-            host = self.config['oracle']['host']
-            port = self.config['oracle']['port']
-            
-            # Check if using SID or service_name
-            if 'sid' in self.config['oracle']:
-                sid = self.config['oracle']['sid']
-                dsn = cx_Oracle.makedsn(host, port, sid=sid)
-                logger.info(f"Connecting to Oracle database: {host}:{port}/{sid}")
-            else:
-                service_name = self.config['oracle']['service_name']
-                dsn = cx_Oracle.makedsn(host, port, service_name=service_name)
-                logger.info(f"Connecting to Oracle database: {host}:{port}/{service_name}")
+            if self.oracle_pool is not None:
+                self.oracle_conn = self.oracle_pool.acquire()
+                return True
             
-            self.oracle_conn = cx_Oracle.connect(username, password, dsn)
-            logger.info("Oracle connection successful")
+            self.oracle_conn = self.store.connect()
+            logger.info("%s connection successful", self.store.label)
             return True
         except Exception as e:
-            logger.error(f"Oracle connection failed: {str(e)}")
+            logger.error("%s connection failed: %s", self.store.label, e)
+            CONNECT_FAILURES.labels(self.store.name).inc()
             return False
     
     def create_sync_log(self, user_id, sync_type='Manual'):
         """Create sync log entry in Oracle"""
         try:
             cursor = self.oracle_conn.cursor()
-            sync_log_id_var = cursor.var(cx_Oracle.NUMBER)
-            
-            cursor.callproc('pkg_finance_crud.create_sync_log', [
-                user_id,
-                sync_type,
-                sync_log_id_var
-            ])
-            
-            self.sync_log_id = int(sync_log_id_var.getvalue())
-            logger.info(f"Created sync log: {self.sync_log_id}")
+            self.sync_log_id = self.store.create_sync_log(cursor, user_id, sync_type)
+            self.metrics.add(round_trips=1)
+            logger.info("Created sync log: %s", self.sync_log_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to create sync log: {str(e)}")
+            logger.error("Failed to create sync log: %s", e)
             return False
     
     def complete_sync_log(self, status, error_message=None):
         """Complete sync log entry"""
         try:
             cursor = self.oracle_conn.cursor()
-            cursor.callproc('pkg_finance_crud.complete_sync_log', [
-                self.sync_log_id,
-                self.records_synced,
-                status,
-                error_message
-            ])
-            logger.info(f"Completed sync log: {status}, Records: {self.records_synced}")
+            self.store.complete_sync_log(cursor, self.sync_log_id, self.records_synced,
+                                         status, error_message)
+            self.metrics.add(round_trips=1)
+            logger.info("Completed sync log: %s, Records: %s", status, self.records_synced)
             return True
         except Exception as e:
-            logger.error(f"Failed to complete sync log: {str(e)}")
+            logger.error("Failed to complete sync log: %s", e)
             return False
     
     def sync_users(self):
@@ -124,6 +520,7 @@ class DatabaseSync:
             
             users = sqlite_cursor.fetchall()
             synced_count = 0
+            failed_count = 0
             
             for user in users:
                 try:
@@ -148,450 +545,654 @@ class DatabaseSync:
                             user['created_at']
                         ])
                         synced_count += 1
-                        logger.info(f"Synced user: {user['username']}")
+                        logger.debug("Synced user: %s", user['username'])
                     
                 except Exception as e:
-                    logger.warning(f"Failed to sync user {user['username']}: {str(e)}")
+                    logger.warning("Failed to sync user %s: %s", user['username'], e, extra=SAMPLED)
+                    failed_count += 1
                     continue
             
             self.oracle_conn.commit()
+            self.metrics.add(rows=synced_count, failures=failed_count,
+                             round_trips=len(users) + synced_count + 1)
             self.records_synced += synced_count
-            logger.info(f"Users synced: {synced_count}")
+            logger.info("Users synced: %s", synced_count)
             return synced_count
             
         except Exception as e:
-            logger.error(f"User sync failed: {str(e)}")
+            logger.error("User sync failed: %s", e)
+            self.failed_phases.append('users')
             self.oracle_conn.rollback()
             return 0
     
-    def sync_expenses(self):
-        """Sync expenses from SQLite to Oracle"""
-        try:
-            sqlite_cursor = self.sqlite_conn.cursor()
+    def get_entity(self, name):
+        """Look up a versioned entity definition by name"""
+        for entity in SYNC_ENTITIES:
+            if entity['name'] == name:
+                return entity
+        raise KeyError(name)
+    
+    def number_list(self, values):
+        """Bind value for a list of keys read with TABLE(:name)"""
+        if self.number_list_type is None:
+            self.number_list_type = self.store.number_list_type(self.oracle_conn)
+        return self.store.number_list(self.number_list_type, values)
+    
+    def fetch_central_versions(self, entity, keys):
+        """Fetch (user_id, (row_version, modified_at)) of the given keys from Oracle in one round trip"""
+        key_list = self.number_list(keys)
+        
+        oracle_cursor = self.oracle_conn.cursor()
+        oracle_cursor.arraysize = self.batch_size
+        oracle_cursor.execute(f"""
+            SELECT {entity['key']}, user_id, row_version,
+                   TO_CHAR(modified_at, 'YYYY-MM-DD HH24:MI:SS')
+            FROM {entity['oracle_table']}
+            WHERE {entity['key']} IN (SELECT column_value FROM TABLE(:keys))
+        """, keys=key_list)
+        
+        rows = oracle_cursor.fetchall()
+        self.metrics.add(round_trips=1 + len(rows) // self.batch_size,
+                         bytes_fetched=row_bytes(rows))
+        return {row[0]: (row[1], (row[2], row[3])) for row in rows}
+    
+    def push_batch(self, entity, rows, source=None):
+        """Push one batch of local rows to Oracle with a compare-and-set MERGE
+        
+        Rows already identical in Oracle are not sent, rows where Oracle holds
+        a newer version are reported as conflicts, and rows Oracle rejects or
+        whose key belongs to another user there are added to failed_rows.
+        Returns the keys that are now in step with Oracle and can be marked
+        as synced locally. Sent rows are stamped with source (this device by
+        default).
+        """
+        central = self.fetch_central_versions(entity, [row[0] for row in rows])
+        source = source or self.source_name
+        
+        to_send = []
+        in_step = []
+        conflicts = []
+        for row in rows:
+            key, local_version = row[0], (row[1], row[2])
+            owner, central_version = central.get(key, (row[USER_COLUMN], None))
+            if owner != row[USER_COLUMN]:
+                # Another device created the same key for a different user
+                logger.warning("Failed to sync %s %s: the key belongs to user %s in %s",
+                               entity['name'], key, owner, self.store.label, extra=SAMPLED)
+                self.failed_rows.setdefault(entity['name'], []).append(key)
+            elif central_version is None or central_version < local_version:
+                to_send.append(row)
+            elif central_version == local_version:
+                in_step.append((key, row[1]))
+                self.unchanged_skipped += 1
+            else:
+                conflicts.append((key, local_version, central_version))
+        
+        if to_send:
             oracle_cursor = self.oracle_conn.cursor()
+            failed, row_counts = self.store.execute_batch(oracle_cursor, entity['oracle_merge'],
+                                                          [row + (source,) for row in to_send],
+                                                          row_counts=True)
+            self.metrics.add(round_trips=1, failures=len(failed))
             
-            # Get unsynced expenses from SQLite
-            sqlite_cursor.execute("""
-                SELECT expense_id, user_id, category_id, amount, expense_date,
-                       description, payment_method, created_at, modified_at, is_deleted
-                FROM expense
-                WHERE is_synced = 0
-            """)
+            count_index = 0
+            for offset, row in enumerate(to_send):
+                if offset in failed:
+                    logger.warning(
+                        "Failed to sync %s %s: %s",
+                        entity['name'], row[0], failed[offset], extra=SAMPLED
+                    )
+                    self.failed_rows.setdefault(entity['name'], []).append(row[0])
+                    continue
+                applied = row_counts[count_index]
+                count_index += 1
+                if applied:
+                    in_step.append((row[0], row[1]))
+                else:
+                    # Oracle changed between the version check and the MERGE
+                    conflicts.append((row[0], (row[1], row[2]), None))
+        
+        if conflicts:
+            self.conflicts.setdefault(entity['name'], []).extend(conflicts)
+        return in_step
+    
+    def failed_row_count(self):
+        """Rows Oracle rejected so far in this run"""
+        return sum(len(keys) for keys in self.failed_rows.values())
+    
+    def failure_summary(self):
+        """Describe the failed phases and rejected rows of this run, or None"""
+        problems = []
+        if self.failed_phases:
+            problems.append(f"Failed: {', '.join(self.failed_phases)}")
+        for name, keys in self.failed_rows.items():
+            problems.append(f"{len(keys)} {name} rejected")
+        return '; '.join(problems) or None
+    
+    def iter_pending(self, select_sql, key):
+        """Yield the rows of a pending-rows query in chunks of batch_size, as tuples
+        
+        Each chunk is a fresh keyset-paged query (key > last key seen), so
+        no cursor stays open while the caller marks rows as synced, and
+        memory is bounded by the chunk size rather than the table size.
+        """
+        paged_sql = paged_pending_sql(select_sql, key)
+        cursor = self.sqlite_conn.cursor()
+        # Plain tuples bind straight into executemany on either side
+        cursor.row_factory = None
+        
+        last_key = float('-inf')
+        while True:
+            rows = cursor.execute(paged_sql, (last_key, self.batch_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_key = rows[-1][0]
+    
+    def push_entity(self, entity):
+        """Push pending rows of one entity from SQLite to Oracle in batches"""
+        try:
+            sqlite_cursor = self.sqlite_conn.cursor()
             
-            expenses = sqlite_cursor.fetchall()
             synced_count = 0
-            
-            for expense_row in expenses:
-                try:
-                    # Convert Row to dict for easier access
-                    expense = dict(expense_row)
-                    
-                    # Check if expense already exists in Oracle
-                    oracle_cursor.execute("""
-                        SELECT expense_id FROM finance_expense WHERE expense_id = :1
-                    """, [expense['expense_id']])
-                    
-                    exists = oracle_cursor.fetchone()
-                    
-                    if exists:
-                        # Update existing expense (conflict resolution - last modified wins)
-                        oracle_cursor.execute("""
-                            UPDATE finance_expense
-                            SET amount = :1, category_id = :2, expense_date = TO_DATE(:3, 'YYYY-MM-DD'),
-                                description = :4, payment_method = :5, is_deleted = :6, 
-                                modified_at = SYSTIMESTAMP, sync_timestamp = SYSTIMESTAMP
-                            WHERE expense_id = :7
-                        """, [
-                            expense['amount'],
-                            expense['category_id'],
-                            expense['expense_date'],
-                            expense['description'],
-                            expense['payment_method'],
-                            expense.get('is_deleted', 0),
-                            expense['expense_id']
-                        ])
-                    else:
-                        # Insert new expense
-                        oracle_cursor.execute("""
-                            INSERT INTO finance_expense 
-                            (expense_id, user_id, category_id, amount, expense_date, 
-                             description, payment_method, is_deleted, created_at, modified_at, sync_timestamp)
-                            VALUES (:1, :2, :3, :4, TO_DATE(:5, 'YYYY-MM-DD'), 
-                                    :6, :7, :8, TO_TIMESTAMP(:9, 'YYYY-MM-DD HH24:MI:SS'), 
-                                    TO_TIMESTAMP(:10, 'YYYY-MM-DD HH24:MI:SS'), SYSTIMESTAMP)
-                        """, [
-                            expense['expense_id'],
-                            expense['user_id'],
-                            expense['category_id'],
-                            expense['amount'],
-                            expense['expense_date'],
-                            expense['description'],
-                            expense['payment_method'],
-                            expense.get('is_deleted', 0),
-                            expense['created_at'],
-                            expense['modified_at']
-                        ])
-                    
-                    # Mark as synced in SQLite
-                    sqlite_cursor.execute("""
-                        UPDATE expense 
-                        SET is_synced = 1, sync_timestamp = datetime('now')
-                        WHERE expense_id = ?
-                    """, [expense['expense_id']])
-                    
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to sync expense {expense['expense_id']}: {str(e)}")
-                    continue
+            for batch in self.iter_pending(entity['sqlite_select'], entity['key']):
+                in_step = self.push_batch(entity, batch)
+                
+                # Only mark rows that were not edited again while syncing
+                sqlite_cursor.executemany(f"""
+                    UPDATE {entity['table']}
+                    SET is_synced = 1, sync_timestamp = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                    WHERE {entity['key']} = ? AND row_version = ?
+                """, in_step)
+                synced_count += len(in_step)
             
             self.oracle_conn.commit()
             self.sqlite_conn.commit()
+            self.metrics.add(rows=synced_count, round_trips=1)
             self.records_synced += synced_count
-            logger.info(f"Expenses synced: {synced_count}")
-            return synced_count
+            logger.info("%s synced: %s", entity['name'].capitalize(), synced_count)
             
+            conflicts = self.conflicts.get(entity['name'], [])
+            if conflicts:
+                logger.warning(
+                    "%s %s changed in Oracle after the local edit and were not pushed: %s",
+                    len(conflicts), entity['name'], [conflict[0] for conflict in conflicts]
+                )
+            return synced_count
+        
         except Exception as e:
-            logger.error(f"Expense sync failed: {str(e)}")
+            logger.error("%s sync failed: %s", entity['name'].capitalize(), e)
+            self.failed_phases.append(entity['name'])
             self.oracle_conn.rollback()
             self.sqlite_conn.rollback()
             return 0
     
+    def sync_expenses(self):
+        """Sync expenses from SQLite to Oracle"""
+        return self.push_entity(self.get_entity('expenses'))
+    
     def sync_income(self):
         """Sync income records from SQLite to Oracle"""
+        return self.push_entity(self.get_entity('income'))
+    
+    def sync_budgets(self):
+        """Sync budgets from SQLite to Oracle"""
+        return self.push_entity(self.get_entity('budgets'))
+    
+    def sync_savings_goals(self):
+        """Sync savings goals from SQLite to Oracle"""
+        return self.push_entity(self.get_entity('savings goals'))
+    
+    def push_contribution_batch(self, batch, source=None):
+        """Insert one batch of contributions into Oracle, stamped with source
+        
+        Returns the rows that are now in Oracle.
+        """
+        source = source or self.source_name
+        oracle_cursor = self.oracle_conn.cursor()
+        failed, _ = self.store.execute_batch(oracle_cursor, CONTRIBUTION_STREAM['oracle_merge'],
+                                             [row + (source,) for row in batch])
+        sent = []
+        for offset, row in enumerate(batch):
+            if offset in failed:
+                logger.warning("Failed to sync contribution %s: %s", row[0], failed[offset],
+                               extra=SAMPLED)
+                self.failed_rows.setdefault(CONTRIBUTION_STREAM['name'], []).append(row[0])
+            else:
+                sent.append(row)
+        self.metrics.add(round_trips=1, failures=len(failed))
+        return sent
+    
+    def sync_contributions(self):
+        """Sync savings contributions from SQLite to Oracle in array-bound batches"""
         try:
             sqlite_cursor = self.sqlite_conn.cursor()
-            oracle_cursor = self.oracle_conn.cursor()
-            
-            # Get unsynced income from SQLite
-            sqlite_cursor.execute("""
-                SELECT income_id, user_id, income_source, amount, income_date,
-                       description, created_at, modified_at, is_deleted
-                FROM income
-                WHERE is_synced = 0
-            """)
             
-            incomes = sqlite_cursor.fetchall()
             synced_count = 0
-            
-            for income_row in incomes:
-                try:
-                    # Convert Row to dict for easier access
-                    income = dict(income_row)
-                    
-                    # Check if income exists in Oracle
-                    oracle_cursor.execute("""
-                        SELECT income_id FROM finance_income WHERE income_id = :1
-                    """, [income['income_id']])
-                    
-                    exists = oracle_cursor.fetchone()
-                    
-                    if exists:
-                        # Update existing income
-                        oracle_cursor.execute("""
-                            UPDATE finance_income
-                            SET amount = :1, income_source = :2, income_date = TO_DATE(:3, 'YYYY-MM-DD'),
-                                description = :4, is_deleted = :5, modified_at = SYSTIMESTAMP, 
-                                sync_timestamp = SYSTIMESTAMP
-                            WHERE income_id = :6
-                        """, [
-                            income['amount'],
-                            income['income_source'],
-                            income['income_date'],
-                            income['description'],
-                            income.get('is_deleted', 0),
-                            income['income_id']
-                        ])
-                    else:
-                        # Insert new income
-                        oracle_cursor.execute("""
-                            INSERT INTO finance_income 
-                            (income_id, user_id, income_source, amount, income_date, 
-                             description, is_deleted, created_at, modified_at, sync_timestamp)
-                            VALUES (:1, :2, :3, :4, TO_DATE(:5, 'YYYY-MM-DD'), 
-                                    :6, :7, TO_TIMESTAMP(:8, 'YYYY-MM-DD HH24:MI:SS'), 
-                                    TO_TIMESTAMP(:9, 'YYYY-MM-DD HH24:MI:SS'), SYSTIMESTAMP)
-                        """, [
-                            income['income_id'],
-                            income['user_id'],
-                            income['income_source'],
-                            income['amount'],
-                            income['income_date'],
-                            income['description'],
-                            income.get('is_deleted', 0),
-                            income['created_at'],
-                            income['modified_at']
-                        ])
-                    
-                    # Mark as synced in SQLite
-                    sqlite_cursor.execute("""
-                        UPDATE income 
-                        SET is_synced = 1, sync_timestamp = datetime('now')
-                        WHERE income_id = ?
-                    """, [income['income_id']])
-                    
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to sync income {income['income_id']}: {str(e)}")
-                    continue
+            for batch in self.iter_pending(CONTRIBUTION_STREAM['sqlite_select'], 'contribution_id'):
+                sent = self.push_contribution_batch(batch)
+                
+                sqlite_cursor.executemany("""
+                    UPDATE savings_contribution
+                    SET is_synced = 1, sync_timestamp = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                    WHERE contribution_id = ?
+                """, [(row[0],) for row in sent])
+                synced_count += len(sent)
             
             self.oracle_conn.commit()
             self.sqlite_conn.commit()
+            self.metrics.add(rows=synced_count, round_trips=1)
             self.records_synced += synced_count
-            logger.info(f"Income records synced: {synced_count}")
+            logger.info("Savings contributions synced: %s", synced_count)
             return synced_count
             
         except Exception as e:
-            logger.error(f"Income sync failed: {str(e)}")
+            logger.error("Savings contribution sync failed: %s", e)
+            self.failed_phases.append(CONTRIBUTION_STREAM['name'])
             self.oracle_conn.rollback()
             self.sqlite_conn.rollback()
             return 0
     
-    def sync_budgets(self):
-        """Sync budgets from SQLite to Oracle"""
+    def get_pull_watermark(self, user_id):
+        """Get the last Oracle time this user's changes were pulled up to"""
+        row = self.sqlite_conn.execute(
+            "SELECT last_sync FROM user WHERE user_id = ?", [user_id]
+        ).fetchone()
+        if row and row['last_sync']:
+            return row['last_sync']
+        return INITIAL_WATERMARK
+    
+    def pull_binds(self, stream, user_id, since):
+        """Bind values of a stream's oracle_select
+        
+        A bootstrap pull also fetches the rows this device pushed before,
+        which a new database under the same source name does not have.
+        """
+        binds = {}
+        if ':user_id' in stream['oracle_select']:
+            binds['user_id'] = user_id
+        if ':since' in stream['oracle_select']:
+            binds['since'] = since
+        if ':source' in stream['oracle_select']:
+            binds['source'] = '' if since == INITIAL_WATERMARK else self.source_name
+        return binds
+    
+    def pull_stream(self, stream, user_id, since):
+        """Pull one stream from Oracle into SQLite using array fetches"""
+        oracle_cursor = self.oracle_conn.cursor()
+        oracle_cursor.arraysize = self.batch_size
+        sqlite_cursor = self.sqlite_conn.cursor()
+        
+        oracle_cursor.execute(stream['oracle_select'], self.pull_binds(stream, user_id, since))
+        self.metrics.add(round_trips=1)
+        
+        pulled_count = 0
+        while True:
+            rows = oracle_cursor.fetchmany()
+            self.metrics.add(round_trips=1, bytes_fetched=row_bytes(rows))
+            if not rows:
+                break
+            sqlite_cursor.executemany(stream['sqlite_upsert'], rows)
+            pulled_count += sqlite_cursor.rowcount
+        self.metrics.add(rows=pulled_count)
+        
+        logger.info("Pulled %s: %s", stream['name'], pulled_count)
+        return pulled_count
+    
+    def pull_changes(self, user_id):
+        """Pull rows changed in Oracle since the user's watermark into SQLite"""
         try:
-            sqlite_cursor = self.sqlite_conn.cursor()
-            oracle_cursor = self.oracle_conn.cursor()
+            since = self.get_pull_watermark(user_id)
             
-            # Get unsynced budgets from SQLite
-            sqlite_cursor.execute("""
-                SELECT budget_id, user_id, category_id, budget_amount, 
-                       start_date, end_date, is_active, created_at, modified_at, is_deleted
-                FROM budget
-                WHERE is_synced = 0
-            """)
+            # Capture the new watermark before reading so rows written while
+            # the pull runs are picked up again next time
+            oracle_cursor = self.oracle_conn.cursor()
+            oracle_cursor.execute(
+                "SELECT TO_CHAR(SYSTIMESTAMP, 'YYYY-MM-DD HH24:MI:SS') FROM DUAL"
+            )
+            next_watermark = oracle_cursor.fetchone()[0]
+            self.metrics.add(round_trips=1)
             
-            budgets = sqlite_cursor.fetchall()
-            synced_count = 0
+            if since == INITIAL_WATERMARK:
+                logger.info("No previous pull for user %s, bootstrapping from Oracle", user_id)
+            else:
+                logger.info("Pulling changes for user %s since %s", user_id, since)
             
-            for budget_row in budgets:
-                try:
-                    # Convert Row to dict for easier access
-                    budget = dict(budget_row)
-                    
-                    # Check if budget exists in Oracle
-                    oracle_cursor.execute("""
-                        SELECT budget_id FROM finance_budget WHERE budget_id = :1
-                    """, [budget['budget_id']])
-                    
-                    exists = oracle_cursor.fetchone()
-                    
-                    if exists:
-                        # Update existing budget
-                        oracle_cursor.execute("""
-                            UPDATE finance_budget
-                            SET budget_amount = :1, start_date = TO_DATE(:2, 'YYYY-MM-DD'),
-                                end_date = TO_DATE(:3, 'YYYY-MM-DD'), is_active = :4, is_deleted = :5,
-                                modified_at = SYSTIMESTAMP
-                            WHERE budget_id = :6
-                        """, [
-                            budget['budget_amount'],
-                            budget['start_date'],
-                            budget['end_date'],
-                            budget['is_active'],
-                            budget.get('is_deleted', 0),
-                            budget['budget_id']
-                        ])
-                    else:
-                        # Insert new budget
-                        oracle_cursor.execute("""
-                            INSERT INTO finance_budget 
-                            (budget_id, user_id, category_id, budget_amount, start_date, end_date,
-                             is_active, is_deleted, created_at, modified_at)
-                            VALUES (:1, :2, :3, :4, TO_DATE(:5, 'YYYY-MM-DD'), TO_DATE(:6, 'YYYY-MM-DD'),
-                                    :7, :8, TO_TIMESTAMP(:9, 'YYYY-MM-DD HH24:MI:SS'), 
-                                    TO_TIMESTAMP(:10, 'YYYY-MM-DD HH24:MI:SS'))
-                        """, [
-                            budget['budget_id'],
-                            budget['user_id'],
-                            budget['category_id'],
-                            budget['budget_amount'],
-                            budget['start_date'],
-                            budget['end_date'],
-                            budget['is_active'],
-                            budget.get('is_deleted', 0),
-                            budget['created_at'],
-                            budget['modified_at']
-                        ])
-                    
-                    # Mark as synced in SQLite
-                    sqlite_cursor.execute("""
-                        UPDATE budget 
-                        SET is_synced = 1
-                        WHERE budget_id = ?
-                    """, [budget['budget_id']])
-                    
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to sync budget {budget['budget_id']}: {str(e)}")
-                    continue
+            pulled_count = 0
+            for stream in REFERENCE_STREAMS + SYNC_ENTITIES + [CONTRIBUTION_STREAM]:
+                pulled_count += self.pull_stream(stream, user_id, since)
             
-            self.oracle_conn.commit()
+            self.sqlite_conn.execute(
+                "UPDATE user SET last_sync = ? WHERE user_id = ?",
+                [next_watermark, user_id]
+            )
             self.sqlite_conn.commit()
-            self.records_synced += synced_count
-            logger.info(f"Budgets synced: {synced_count}")
-            return synced_count
+            self.records_synced += pulled_count
+            logger.info("Records pulled from Oracle: %s", pulled_count)
+            return pulled_count
             
         except Exception as e:
-            logger.error(f"Budget sync failed: {str(e)}")
-            self.oracle_conn.rollback()
+            logger.error("Pull from Oracle failed: %s", e)
+            self.failed_phases.append('pull')
             self.sqlite_conn.rollback()
             return 0
     
-    def sync_savings_goals(self):
-        """Sync savings goals from SQLite to Oracle"""
+    def fetch_central_keys(self, oracle_table, key, keys):
+        """Return which of the given keys exist in an Oracle table, in one round trip"""
+        key_list = self.number_list(keys)
+        
+        oracle_cursor = self.oracle_conn.cursor()
+        oracle_cursor.arraysize = self.batch_size
+        oracle_cursor.execute(f"""
+            SELECT {key} FROM {oracle_table}
+            WHERE {key} IN (SELECT column_value FROM TABLE(:keys))
+        """, keys=key_list)
+        return {row[0] for row in oracle_cursor}
+    
+    def estimate_seconds_per_row(self):
+        """Average seconds per synced record over recent successful syncs, or None"""
+        # Durations are summed here rather than with interval arithmetic,
+        # which differs between central backends
+        oracle_cursor = self.oracle_conn.cursor()
+        oracle_cursor.execute("""
+            SELECT sync_start_time, sync_end_time, records_synced
+            FROM finance_sync_log
+            WHERE sync_status = 'Success'
+              AND sync_end_time IS NOT NULL
+              AND records_synced > 0
+            ORDER BY sync_start_time DESC
+        """)
+        recent = oracle_cursor.fetchmany(20)
+        records = sum(row[2] for row in recent)
+        if not records:
+            return None
+        seconds = sum((row[1] - row[0]).total_seconds() for row in recent)
+        return seconds / records
+    
+    def count_pull(self, stream, user_id, since):
+        """Number of Oracle rows a pull of one stream would fetch"""
+        oracle_cursor = self.oracle_conn.cursor()
+        oracle_cursor.execute(f"SELECT COUNT(*) FROM ({stream['oracle_select']})",
+                              self.pull_binds(stream, user_id, since))
+        return oracle_cursor.fetchone()[0]
+    
+    def plan_sync(self, user_ids=None):
+        """Work out what a sync would do, without writing to either database
+        
+        Pending local rows are classified per user and entity as inserts,
+        updates, tombstones (soft deletes), unchanged rows and conflicts by
+        comparing their keys and versions with Oracle in bulk. Rows a pull
+        would fetch are counted too. Round trips follow the batch size and
+        the duration is estimated from recent finance_sync_log timings.
+        """
+        if not self.connect_sqlite() or not self.connect_oracle():
+            self.close()
+            return None
+        
         try:
-            sqlite_cursor = self.sqlite_conn.cursor()
-            oracle_cursor = self.oracle_conn.cursor()
+            if user_ids is None:
+                user_ids = [row['user_id'] for row in
+                            self.sqlite_conn.execute("SELECT user_id FROM user ORDER BY user_id")]
             
-            # Get unsynced goals from SQLite
-            sqlite_cursor.execute("""
-                SELECT goal_id, user_id, goal_name, target_amount, current_amount,
-                       start_date, deadline, priority, status, created_at, modified_at, is_deleted
-                FROM savings_goal
-                WHERE is_synced = 0
-            """)
+            plan = {'users': {}, 'entities': {}}
             
-            goals = sqlite_cursor.fetchall()
-            synced_count = 0
+            def counts(user_id, name):
+                user_plan = plan['users'].setdefault(user_id, {})
+                return user_plan.setdefault(name, {
+                    'inserts': 0, 'updates': 0, 'tombstones': 0,
+                    'unchanged': 0, 'conflicts': 0, 'pull': 0,
+                })
             
-            for goal_row in goals:
-                try:
-                    # Convert Row to dict for easier access
-                    goal = dict(goal_row)
-                    
-                    # Check if goal exists in Oracle
-                    oracle_cursor.execute("""
-                        SELECT goal_id FROM finance_savings_goal WHERE goal_id = :1
-                    """, [goal['goal_id']])
-                    
-                    exists = oracle_cursor.fetchone()
-                    
-                    if exists:
-                        # Update existing goal
-                        oracle_cursor.execute("""
-                            UPDATE finance_savings_goal
-                            SET goal_name = :1, target_amount = :2, current_amount = :3,
-                                deadline = TO_DATE(:4, 'YYYY-MM-DD'), priority = :5, status = :6,
-                                is_deleted = :7, modified_at = SYSTIMESTAMP
-                            WHERE goal_id = :8
-                        """, [
-                            goal['goal_name'],
-                            goal['target_amount'],
-                            goal['current_amount'],
-                            goal['deadline'],
-                            goal['priority'],
-                            goal['status'],
-                            goal.get('is_deleted', 0),
-                            goal['goal_id']
-                        ])
+            for user_id in user_ids:
+                for stream in SYNC_ENTITIES + [CONTRIBUTION_STREAM]:
+                    counts(user_id, stream['name'])
+            
+            round_trips = FIXED_ROUND_TRIPS * len(user_ids)
+            for entity in SYNC_ENTITIES:
+                entity_trips = 0
+                for batch in self.iter_pending(entity['sqlite_select'], entity['key']):
+                    central = self.fetch_central_versions(entity, [row[0] for row in batch])
+                    entity_trips += 1
+                    batch_sends = False
+                    for row in batch:
+                        if user_ids and row[USER_COLUMN] not in user_ids:
+                            continue
+                        row_counts = counts(row[USER_COLUMN], entity['name'])
+                        owner, central_version = central.get(row[0], (row[USER_COLUMN], None))
+                        if owner != row[USER_COLUMN]:
+                            row_counts['conflicts'] += 1
+                        elif central_version is not None and central_version == (row[1], row[2]):
+                            row_counts['unchanged'] += 1
+                        elif central_version is not None and central_version > (row[1], row[2]):
+                            row_counts['conflicts'] += 1
+                        else:
+                            batch_sends = True
+                            if row[-1]:
+                                row_counts['tombstones'] += 1
+                            elif central_version is None:
+                                row_counts['inserts'] += 1
+                            else:
+                                row_counts['updates'] += 1
+                    if batch_sends:
+                        entity_trips += 1
+                plan['entities'][entity['name']] = {'round_trips': entity_trips}
+                round_trips += entity_trips
+            
+            pending_sql = """
+                SELECT c.contribution_id, g.user_id
+                FROM savings_contribution c
+                JOIN savings_goal g ON g.goal_id = c.goal_id
+                WHERE c.is_synced = 0
+            """
+            contribution_trips = 0
+            for batch in self.iter_pending(pending_sql, 'contribution_id'):
+                existing = self.fetch_central_keys('finance_savings_contribution',
+                                                   'contribution_id', [row[0] for row in batch])
+                # Version probe and insert per batch
+                contribution_trips += 2
+                for contribution_id, user_id in batch:
+                    if user_ids and user_id not in user_ids:
+                        continue
+                    row_counts = counts(user_id, CONTRIBUTION_STREAM['name'])
+                    if contribution_id in existing:
+                        row_counts['unchanged'] += 1
                     else:
-                        # Insert new goal
-                        oracle_cursor.execute("""
-                            INSERT INTO finance_savings_goal 
-                            (goal_id, user_id, goal_name, target_amount, current_amount,
-                             start_date, deadline, priority, status, is_deleted, created_at, modified_at)
-                            VALUES (:1, :2, :3, :4, :5, TO_DATE(:6, 'YYYY-MM-DD'), 
-                                    TO_DATE(:7, 'YYYY-MM-DD'), :8, :9, :10,
-                                    TO_TIMESTAMP(:11, 'YYYY-MM-DD HH24:MI:SS'), 
-                                    TO_TIMESTAMP(:12, 'YYYY-MM-DD HH24:MI:SS'))
-                        """, [
-                            goal['goal_id'],
-                            goal['user_id'],
-                            goal['goal_name'],
-                            goal['target_amount'],
-                            goal['current_amount'],
-                            goal['start_date'],
-                            goal['deadline'],
-                            goal['priority'],
-                            goal['status'],
-                            goal.get('is_deleted', 0),
-                            goal['created_at'],
-                            goal['modified_at']
-                        ])
-                    
-                    # Mark as synced in SQLite
-                    sqlite_cursor.execute("""
-                        UPDATE savings_goal 
-                        SET is_synced = 1
-                        WHERE goal_id = ?
-                    """, [goal['goal_id']])
-                    
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to sync goal {goal['goal_id']}: {str(e)}")
-                    continue
+                        row_counts['inserts'] += 1
+            plan['entities'][CONTRIBUTION_STREAM['name']] = {'round_trips': contribution_trips}
+            round_trips += contribution_trips
             
-            self.oracle_conn.commit()
-            self.sqlite_conn.commit()
-            self.records_synced += synced_count
-            logger.info(f"Savings goals synced: {synced_count}")
-            return synced_count
+            for user_id in user_ids:
+                since = self.get_pull_watermark(user_id)
+                for stream in SYNC_ENTITIES + [CONTRIBUTION_STREAM]:
+                    pulled = self.count_pull(stream, user_id, since)
+                    counts(user_id, stream['name'])['pull'] = pulled
+                    stream_trips = 1 + -(-pulled // self.batch_size)
+                    plan['entities'][stream['name']]['round_trips'] += stream_trips
+                    round_trips += stream_trips
+            
+            for name, entity_plan in plan['entities'].items():
+                for field in ('inserts', 'updates', 'tombstones', 'unchanged', 'conflicts', 'pull'):
+                    entity_plan[field] = sum(user_plan.get(name, {}).get(field, 0)
+                                             for user_plan in plan['users'].values())
             
+            rows_to_write = sum(
+                entity_plan['inserts'] + entity_plan['updates']
+                + entity_plan['tombstones'] + entity_plan['pull']
+                for entity_plan in plan['entities'].values()
+            )
+            seconds_per_row = self.estimate_seconds_per_row()
+            plan['round_trips'] = round_trips
+            plan['rows_to_write'] = rows_to_write
+            plan['seconds_per_row'] = seconds_per_row
+            plan['estimated_seconds'] = (rows_to_write * seconds_per_row
+                                         if seconds_per_row is not None else None)
+            return plan
+        
         except Exception as e:
-            logger.error(f"Savings goal sync failed: {str(e)}")
-            self.oracle_conn.rollback()
-            self.sqlite_conn.rollback()
-            return 0
+            logger.error("Sync planning failed: %s", e)
+            return None
+        
+        finally:
+            self.close()
+    
+    def save_metrics(self, user_id, sync_type, status, error_message, start_time):
+        """Persist the run's counters and phase timings on both sides
+        
+        Failures are only logged; metrics never fail a sync.
+        """
+        totals = self.metrics.totals()
+        phase_rows = [
+            (order, entry['phase'], round(entry['duration'] * 1000, 3), entry['rows'],
+             entry['round_trips'], entry['bytes_fetched'], entry['failures'])
+            for order, entry in enumerate(self.metrics.phases, start=1)
+        ]
+        
+        if self.oracle_conn and self.sync_log_id:
+            try:
+                oracle_cursor = self.oracle_conn.cursor()
+                oracle_cursor.execute("""
+                    UPDATE finance_sync_log
+                    SET sync_duration_seconds = :1, round_trips = :2, bytes_fetched = :3,
+                        failed_rows = :4, retry_count = :5
+                    WHERE sync_log_id = :6
+                """, [round(totals['duration']), totals['round_trips'], totals['bytes_fetched'],
+                      totals['failures'], totals['retries'], self.sync_log_id])
+                oracle_cursor.executemany("""
+                    INSERT INTO finance_sync_phase (sync_log_id, phase_order, phase_name,
+                        duration_ms, rows_processed, round_trips, bytes_fetched, failed_rows)
+                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+                """, [(self.sync_log_id,) + row for row in phase_rows])
+                self.oracle_conn.commit()
+            except Exception as e:
+                logger.warning("Failed to save sync metrics to Oracle: %s", e)
+                self.oracle_conn.rollback()
+        
+        if self.sqlite_conn:
+            try:
+                sqlite_cursor = self.sqlite_conn.cursor()
+                sqlite_cursor.execute("""
+                    INSERT INTO sync_log (user_id, sync_start_time, sync_end_time, records_synced,
+                                          sync_status, error_message, sync_type, duration_seconds,
+                                          round_trips, bytes_fetched, failed_rows, retry_count,
+                                          oracle_sync_log_id)
+                    VALUES (?, ?, datetime('now', 'localtime'), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [user_id, start_time.strftime('%Y-%m-%d %H:%M:%S'), self.records_synced,
+                      status, error_message, sync_type, round(totals['duration'], 3),
+                      totals['round_trips'], totals['bytes_fetched'], totals['failures'],
+                      totals['retries'], self.sync_log_id])
+                local_log_id = sqlite_cursor.lastrowid
+                sqlite_cursor.executemany("""
+                    INSERT INTO sync_phase (sync_log_id, phase_order, phase_name, duration_ms,
+                                            rows_processed, round_trips, bytes_fetched, failed_rows)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(local_log_id,) + row for row in phase_rows])
+                self.sqlite_conn.commit()
+            except Exception as e:
+                logger.warning("Failed to save sync metrics to SQLite: %s", e)
+                self.sqlite_conn.rollback()
     
     def sync_all(self, user_id, sync_type='Manual'):
-        """Perform complete synchronization"""
+        """Perform complete synchronization
+        
+        Returns True only when every phase ran and Oracle accepted every
+        row. self.status tells the rest apart: 'Partial' when a phase
+        failed or rows were rejected but the others were committed,
+        'Failed' when the run stopped.
+        """
+        reset_warning_sampler()
         logger.info("=" * 60)
         logger.info("Starting synchronization process...")
         logger.info("=" * 60)
         
         start_time = datetime.now()
+        status = 'Failed'
+        error_message = None
         
         # Connect to databases
-        if not self.connect_sqlite():
-            return False
-        
-        if not self.connect_oracle():
+        with self.metrics.phase('connect'):
+            connected = self.connect_sqlite()
+            if connected and not self.connect_oracle():
+                self.sqlite_conn.close()
+                connected = False
+            if connected:
+                self.metrics.add(round_trips=1)
+        if not connected:
+            self.status = status
+            self.metrics.export(sync_type, status, self.conflicts)
             return False
         
         try:
             # IMPORTANT: Sync users FIRST (before creating sync log)
             # because sync_log has FK to user table
             logger.info("Step 1: Syncing users...")
-            self.sync_users()
+            with self.metrics.phase('users'):
+                self.sync_users()
+                
+                # Now create sync log (user exists in Oracle)
+                if not self.create_sync_log(user_id, sync_type):
+                    logger.warning("Failed to create sync log, but continuing...")
             
-            # Now create sync log (user exists in Oracle)
-            if not self.create_sync_log(user_id, sync_type):
-                logger.warning("Failed to create sync log, but continuing...")
+            # Pull Oracle changes before pushing so rows that are newer
+            # centrally are not overwritten by stale local copies
+            logger.info("Step 2: Pulling changes from Oracle...")
+            with self.metrics.phase('pull'):
+                self.pull_changes(user_id)
             
             # Sync all other entities
-            logger.info("Step 2: Syncing expenses...")
-            self.sync_expenses()
-            logger.info("Step 3: Syncing income...")
-            self.sync_income()
-            logger.info("Step 4: Syncing budgets...")
-            self.sync_budgets()
-            logger.info("Step 5: Syncing savings goals...")
-            self.sync_savings_goals()
-            
-            # Complete sync log with success
-            self.complete_sync_log('Success')
+            logger.info("Step 3: Syncing expenses...")
+            with self.metrics.phase('expenses'):
+                self.sync_expenses()
+            logger.info("Step 4: Syncing income...")
+            with self.metrics.phase('income'):
+                self.sync_income()
+            logger.info("Step 5: Syncing budgets...")
+            with self.metrics.phase('budgets'):
+                self.sync_budgets()
+            logger.info("Step 6: Syncing savings goals...")
+            with self.metrics.phase('savings goals'):
+                self.sync_savings_goals()
+            logger.info("Step 7: Syncing savings contributions...")
+            with self.metrics.phase('savings contributions'):
+                self.sync_contributions()
+            
+            # A phase that failed or rows Oracle rejected leave a partial
+            # sync; what did go through is committed and stays
+            error_message = self.failure_summary()
+            status = 'Partial' if error_message else 'Success'
+            with self.metrics.phase('commit'):
+                self.complete_sync_log(status, error_message)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
             logger.info("=" * 60)
-            logger.info(f"Synchronization completed successfully!")
-            logger.info(f"Total records synced: {self.records_synced}")
-            logger.info(f"Duration: {duration:.2f} seconds")
+            if error_message:
+                logger.warning("Synchronization partly completed: %s", error_message)
+            else:
+                logger.info("Synchronization completed successfully!")
+            logger.info("Total records synced: %s", self.records_synced)
+            logger.info("Unchanged rows skipped: %s", self.unchanged_skipped)
+            for name, conflicts in self.conflicts.items():
+                logger.warning("Conflicts left for the next pull (%s): %s", name, len(conflicts))
+            logger.info("Duration: %.2f seconds", duration)
+            logger.info("Phase timings:")
+            self.metrics.log_summary(logger)
             logger.info("=" * 60)
             
-            return True
+            return status == 'Success'
             
         except Exception as e:
-            logger.error(f"Synchronization failed: {str(e)}")
-            self.complete_sync_log('Failed', str(e))
+            logger.error("Synchronization failed: %s", e)
+            error_message = str(e)
+            with self.metrics.phase('commit'):
+                self.complete_sync_log('Failed', error_message)
             return False
             
         finally:
+            self.status = status
+            self.save_metrics(user_id, sync_type, status, error_message, start_time)
+            self.metrics.export(sync_type, status, self.conflicts)
+            
             # Close connections
             if self.sqlite_conn:
                 self.sqlite_conn.close()
@@ -605,8 +1206,40 @@ class DatabaseSync:
         """Close all database connections"""
         if self.sqlite_conn:
             self.sqlite_conn.close()
+            self.sqlite_conn = None
         if self.oracle_conn:
             self.oracle_conn.close()
+            self.oracle_conn = None
+
+
+def print_plan(plan):
+    """Print a sync plan returned by DatabaseSync.plan_sync"""
+    columns = ('inserts', 'updates', 'tombstones', 'unchanged', 'conflicts', 'pull')
+    header = f"{'':<24}" + "".join(f"{column.capitalize():>11}" for column in columns)
+    
+    print("\n" + "=" * len(header))
+    print("Sync Plan (nothing has been written)")
+    print("=" * len(header))
+    for user_id, user_plan in plan['users'].items():
+        print(f"\nUser {user_id}")
+        print(header)
+        for name, counts in user_plan.items():
+            print(f"  {name:<22}" + "".join(f"{counts[column]:>11}" for column in columns))
+    
+    print("\nAll users")
+    print(header + f"{'Trips':>9}")
+    for name, counts in plan['entities'].items():
+        print(f"  {name:<22}" + "".join(f"{counts[column]:>11}" for column in columns)
+              + f"{counts['round_trips']:>9}")
+    
+    print(f"\nRows to write: {plan['rows_to_write']}")
+    print(f"Round trips: {plan['round_trips']}")
+    if plan['estimated_seconds'] is None:
+        print("Estimated duration: unknown (no successful syncs in finance_sync_log yet)")
+    else:
+        print(f"Estimated duration: {plan['estimated_seconds']:.1f} seconds "
+              f"({plan['seconds_per_row'] * 1000:.2f} ms per row from recent syncs)")
+    print("=" * len(header))
 
 
 def main():
@@ -615,6 +1248,27 @@ def main():
     print("Personal Finance Management System - Database Synchronization")
     print("=" * 60 + "\n")
     
+    # Profile the run: python sync_manager.py --profile [cprofile|sample]
+    profile_mode = None
+    if '--profile' in sys.argv:
+        index = sys.argv.index('--profile') + 1
+        profile_mode = 'cprofile'
+        if index < len(sys.argv) and not sys.argv[index].startswith('--'):
+            profile_mode = sys.argv[index]
+        if profile_mode not in PROFILE_MODES:
+            print(f"Unknown profile mode '{profile_mode}', expected one of {PROFILE_MODES}")
+            return 1
+    
+    # Dry run: python sync_manager.py --plan
+    if '--plan' in sys.argv:
+        with profiled(profile_mode, 'sync_plan'):
+            plan = DatabaseSync().plan_sync()
+        if plan is None:
+            print("\n✗ Planning failed. Check logs/sync_log.txt for details.")
+            return 1
+        print_plan(plan)
+        return 0
+    
     # Get user ID for synchronization
     try:
         user_id = int(input("Enter user ID to synchronize (default: 1): ") or "1")
@@ -626,13 +1280,17 @@ def main():
     
     # Perform synchronization
     sync = DatabaseSync()
-    success = sync.sync_all(user_id, sync_type)
+    with profiled(profile_mode, f"sync_user{user_id}"):
+        success = sync.sync_all(user_id, sync_type)
     
     if success:
         print("\n✓ Synchronization completed successfully!")
         return 0
+    elif sync.status == 'Partial':
+        print("\n✗ Synchronization partly completed. Check logs/sync_log.txt for details.")
+        return 1
     else:
-        print("\n✗ Synchronization failed. Check sync_log.txt for details.")
+        print("\n✗ Synchronization failed. Check logs/sync_log.txt for details.")
         return 1
 
 
@@ -0,0 +1,119 @@
+"""
+Personal Finance Management System
+Synchronization Module - Sync Metrics
+Per-phase timing, row, round trip, byte and failure counters for a sync run
+"""
+
+import time
+from contextlib import contextmanager
+
+from metrics_registry import REGISTRY
+
+METRIC_FIELDS = ('rows', 'round_trips', 'bytes_fetched', 'failures')
+
+# Process-wide totals over all runs, scraped on /metrics
+SYNC_RUNS = REGISTRY.counter(
+    'spendly_sync_runs_total', "Sync runs by type and outcome", ['sync_type', 'status'])
+SYNC_DURATION = REGISTRY.histogram(
+    'spendly_sync_duration_seconds', "Wall time of sync runs", ['sync_type'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+SYNC_PHASE_SECONDS = REGISTRY.counter(
+    'spendly_sync_phase_seconds_total', "Time spent per sync phase", ['phase'])
+SYNC_ROWS = REGISTRY.counter(
+    'spendly_sync_rows_total', "Rows pushed or pulled per sync phase", ['phase'])
+SYNC_FAILED_ROWS = REGISTRY.counter(
+    'spendly_sync_failed_rows_total', "Rows that failed to sync per phase", ['phase'])
+SYNC_ROUND_TRIPS = REGISTRY.counter(
+    'spendly_sync_round_trips_total', "Central store round trips per sync phase", ['phase'])
+SYNC_BYTES_FETCHED = REGISTRY.counter(
+    'spendly_sync_bytes_fetched_total', "Approximate bytes fetched per sync phase", ['phase'])
+SYNC_RETRIES = REGISTRY.counter(
+    'spendly_sync_retries_total', "Sync runs that were retries of a failed run")
+SYNC_CONFLICTS = REGISTRY.counter(
+    'spendly_sync_conflicts_total', "Rows left for the next pull because the central copy is newer",
+    ['entity'])
+
+
+def row_bytes(rows):
+    """Approximate size of fetched rows, counting the text form of each value"""
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+class SyncMetrics:
+    """Collects the counters of one sync run, phase by phase
+
+    Counters added while no phase is open go to an 'other' phase, so
+    helpers can record unconditionally.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.current = None
+        self.retries = 0
+        self.started = time.perf_counter()
+
+    def new_phase(self, name):
+        entry = {'phase': name, 'duration': 0.0}
+        entry.update({field: 0 for field in METRIC_FIELDS})
+        self.phases.append(entry)
+        return entry
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block and attribute the counters added inside it to `name`"""
+        entry = self.new_phase(name)
+        previous = self.current
+        self.current = entry
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['duration'] = time.perf_counter() - start
+            self.current = previous
+
+    def add(self, rows=0, round_trips=0, bytes_fetched=0, failures=0):
+        """Add to the counters of the open phase"""
+        if self.current is None:
+            self.current = self.new_phase('other')
+        self.current['rows'] += rows
+        self.current['round_trips'] += round_trips
+        self.current['bytes_fetched'] += bytes_fetched
+        self.current['failures'] += failures
+
+    def totals(self):
+        """Counters summed over all phases, with the wall time of the run"""
+        totals = {field: sum(entry[field] for entry in self.phases) for field in METRIC_FIELDS}
+        totals['duration'] = time.perf_counter() - self.started
+        totals['retries'] = self.retries
+        return totals
+
+    def export(self, sync_type, status, conflicts):
+        """Add this run to the process-wide sync metrics"""
+        SYNC_RUNS.labels(sync_type, status).inc()
+        SYNC_DURATION.labels(sync_type).observe(time.perf_counter() - self.started)
+        for entry in self.phases:
+            SYNC_PHASE_SECONDS.labels(entry['phase']).inc(entry['duration'])
+            SYNC_ROWS.labels(entry['phase']).inc(entry['rows'])
+            SYNC_FAILED_ROWS.labels(entry['phase']).inc(entry['failures'])
+            SYNC_ROUND_TRIPS.labels(entry['phase']).inc(entry['round_trips'])
+            SYNC_BYTES_FETCHED.labels(entry['phase']).inc(entry['bytes_fetched'])
+        if self.retries:
+            SYNC_RETRIES.inc()
+        for entity, rows in conflicts.items():
+            SYNC_CONFLICTS.labels(entity).inc(len(rows))
+
+    def log_summary(self, logger):
+        """Log one line per phase and the totals"""
+        for entry in self.phases:
+            rate = entry['rows'] / entry['duration'] if entry['duration'] else 0
+            logger.info(
+                "  %-24s %8.3fs %7s rows %9.1f rows/s %5s trips %9s bytes %4s failed",
+                entry['phase'], entry['duration'], entry['rows'], rate,
+                entry['round_trips'], entry['bytes_fetched'], entry['failures']
+            )
+        totals = self.totals()
+        logger.info(
+            "  %-24s %8.3fs %7s rows %22s trips %9s bytes %4s failed, %s retries",
+            'total', totals['duration'], totals['rows'], totals['round_trips'],
+            totals['bytes_fetched'], totals['failures'], totals['retries']
+        )
@@ -0,0 +1,296 @@
+"""
+Personal Finance Management System
+Synchronization Module - Sync Ingestion Server
+Accepts bundle uploads from many SQLite clients over HTTP and applies them
+to Oracle from a small fixed connection pool with group commits
+"""
+
+import configparser
+import hmac
+import queue
+import threading
+import time
+import zlib
+
+from flask import Flask, Response, jsonify, request
+
+from metrics_registry import CONTENT_TYPE, REGISTRY
+from sync_bundle import BundleSync, parse_bundle
+from sync_manager import logger
+
+BUNDLES_RECEIVED = REGISTRY.counter(
+    'spendly_sync_bundles_received_total', "Uploaded bundles by how they were answered",
+    ['status'])
+BUNDLES_APPLIED = REGISTRY.counter(
+    'spendly_sync_bundles_applied_total', "Queued bundles by how the worker handled them",
+    ['outcome'])
+BUNDLE_ROWS = REGISTRY.counter(
+    'spendly_sync_bundle_rows_total', "Rows applied to the central store from bundles")
+GROUP_COMMIT_DURATION = REGISTRY.histogram(
+    'spendly_sync_group_commit_seconds', "Time to apply and commit one group of bundles")
+QUEUE_DEPTH = REGISTRY.gauge(
+    'spendly_sync_queue_depth', "Bundles waiting per worker queue, read at scrape time",
+    ['worker'])
+
+
+class SyncIngestServer:
+    """Queues uploaded bundles and applies them with a fixed set of Oracle sessions
+
+    Each pool connection is driven by one worker thread with its own queue.
+    A source always maps to the same worker, so its bundles are applied in
+    upload order without any locking between workers. A worker applies
+    everything that queued up while it was busy in one transaction, so
+    Oracle sees one commit per group instead of one session per client.
+    """
+
+    def __init__(self, config_file='config.ini'):
+        self.config_file = config_file
+        self.config = configparser.ConfigParser()
+        self.config.read(config_file)
+
+        self.host = self.config.get('server', 'host', fallback='0.0.0.0')
+        self.port = self.config.getint('server', 'port', fallback=5050)
+        self.pool_size = self.config.getint('server', 'pool_size', fallback=4)
+        self.group_commit_size = self.config.getint('server', 'group_commit_size', fallback=20)
+        self.group_commit_seconds = self.config.getfloat('server', 'group_commit_seconds',
+                                                         fallback=0.2)
+        queue_size = self.config.getint('server', 'queue_size', fallback=256)
+        self.max_unpacked_bytes = self.config.getint('server', 'max_unpacked_mb',
+                                                     fallback=256) * 1024 * 1024
+        self.metrics_token = self.config.get('server', 'metrics_token', fallback='')
+
+        # One token per client source: [server_tokens] source_name = token
+        # (configparser lower-cases the source names)
+        self.tokens = {}
+        if self.config.has_section('server_tokens'):
+            self.tokens = dict(self.config.items('server_tokens'))
+
+        self.pool = None
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(self.pool_size)]
+        # Last sequence committed per source; only the source's worker writes it
+        self.last_applied = {}
+
+    def create_pool(self):
+        """Create the fixed-size Oracle session pool shared by the workers"""
+        store = BundleSync(self.config_file).store
+        self.pool = store.create_pool(self.pool_size, threaded=True)
+        logger.info("%s session pool created with %s connections", store.label, self.pool_size)
+
+    def authenticate(self, source):
+        """Check the bearer token sent by a client against its source's token"""
+        expected = self.tokens.get(source.lower())
+        header = request.headers.get('Authorization', '')
+        if not expected or not header.startswith('Bearer '):
+            return False
+        return hmac.compare_digest(header[len('Bearer '):], expected)
+
+    def may_scrape_metrics(self):
+        """Whether the request may read /metrics
+
+        A scraper sends the [server] metrics_token as a bearer token.
+        Without a token configured, only requests from this host are
+        answered.
+        """
+        scheme, _, sent = request.headers.get('Authorization', '').partition(' ')
+        if self.metrics_token:
+            return scheme.lower() == 'bearer' and hmac.compare_digest(sent, self.metrics_token)
+        return request.remote_addr in ('127.0.0.1', '::1')
+
+    def queue_for(self, source):
+        """The queue of the worker that owns a source"""
+        return self.queues[zlib.crc32(source.encode('utf-8')) % self.pool_size]
+
+    def last_sequence(self, source, applier=None):
+        """Last bundle sequence applied for a source, read from Oracle once"""
+        if source not in self.last_applied:
+            if applier is not None:
+                self.last_applied[source] = applier.last_applied_sequence('oracle', source)
+            else:
+                connection = self.pool.acquire()
+                try:
+                    cursor = connection.cursor()
+                    cursor.execute("""
+                        SELECT NVL(MAX(sequence_no), 0) FROM finance_sync_bundle
+                        WHERE source_name = :1
+                    """, [source])
+                    return cursor.fetchone()[0]
+                finally:
+                    self.pool.release(connection)
+        return self.last_applied[source]
+
+    def apply_group(self, applier, group):
+        """Apply a group of bundles in one Oracle transaction
+
+        Every bundle runs behind its own savepoint, so a bad bundle is
+        rolled back and logged without losing the rest of the group.
+        """
+        start = time.perf_counter()
+        connection = self.pool.acquire()
+        applier.oracle_conn = connection
+        applier.number_list_type = None
+        applier.conflicts = {}
+        applied = {}
+        try:
+            cursor = connection.cursor()
+            applied_bundles = 0
+            applied_rows = 0
+            for bundle in group:
+                source, sequence = bundle['source'], bundle['sequence']
+                last = applied.get(source, self.last_sequence(source, applier))
+                if sequence > last + 1 and source not in applied:
+                    # `sync_bundle.py skip` moves a source on outside the server
+                    self.last_applied.pop(source, None)
+                    last = self.last_sequence(source, applier)
+                if sequence <= last:
+                    logger.info("Bundle %s/%s already applied, skipping", source, sequence)
+                    BUNDLES_APPLIED.labels('duplicate').inc()
+                    continue
+                if sequence != last + 1:
+                    logger.warning(
+                        "Bundle %s/%s arrived before %s/%s, dropped until the client "
+                        "uploads again",
+                        source, sequence, source, last + 1
+                    )
+                    BUNDLES_APPLIED.labels('out_of_order').inc()
+                    continue
+
+                cursor.execute("SAVEPOINT bundle_apply")
+                try:
+                    applied_rows += applier.apply_to_oracle(bundle)
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bundle_apply")
+                    logger.error("Failed to apply bundle %s/%s: %s", source, sequence, e)
+                    BUNDLES_APPLIED.labels('failed').inc()
+                    continue
+                applied[source] = sequence
+                applied_bundles += 1
+
+            connection.commit()
+            self.last_applied.update(applied)
+            BUNDLES_APPLIED.labels('applied').inc(applied_bundles)
+            BUNDLE_ROWS.inc(applied_rows)
+            if applied_bundles:
+                logger.info(
+                    "Committed %s bundles (%s rows) from %s sources in one transaction",
+                    applied_bundles, applied_rows, len(applied)
+                )
+            for name, conflicts in applier.conflicts.items():
+                logger.warning("%s %s were older than Oracle and not applied", len(conflicts), name)
+
+        except Exception as e:
+            logger.error("Group commit failed, %s bundles rolled back: %s", len(group), e)
+            BUNDLES_APPLIED.labels('rolled_back').inc(len(group))
+            connection.rollback()
+            for source in {bundle['source'] for bundle in group}:
+                self.last_applied.pop(source, None)
+
+        finally:
+            applier.oracle_conn = None
+            self.pool.release(connection)
+            GROUP_COMMIT_DURATION.observe(time.perf_counter() - start)
+
+    def worker(self, index):
+        """Drain one queue, grouping whatever arrives within the commit window"""
+        work_queue = self.queues[index]
+        applier = BundleSync(self.config_file)
+        while True:
+            group = [work_queue.get()]
+            deadline = time.monotonic() + self.group_commit_seconds
+            while len(group) < self.group_commit_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(work_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self.apply_group(applier, group)
+            for _ in group:
+                work_queue.task_done()
+
+    def start_workers(self):
+        """Start one worker thread per pool connection"""
+        for index in range(self.pool_size):
+            threading.Thread(target=self.worker, args=(index,), daemon=True,
+                             name=f"sync-worker-{index}").start()
+
+    def create_app(self):
+        """Flask application exposing the upload and status endpoints"""
+        app = Flask(__name__)
+        app.config['MAX_CONTENT_LENGTH'] = self.config.getint(
+            'server', 'max_bundle_mb', fallback=32) * 1024 * 1024
+
+        @app.route('/sync/bundles/<source>', methods=['POST'])
+        def upload_bundle(source):
+            """Accept one compressed bundle and queue it for Oracle
+
+            The token is checked before the body is read, so only known
+            clients get the server to decompress anything.
+            """
+            if not self.authenticate(source):
+                BUNDLES_RECEIVED.labels('unauthorized').inc()
+                return jsonify({'error': 'Unauthorized'}), 401
+
+            try:
+                bundle = parse_bundle(request.get_data(), max_size=self.max_unpacked_bytes)
+            except ValueError as e:
+                BUNDLES_RECEIVED.labels('invalid').inc()
+                return jsonify({'error': str(e)}), 400
+            if bundle['source'] != source:
+                BUNDLES_RECEIVED.labels('invalid').inc()
+                return jsonify({'error': f"Bundle belongs to {bundle['source']}, not {source}"}), 400
+
+            if bundle['sequence'] <= self.last_applied.get(source, 0):
+                BUNDLES_RECEIVED.labels('duplicate').inc()
+                return jsonify({'source': source, 'sequence': bundle['sequence'],
+                                'status': 'duplicate'})
+            try:
+                self.queue_for(source).put_nowait(bundle)
+            except queue.Full:
+                BUNDLES_RECEIVED.labels('queue_full').inc()
+                response = jsonify({'error': 'Sync queue is full, try again later'})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+
+            BUNDLES_RECEIVED.labels('queued').inc()
+            return jsonify({'source': source, 'sequence': bundle['sequence'],
+                            'status': 'queued'}), 202
+
+        @app.route('/sync/status/<source>')
+        def sync_status(source):
+            """Last bundle sequence applied for a source"""
+            if not self.authenticate(source):
+                return jsonify({'error': 'Unauthorized'}), 401
+            return jsonify({'source': source, 'last_sequence': self.last_sequence(source)})
+
+        @app.route('/metrics')
+        def metrics():
+            """Server and sync metrics in the Prometheus text format"""
+            if not self.may_scrape_metrics():
+                return Response('Unauthorized\n', status=401, content_type='text/plain',
+                                headers={'WWW-Authenticate': 'Bearer'})
+            for index, work_queue in enumerate(self.queues):
+                QUEUE_DEPTH.labels(index).set(work_queue.qsize())
+            return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+        return app
+
+    def run(self):
+        """Start the pool, the workers and the HTTP server"""
+        self.create_pool()
+        self.start_workers()
+        app = self.create_app()
+        logger.info("Sync ingestion server listening on %s:%s", self.host, self.port)
+        app.run(host=self.host, port=self.port, threaded=True)
+
+
+def main():
+    """Main execution function"""
+    server = SyncIngestServer()
+    server.run()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
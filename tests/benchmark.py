@@ -0,0 +1,367 @@
+"""
+Performance Benchmark Suite
+Times web routes, reports and sync throughput against generated datasets of
+several sizes, saves the results as JSON and flags regressions against a
+saved baseline
+"""
+
+import argparse
+import configparser
+import glob
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+WEBAPP_DIR = os.path.join(ROOT_DIR, 'webapp')
+SYNC_DIR = os.path.join(ROOT_DIR, 'synchronization')
+GENERATOR = os.path.join(ROOT_DIR, 'scripts', 'generate_dataset.py')
+BENCH_DIR = os.path.join(TESTS_DIR, 'benchmarks')
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Add webapp and sync directories to path for imports
+sys.path.append(WEBAPP_DIR)
+sys.path.append(SYNC_DIR)
+
+# Pages and API endpoints timed through the Flask test client
+ROUTES = [
+    ('dashboard', '/dashboard'),
+    ('expenses', '/expenses'),
+    ('income', '/income'),
+    ('budgets', '/budgets'),
+    ('goals', '/goals'),
+    ('api_expense_by_category', '/api/expense_by_category'),
+    ('api_monthly_trend', '/api/monthly_trend'),
+    ('api_pending_sync_details', '/api/pending_sync_details'),
+    ('api_sync_metrics', '/api/sync_metrics'),
+]
+
+# Report pages and the generator function each one calls
+REPORTS = [
+    ('report_monthly_expenditure', '/report/monthly_expenditure',
+     'generate_monthly_expenditure_report'),
+    ('report_budget_adherence', '/report/budget_adherence',
+     'generate_budget_adherence_report'),
+    ('report_savings_progress', '/report/savings_progress',
+     'generate_savings_progress_report'),
+    ('report_category_distribution', '/report/category_distribution',
+     'generate_category_distribution_report'),
+    ('report_savings_forecast', '/report/savings_forecast',
+     'generate_savings_forecast_report'),
+]
+
+# Differences below this are timer noise, whatever the relative change
+NOISE_FLOOR_MS = 2.0
+
+
+def parse_sizes(text):
+    """'10x1,100x2' -> [(10, 1.0), (100, 2.0)] as (users, years)"""
+    sizes = []
+    for item in text.split(','):
+        users, years = item.lower().split('x')
+        sizes.append((int(users), float(years)))
+    return sizes
+
+
+def size_label(users, years):
+    return f"{users}u{years:g}y"
+
+
+def schema_fingerprint():
+    """Short hash of the SQLite migrations and the generator
+
+    Part of the dataset file name, so a new migration or generator change
+    makes the next run generate fresh datasets instead of reusing ones
+    built on the old schema.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, 'sqlite', '*.sql'))) + [GENERATOR]:
+        with open(path, 'rb') as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()[:8]
+
+
+def prepare_dataset(users, years, seed):
+    """Path of a generated dataset, generating it on first use
+
+    History ends on the last day of the current month so the dashboard's
+    current-month queries have data; datasets are reused within a month
+    while the schema stays the same.
+    """
+    today = date.today()
+    end_date = (today.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    path = os.path.join(DATA_DIR, f"{size_label(users, years)}_seed{seed}_{end_date:%Y%m}"
+                                  f"_{schema_fingerprint()}.db")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    print(f"Generating dataset {os.path.basename(path)}...")
+    subprocess.run([
+        sys.executable, GENERATOR,
+        '--users', str(users), '--years', str(years), '--seed', str(seed),
+        '--end-date', end_date.isoformat(), '--database', path,
+        '--workers', str(os.cpu_count() or 1), '--defer-indexes',
+    ], check=True, stdout=subprocess.DEVNULL)
+    return path
+
+
+def central_config(config_file, backend, db_path):
+    """Sync configuration file that uses the requested central store
+
+    For the local backend a derived configuration points at a fresh
+    central database next to the dataset, so every run starts empty.
+    """
+    if backend == 'oracle':
+        return config_file
+
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    central_path = os.path.splitext(db_path)[0] + '_central.db'
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(central_path + suffix):
+            os.remove(central_path + suffix)
+    if not config.has_section('central'):
+        config.add_section('central')
+    config.set('central', 'backend', 'local')
+    config.set('central', 'database_path', central_path)
+
+    path = os.path.splitext(db_path)[0] + '_config.ini'
+    with open(path, 'w', encoding='utf-8') as handle:
+        config.write(handle)
+    return path
+
+
+def sample_users(db_path, count):
+    """Session values of the first `count` generated users"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("""
+        SELECT user_id, username, full_name, email FROM user
+        WHERE username LIKE 'perf%'
+        ORDER BY user_id
+        LIMIT ?
+    """, (count,)).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p90_ms': round(ordered[max(0, -(-len(ordered) * 9 // 10) - 1)], 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+    }
+
+
+def time_route(client, path, users, repeat, warmup):
+    """Time GET requests to a path, rotating through the sample users"""
+    samples = []
+    for run in range(warmup + repeat):
+        with client.session_transaction() as flask_session:
+            flask_session.update(users[run % len(users)])
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        if run >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def bench_web(webapp, users, args):
+    """Benchmark the routes, and the reports when the central store answers"""
+    client = webapp.app.test_client()
+    results = {}
+
+    for name, path in ROUTES:
+        results[name] = time_route(client, path, users, args.repeat, args.warmup)
+        print(f"  {name:<32} {results[name]['median_ms']:>9.2f} ms")
+
+    report_user = users[0]['user_id']
+    for name, path, function in REPORTS:
+        if getattr(webapp, function)(report_user) is None:
+            print(f"  {name:<32}   skipped (central store unavailable)")
+            continue
+        results[name] = time_route(client, path, users, args.repeat, args.warmup)
+        print(f"  {name:<32} {results[name]['median_ms']:>9.2f} ms")
+
+    return results
+
+
+def bench_sync(db_path, users, config_file):
+    """Push every sample user's pending rows and measure rows per second
+
+    Runs on a copy of the dataset so it stays pending for the next run.
+    """
+    try:
+        from sync_manager import DatabaseSync
+    except ImportError as e:
+        print(f"  {'sync':<32}   skipped ({e})")
+        return None
+
+    logging.getLogger('finance.sync').setLevel(logging.WARNING)
+    if not DatabaseSync(config_file).connect_oracle():
+        print(f"  {'sync':<32}   skipped (central store unavailable)")
+        return None
+
+    work_path = os.path.join(DATA_DIR, 'sync_work.db')
+    shutil.copyfile(db_path, work_path)
+    rows = 0
+    seconds = 0.0
+    try:
+        for user in users:
+            sync = DatabaseSync(config_file, sqlite_path=work_path)
+            start = time.perf_counter()
+            # Rows Oracle rejects would inflate rows/s, so they fail the run
+            if not sync.sync_all(user['user_id'], 'Manual'):
+                raise RuntimeError(f"Sync of user {user['user_id']} ended {sync.status}: "
+                                   f"{sync.failure_summary() or 'see logs/sync_log.txt'}")
+            seconds += time.perf_counter() - start
+            rows += sync.records_synced
+    finally:
+        os.remove(work_path)
+
+    result = {
+        'users': len(users),
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else 0,
+    }
+    print(f"  {'sync':<32} {result['rows_per_sec']:>9.1f} rows/s ({rows} rows)")
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a baseline
+
+    Latencies regress when the median grows by more than `tolerance`
+    (and by more than the noise floor); throughput when rows/s drops by
+    more than `tolerance`.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if 'median_ms' in current:
+            before, after = previous['median_ms'], current['median_ms']
+            if after > before * (1 + tolerance) and after - before > NOISE_FLOOR_MS:
+                regressions.append((key, f"{before:.2f} ms -> {after:.2f} ms"))
+        elif 'rows_per_sec' in current:
+            before, after = previous['rows_per_sec'], current['rows_per_sec']
+            if after < before * (1 - tolerance):
+                regressions.append((key, f"{before:.1f} -> {after:.1f} rows/s"))
+    return regressions
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the Spendly performance benchmarks")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10x1,50x2,200x5'),
+                        help="dataset sizes as USERSxYEARS, comma separated "
+                             "(default: 10x1,50x2,200x5)")
+    parser.add_argument('--seed', type=int, default=42, help="dataset seed (default: 42)")
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per route (default: 20)")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed runs per route (default: 2)")
+    parser.add_argument('--users', type=int, default=5,
+                        help="sample users rotated through the runs (default: 5)")
+    parser.add_argument('--central', choices=['local', 'oracle'], default='local',
+                        help="central store for sync and reports; local uses a fresh SQLite "
+                             "store per dataset (default: local)")
+    parser.add_argument('--sync', action='store_true',
+                        help="also benchmark sync against Oracle; writes the datasets "
+                             "to it (always on with --central local)")
+    parser.add_argument('--config', default=os.path.join(SYNC_DIR, 'config.ini'),
+                        help="sync configuration file")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline results file")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="save this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown before flagging a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    # Relative paths in the config files are relative to webapp/
+    os.chdir(WEBAPP_DIR)
+    import app as webapp
+
+    print("\n" + "=" * 60)
+    print("PERFORMANCE BENCHMARKS")
+    print("=" * 60)
+
+    results = {}
+    for users_count, years in args.sizes:
+        label = size_label(users_count, years)
+        db_path = prepare_dataset(users_count, years, args.seed)
+        users = sample_users(db_path, args.users)
+        print(f"\n{label}: {os.path.basename(db_path)}")
+
+        config_file = central_config(args.config, args.central, db_path)
+        webapp.create_app(config_file, sqlite_path=db_path)
+
+        # Sync first so the reports have central data to read
+        if args.sync or args.central == 'local':
+            sync_result = bench_sync(db_path, users, config_file)
+            if sync_result:
+                results[f"{label}/sync"] = sync_result
+        for name, result in bench_web(webapp, users, args).items():
+            results[f"{label}/{name}"] = result
+
+    run = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'options': {'seed': args.seed, 'repeat': args.repeat, 'warmup': args.warmup,
+                    'users': args.users, 'central': args.central},
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(results_file, 'w', encoding='utf-8') as handle:
+        json.dump(run, handle, indent=2)
+    print(f"\nResults saved to {results_file}")
+
+    exit_code = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regressions against {args.baseline}:")
+            for key, change in regressions:
+                print(f"  {key:<44} {change}")
+            exit_code = 1
+        else:
+            print(f"\n✓ No regressions against baseline from {baseline['created']}")
+    else:
+        print("\nNo baseline yet; run with --save-baseline to create one")
+
+    if args.save_baseline:
+        shutil.copyfile(results_file, args.baseline)
+        print(f"✓ Baseline saved to {args.baseline}")
+
+    print("=" * 60)
+    return exit_code
+
+
+if __name__ == "__main__":
+    exit(main())
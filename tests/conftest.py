@@ -0,0 +1,74 @@
+"""
+Shared fixtures for the pytest suite
+
+Each test gets its own copy of the shipped SQLite database and a local
+central store (the SQLite stand-in for Oracle), so no Oracle server is
+needed and the repository's databases are never written.
+"""
+
+import configparser
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'synchronization'))
+sys.path.insert(0, str(ROOT / 'webapp'))
+
+# Scripts that need a live Oracle server and run when imported
+collect_ignore = [
+    'benchmark.py',
+    'startup_benchmark.py',
+    'test_sync.py',
+    'test_sync_extended.py',
+    'verify_database.py',
+]
+
+
+@pytest.fixture(autouse=True)
+def sync_log_dir(tmp_path_factory, monkeypatch):
+    """Keep sync log output out of the repository's logs folder"""
+    import sync_logging
+    monkeypatch.setattr(sync_logging, 'LOG_DIR', tmp_path_factory.getbasetemp() / 'logs')
+
+
+@pytest.fixture
+def local_db(tmp_path):
+    """Copy of the shipped local database"""
+    path = tmp_path / 'finance_local.db'
+    shutil.copy(ROOT / 'sqlite' / 'finance_local.db', path)
+    return path
+
+
+@pytest.fixture
+def config_file(tmp_path, local_db):
+    """config.ini using the local database copy and a local central store"""
+    config = configparser.ConfigParser()
+    config['sqlite'] = {'database_path': str(local_db)}
+    config['sync'] = {'batch_size': '100'}
+    config['central'] = {'backend': 'local',
+                         'database_path': str(tmp_path / 'finance_central.db')}
+    config['bundle'] = {'source_name': 'laptop',
+                        'output_dir': str(tmp_path / 'bundles')}
+    path = tmp_path / 'config.ini'
+    with open(path, 'w', encoding='utf-8') as handle:
+        config.write(handle)
+    return path
+
+
+@pytest.fixture
+def all_pending(local_db):
+    """Mark every local row as not yet synced, as on a device that never synced
+
+    Clearing sync_timestamp with is_synced keeps the version triggers
+    from treating the update as a local edit.
+    """
+    conn = sqlite3.connect(local_db)
+    for table in ('expense', 'income', 'budget', 'savings_goal', 'savings_contribution'):
+        conn.execute(f"UPDATE {table} SET is_synced = 0, sync_timestamp = NULL")
+    conn.commit()
+    conn.close()
+    return local_db
@@ -0,0 +1,203 @@
+"""
+Startup Benchmark
+Times cold starts of the web app and the sync engine in fresh interpreters
+and breaks their import time down by module with -X importtime; saves the
+results as JSON and flags regressions against a saved baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmark import BENCH_DIR, RESULTS_DIR, SYNC_DIR, WEBAPP_DIR, compare, summarize
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'startup_baseline.json')
+
+# (name, working directory, statement run in a fresh interpreter)
+TARGETS = [
+    ('webapp', WEBAPP_DIR, 'import app'),
+    ('sync_manager', SYNC_DIR, 'import sync_manager'),
+    ('sync_bundle', SYNC_DIR, 'import sync_bundle'),
+]
+
+# Modules of this repository, always listed in the breakdown
+PROJECT_DIRS = (WEBAPP_DIR, SYNC_DIR)
+
+
+def project_modules():
+    names = set()
+    for directory in PROJECT_DIRS:
+        names.update(os.path.splitext(name)[0] for name in os.listdir(directory)
+                     if name.endswith('.py'))
+    return names
+
+
+def parse_importtime(stderr):
+    """[(module, depth, self_us, cumulative_us)] from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def time_start(directory, statement):
+    """Wall time (ms) of one fresh interpreter running a statement, and its import log"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=directory, capture_output=True, text=True
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed in {directory}:\n{completed.stderr[-2000:]}")
+    return elapsed, parse_importtime(completed.stderr)
+
+
+def target_imports(modules):
+    """Entries of the target's own import, leaving out interpreter startup (site)
+
+    The target is the last top-level entry; the modules it imported are
+    logged before it, after the previous top-level entry.
+    """
+    start = len(modules) - 1
+    while start > 0 and modules[start - 1][1] > 0:
+        start -= 1
+    return modules[start:]
+
+
+def breakdown(runs, top, own_modules):
+    """Median cumulative import time per module over the runs, largest first
+
+    Lists the `top` most expensive modules imported directly by the
+    target and every module of this repository.
+    """
+    samples = {}
+    for modules in runs:
+        for name, depth, self_us, cumulative_us in modules:
+            if depth == 1 or name in own_modules:
+                samples.setdefault(name, []).append((self_us, cumulative_us))
+
+    rows = []
+    for name, values in samples.items():
+        self_values = sorted(value[0] for value in values)
+        cumulative_values = sorted(value[1] for value in values)
+        rows.append({
+            'module': name,
+            'self_ms': round(self_values[len(values) // 2] / 1000, 3),
+            'cumulative_ms': round(cumulative_values[len(values) // 2] / 1000, 3),
+            'own': name in own_modules,
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    third_party = [row for row in rows if not row['own']][:top]
+    return third_party + [row for row in rows if row['own']]
+
+
+def bench_target(name, directory, statement, args, own_modules):
+    wall_samples = []
+    import_samples = []
+    runs = []
+    for run in range(args.warmup + args.repeat):
+        elapsed, modules = time_start(directory, statement)
+        if run < args.warmup:
+            continue
+        modules = target_imports(modules)
+        wall_samples.append(elapsed)
+        import_samples.append(modules[-1][3] / 1000)
+        runs.append(modules)
+
+    result = {
+        'wall': summarize(wall_samples),
+        'imports': summarize(import_samples),
+        'breakdown': breakdown(runs, args.top, own_modules),
+    }
+    print(f"\n{name}: {statement}")
+    print(f"  cold start {result['wall']['median_ms']:>9.2f} ms, "
+          f"imports {result['imports']['median_ms']:>9.2f} ms")
+    for row in result['breakdown']:
+        marker = '*' if row['own'] else ' '
+        print(f"  {marker} {row['module']:<36} {row['cumulative_ms']:>9.2f} ms "
+              f"(self {row['self_ms']:.2f} ms)")
+    return result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark cold start and import time")
+    parser.add_argument('--repeat', type=int, default=10,
+                        help="timed starts per target (default: 10)")
+    parser.add_argument('--warmup', type=int, default=1,
+                        help="untimed starts per target, to warm the bytecode and file caches "
+                             "(default: 1)")
+    parser.add_argument('--top', type=int, default=10,
+                        help="direct imports listed per target (default: 10)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline results file")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="save this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown before flagging a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("STARTUP BENCHMARKS (* = module of this repository)")
+    print("=" * 60)
+
+    own_modules = project_modules()
+    details = {}
+    results = {}
+    for name, directory, statement in TARGETS:
+        details[name] = bench_target(name, directory, statement, args, own_modules)
+        results[f"{name}/cold_start"] = details[name]['wall']
+        results[f"{name}/imports"] = details[name]['imports']
+
+    run = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'options': {'repeat': args.repeat, 'warmup': args.warmup},
+        'results': results,
+        'breakdown': {name: detail['breakdown'] for name, detail in details.items()},
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(results_file, 'w', encoding='utf-8') as handle:
+        json.dump(run, handle, indent=2)
+    print(f"\nResults saved to {results_file}")
+
+    exit_code = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regressions against {args.baseline}:")
+            for key, change in regressions:
+                print(f"  {key:<44} {change}")
+            exit_code = 1
+        else:
+            print(f"\n✓ No regressions against baseline from {baseline['created']}")
+    else:
+        print("\nNo baseline yet; run with --save-baseline to create one")
+
+    if args.save_baseline:
+        shutil.copyfile(results_file, args.baseline)
+        print(f"✓ Baseline saved to {args.baseline}")
+
+    print("=" * 60)
+    return exit_code
+
+
+if __name__ == "__main__":
+    exit(main())
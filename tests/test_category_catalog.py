@@ -0,0 +1,67 @@
+"""
+In-process category catalog: reloaded only when the catalog version moves
+"""
+
+import sqlite3
+
+import pytest
+
+from category_catalog import CategoryCatalog
+
+
+@pytest.fixture
+def conn(local_db):
+    conn = sqlite3.connect(local_db)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def test_unchanged_version_is_served_from_cache(conn):
+    catalog = CategoryCatalog()
+
+    first = catalog.get(conn)
+
+    assert catalog.get(conn) is first
+    assert first.version == 1
+    assert first.name(1) == 'Food & Dining'
+
+
+def test_category_change_reloads_the_catalog(conn):
+    catalog = CategoryCatalog()
+    first = catalog.get(conn)
+
+    conn.execute("""
+        INSERT INTO category (category_name, category_type, description)
+        VALUES ('Pets', 'EXPENSE', 'Food, vet, grooming')
+    """)
+    conn.commit()
+
+    second = catalog.get(conn)
+    assert second is not first
+    assert second.version == 2
+    assert 'Pets' in [row['category_name'] for row in second.active('EXPENSE')]
+    # Catalogs already handed out keep the version they were loaded from
+    assert 'Pets' not in [row['category_name'] for row in first.active('EXPENSE')]
+
+
+def test_deactivated_category_leaves_active_list(conn):
+    catalog = CategoryCatalog()
+    catalog.get(conn)
+
+    conn.execute("UPDATE category SET is_active = 0 WHERE category_id = 1")
+    conn.commit()
+
+    reloaded = catalog.get(conn)
+    assert 1 not in [row['category_id'] for row in reloaded.active('EXPENSE')]
+    assert reloaded.name(1) == 'Food & Dining'
+
+
+def test_without_version_table_every_lookup_reloads(conn):
+    conn.execute("DROP TABLE category_catalog_version")
+    catalog = CategoryCatalog()
+
+    first = catalog.get(conn)
+
+    assert first.version is None
+    assert catalog.get(conn) is not first
@@ -0,0 +1,77 @@
+"""
+Conditional GETs of the web app: the data-version ETag answers 304 until
+the user's data changes
+"""
+
+import sqlite3
+
+import pytest
+
+USER_ID = 1
+OTHER_USER_ID = 2
+URL = '/api/expense_by_category'
+
+
+@pytest.fixture
+def client(config_file, local_db):
+    import app as webapp
+    flask_app = webapp.create_app(str(config_file), str(local_db))
+    flask_app.config['TESTING'] = True
+    with flask_app.test_client() as client:
+        with client.session_transaction() as session:
+            session['user_id'] = USER_ID
+            session['username'] = 'testUser'
+        yield client
+
+
+def add_expense(db_path, user_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO expense (user_id, category_id, amount, expense_date, description, payment_method)
+        VALUES (?, 1, 250, date('now'), 'Lunch', 'Cash')
+    """, [user_id])
+    conn.commit()
+    conn.close()
+
+
+def test_unchanged_data_answers_not_modified(client):
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith(f'"u{USER_ID}-v1-')
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in first.headers['Vary']
+
+    repeat = client.get(URL, headers={'If-None-Match': first.headers['ETag']})
+    assert repeat.status_code == 304
+    assert repeat.headers['ETag'] == first.headers['ETag']
+    assert repeat.data == b''
+
+
+def test_write_invalidates_the_etag(client, local_db):
+    first = client.get(URL)
+
+    add_expense(local_db, USER_ID)
+
+    after = client.get(URL, headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'].startswith(f'"u{USER_ID}-v2-')
+    assert after.get_json() != first.get_json()
+
+
+def test_other_users_write_keeps_the_etag(client, local_db):
+    first = client.get(URL)
+
+    add_expense(local_db, OTHER_USER_ID)
+
+    repeat = client.get(URL, headers={'If-None-Match': first.headers['ETag']})
+    assert repeat.status_code == 304
+
+
+def test_response_with_flashed_messages_is_not_cached(client):
+    first = client.get(URL)
+    with client.session_transaction() as session:
+        session['_flashes'] = [('success', 'Expense added successfully!')]
+
+    flashed = client.get(URL, headers={'If-None-Match': first.headers['ETag']})
+    assert flashed.status_code == 200
+    assert 'ETag' not in flashed.headers
@@ -0,0 +1,216 @@
+"""
+Bundle sequencing against the local central store
+
+A source's bundles apply strictly in sequence: a gap or a rejected bundle
+blocks the source until the missing bundle is applied, exported again or
+skipped. Covers the command line applier and the ingestion server.
+"""
+
+import configparser
+import gzip
+import sqlite3
+
+import pytest
+
+from central_store import LocalStore
+from sync_bundle import BundleSync, read_bundle
+from sync_server import SyncIngestServer
+
+SOURCE = 'laptop'
+TOKEN = 'laptop-token'
+
+
+def export(config_file, sequence=None):
+    path = BundleSync(str(config_file)).export_bundle(sequence=sequence)
+    assert path is not None
+    return path
+
+
+def edit_expense(db_path, amount):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE expense SET amount = ? WHERE expense_id = 1", [amount])
+    conn.commit()
+    conn.close()
+
+
+def applied_sequences(tmp_path):
+    conn = LocalStore(str(tmp_path / 'finance_central.db')).connect()
+    try:
+        return [row[0] for row in conn.execute("""
+            SELECT sequence_no FROM finance_sync_bundle WHERE source_name = :1
+            ORDER BY sequence_no
+        """, [SOURCE])]
+    finally:
+        conn.close()
+
+
+def central_expense_amount(tmp_path):
+    conn = LocalStore(str(tmp_path / 'finance_central.db')).connect()
+    try:
+        row = conn.execute("SELECT amount FROM finance_expense WHERE expense_id = 1").fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def test_gap_blocks_later_bundles(config_file, all_pending, tmp_path):
+    first = export(config_file)
+    edit_expense(all_pending, 101)
+    second = export(config_file)
+    edit_expense(all_pending, 102)
+    third = export(config_file)
+
+    assert not BundleSync(str(config_file)).apply_bundles([first, third])
+    assert applied_sequences(tmp_path) == [1]
+    assert central_expense_amount(tmp_path) == 20000.0
+
+    # Applying the directory again once the missing bundle is there
+    assert BundleSync(str(config_file)).apply_bundles([first, second, third])
+    assert applied_sequences(tmp_path) == [1, 2, 3]
+    assert central_expense_amount(tmp_path) == 102
+
+
+def test_rejected_bundle_blocks_source(config_file, local_db, tmp_path):
+    # The shipped database only has contributions pending, and their goals
+    # were never pushed, so the central store rejects the whole bundle
+    first = export(config_file)
+    edit_expense(local_db, 101)
+    second = export(config_file)
+
+    assert not BundleSync(str(config_file)).apply_bundles([first, second])
+    assert applied_sequences(tmp_path) == []
+    assert central_expense_amount(tmp_path) is None
+
+
+def test_reexported_bundle_unblocks_source(config_file, local_db, tmp_path):
+    first = export(config_file)
+    edit_expense(local_db, 101)
+    second = export(config_file)
+    assert not BundleSync(str(config_file)).apply_bundles([first, second])
+
+    # Fix the cause (the goals are sent along) and write bundle 1 again
+    conn = sqlite3.connect(local_db)
+    conn.execute("UPDATE savings_goal SET is_synced = 0, sync_timestamp = NULL")
+    conn.commit()
+    conn.close()
+    first = export(config_file, sequence=1)
+
+    assert read_bundle(first)['sequence'] == 1
+    assert BundleSync(str(config_file)).apply_bundles([first, second])
+    assert applied_sequences(tmp_path) == [1, 2]
+    assert central_expense_amount(tmp_path) == 101
+
+
+def test_skipped_bundle_unblocks_source(config_file, local_db, tmp_path):
+    first = export(config_file)
+    edit_expense(local_db, 101)
+    second = export(config_file)
+    assert not BundleSync(str(config_file)).apply_bundles([first, second])
+
+    # Only the next bundle of a source can be skipped
+    assert not BundleSync(str(config_file)).skip_bundle(SOURCE, 2)
+    assert BundleSync(str(config_file)).skip_bundle(SOURCE, 1)
+
+    assert BundleSync(str(config_file)).apply_bundles([first, second])
+    assert applied_sequences(tmp_path) == [1, 2]
+    assert central_expense_amount(tmp_path) == 101
+
+
+@pytest.fixture
+def server(config_file):
+    """Ingestion server on the test's central store, with a token for SOURCE"""
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    config['server'] = {'pool_size': '1', 'metrics_token': ''}
+    config['server_tokens'] = {SOURCE: TOKEN}
+    with open(config_file, 'w', encoding='utf-8') as handle:
+        config.write(handle)
+
+    server = SyncIngestServer(str(config_file))
+    server.create_pool()
+    return server
+
+
+def upload(client, path, source=SOURCE, token=TOKEN):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return client.post(f'/sync/bundles/{source}', data=path.read_bytes(), headers=headers,
+                       content_type='application/octet-stream')
+
+
+def test_server_authenticates_before_reading_the_bundle(server, config_file, all_pending):
+    client = server.create_app().test_client()
+
+    assert client.post(f'/sync/bundles/{SOURCE}', data=b'not gzip').status_code == 401
+    assert upload(client, export(config_file), token='wrong').status_code == 401
+
+
+def test_server_refuses_bundles_past_the_unpacked_limit(server, config_file, all_pending):
+    path = export(config_file)
+    server.max_unpacked_bytes = len(gzip.decompress(path.read_bytes())) - 1
+    client = server.create_app().test_client()
+
+    response = upload(client, path)
+
+    assert response.status_code == 400
+    assert 'larger than' in response.get_json()['error']
+
+
+def test_server_refuses_another_sources_bundle(server, config_file, all_pending):
+    server.tokens['desktop'] = 'desktop-token'
+    client = server.create_app().test_client()
+
+    response = upload(client, export(config_file), source='desktop', token='desktop-token')
+
+    assert response.status_code == 400
+
+
+def test_server_queues_a_valid_bundle(server, config_file, all_pending):
+    client = server.create_app().test_client()
+
+    response = upload(client, export(config_file))
+
+    assert response.status_code == 202
+    assert server.queue_for(SOURCE).get_nowait()['sequence'] == 1
+
+
+def test_server_drops_out_of_order_bundles(server, config_file, all_pending, tmp_path):
+    first = export(config_file)
+    edit_expense(all_pending, 101)
+    second = export(config_file)
+    applier = BundleSync(str(config_file))
+
+    server.apply_group(applier, [read_bundle(second)])
+    assert applied_sequences(tmp_path) == []
+
+    server.apply_group(applier, [read_bundle(first), read_bundle(second)])
+    assert applied_sequences(tmp_path) == [1, 2]
+    assert server.last_applied[SOURCE] == 2
+    assert central_expense_amount(tmp_path) == 101
+
+
+def test_server_rereads_sequence_after_a_skip(server, config_file, local_db, tmp_path):
+    first = export(config_file)
+    edit_expense(local_db, 101)
+    second = export(config_file)
+    applier = BundleSync(str(config_file))
+
+    server.apply_group(applier, [read_bundle(first), read_bundle(second)])
+    assert applied_sequences(tmp_path) == []
+
+    assert BundleSync(str(config_file)).skip_bundle(SOURCE, 1)
+    server.apply_group(applier, [read_bundle(second)])
+    assert applied_sequences(tmp_path) == [1, 2]
+
+
+def test_server_metrics_need_token_or_loopback(server):
+    client = server.create_app().test_client()
+
+    assert client.get('/metrics').status_code == 200
+    remote = client.get('/metrics', environ_base={'REMOTE_ADDR': '192.0.2.10'})
+    assert remote.status_code == 401
+    assert remote.headers['WWW-Authenticate'] == 'Bearer'
+
+    server.metrics_token = 'scraper-token'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scraper-token'},
+                      environ_base={'REMOTE_ADDR': '192.0.2.10'}).status_code == 200
@@ -0,0 +1,138 @@
+"""
+Row version rule of the sync engine, run against the local central store
+
+A local row is pushed only while it is newer than the central copy,
+compared by (row_version, modified_at); an older one is a conflict left
+for the next pull, and a key that belongs to another user centrally is
+rejected.
+"""
+
+import sqlite3
+
+import pytest
+
+from central_store import LocalStore
+from sync_manager import DatabaseSync
+
+EXPENSE_ID = 1
+OWNER = 1
+
+
+@pytest.fixture
+def central_path(tmp_path):
+    return tmp_path / 'finance_central.db'
+
+
+@pytest.fixture
+def synced(config_file, all_pending):
+    """Config of a device whose rows were all pushed to the central store once"""
+    assert DatabaseSync(str(config_file)).sync_all(OWNER)
+    return config_file
+
+
+def push_expenses(config_file):
+    """Run only the expense push, without the pull that precedes it in sync_all"""
+    sync = DatabaseSync(str(config_file))
+    assert sync.connect_sqlite() and sync.connect_oracle()
+    try:
+        sync.sync_expenses()
+    finally:
+        sync.close()
+    return sync
+
+
+def local_execute(db_path, sql, parameters=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def central_execute(central_path, sql, parameters=()):
+    conn = LocalStore(str(central_path)).connect()
+    try:
+        rows = conn.execute(sql, parameters).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def local_expense(db_path):
+    return local_execute(db_path, """
+        SELECT amount, row_version, is_synced FROM expense WHERE expense_id = ?
+    """, [EXPENSE_ID])[0]
+
+
+def central_expense(central_path):
+    return central_execute(central_path, """
+        SELECT amount, row_version, user_id FROM finance_expense WHERE expense_id = :1
+    """, [EXPENSE_ID])[0]
+
+
+def test_newer_local_version_is_pushed(synced, local_db, central_path):
+    local_execute(local_db, "UPDATE expense SET amount = 123.45 WHERE expense_id = ?", [EXPENSE_ID])
+    assert local_expense(local_db) == (123.45, 2, 0)
+
+    sync = push_expenses(synced)
+
+    assert sync.records_synced == 1
+    assert not sync.conflicts
+    assert central_expense(central_path) == (123.45, 2, OWNER)
+    assert local_expense(local_db) == (123.45, 2, 1)
+
+
+def test_older_local_version_is_a_conflict(synced, local_db, central_path):
+    # Two central edits against one local edit of the same row
+    central_execute(central_path, "UPDATE finance_expense SET amount = 999 WHERE expense_id = :1",
+                    [EXPENSE_ID])
+    central_execute(central_path, "UPDATE finance_expense SET amount = 998 WHERE expense_id = :1",
+                    [EXPENSE_ID])
+    local_execute(local_db, "UPDATE expense SET amount = 123.45 WHERE expense_id = ?", [EXPENSE_ID])
+
+    sync = push_expenses(synced)
+
+    assert [conflict[0] for conflict in sync.conflicts['expenses']] == [EXPENSE_ID]
+    assert central_expense(central_path) == (998, 3, OWNER)
+    # Left pending locally until the pull brings the central copy
+    assert local_expense(local_db) == (123.45, 2, 0)
+
+
+def test_pull_replaces_older_local_copy(synced, local_db, central_path):
+    central_execute(central_path, "UPDATE finance_expense SET amount = 999 WHERE expense_id = :1",
+                    [EXPENSE_ID])
+
+    sync = DatabaseSync(str(synced))
+    assert sync.sync_all(OWNER)
+
+    assert not sync.conflicts
+    assert local_expense(local_db) == (999, 2, 1)
+
+
+def test_equal_version_is_marked_synced_without_sending(synced, local_db, central_path):
+    local_execute(local_db, """
+        UPDATE expense SET is_synced = 0, sync_timestamp = NULL WHERE expense_id = ?
+    """, [EXPENSE_ID])
+
+    sync = push_expenses(synced)
+
+    assert sync.unchanged_skipped == 1
+    assert not sync.failed_rows
+    assert central_expense(central_path) == (20000.0, 1, OWNER)
+    assert local_expense(local_db) == (20000.0, 1, 1)
+
+
+def test_key_of_another_user_is_rejected(synced, local_db, central_path):
+    # Another device created the same expense id for user 2
+    central_execute(central_path, "UPDATE finance_expense SET user_id = 2 WHERE expense_id = :1",
+                    [EXPENSE_ID])
+    local_execute(local_db, "UPDATE expense SET amount = 123.45 WHERE expense_id = ?", [EXPENSE_ID])
+
+    sync = push_expenses(synced)
+
+    assert sync.failed_rows == {'expenses': [EXPENSE_ID]}
+    assert central_expense(central_path) == (20000.0, 2, 2)
+    assert local_expense(local_db) == (123.45, 2, 0)
@@ -3,21 +3,33 @@ Personal Finance Management System - Web Application
 Flask-based web interface with SQLite (local) and Oracle (central) databases
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, Response
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, Response, g, make_response
 import sqlite3
-try:
-    import cx_Oracle
-    ORACLE_AVAILABLE = True
-except ImportError:
-    ORACLE_AVAILABLE = False
-    print("Warning: cx_Oracle not installed. Oracle features will be disabled.")
 import os
+import sys
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 import configparser
 from functools import wraps
-import csv
+import hmac
 import io
+import random
+import zlib
+
+# Paths are resolved from this file, so the app can be imported from anywhere
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Central store backends are shared with the sync engine
+sys.path.append(os.path.join(BASE_DIR, '..', 'synchronization'))
+from central_store import CONNECT_FAILURES, open_store
+from metrics_registry import CONTENT_TYPE, REGISTRY
+from category_catalog import CategoryCatalog
+from compression import ResponseCompressor
+from request_profiler import RequestProfiler
+from slow_queries import SlowQueryRecorder, aggregate_slow_queries, read_slow_queries
+from static_assets import StaticAssets
 
 app = Flask(__name__)
 app.secret_key = 'finance_management_secret_key_2025'  # Change this in production!
@@ -34,13 +46,118 @@ def get_local_time_str():
     return get_local_time().strftime('%Y-%m-%d %H:%M:%S')
 
 # Database configuration
-SQLITE_DB_PATH = os.path.join('..', 'sqlite', 'finance_local.db')
-CONFIG_FILE = os.path.join('..', 'synchronization', 'config.ini')
+SQLITE_DB_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'sqlite', 'finance_local.db'))
+CONFIG_FILE = os.path.normpath(os.path.join(BASE_DIR, '..', 'synchronization', 'config.ini'))
 
 # Load Oracle configuration
 config = configparser.ConfigParser()
 config.read(CONFIG_FILE)
 
+# Central database the reports read: Oracle, or the local stand-in
+# selected under [central]
+CENTRAL_STORE = open_store(config)
+
+# Central connections kept per process (`central_pool_size` under [web]);
+# created on first use in each worker, never inherited across a fork
+CENTRAL_POOL = None
+CENTRAL_POOL_PID = None
+CENTRAL_POOL_LOCK = threading.Lock()
+
+# Sampled request and SQL profiling, enabled under [profiling]
+REQUEST_PROFILER = RequestProfiler(config)
+REQUEST_PROFILER.init_app(app)
+
+# Slow SQLite statements and their query plans, enabled under [slow_queries]
+SLOW_QUERY_RECORDER = SlowQueryRecorder(config)
+
+def create_app(config_file=None, sqlite_path=None):
+    """Configure the application and return it
+    
+    The routes are registered when the module is imported and the
+    default config.ini is read then. Pass another config file or local
+    database to reconfigure the app in place: the central store and the
+    profilers are rebuilt from it. Called once in the master process when
+    serving with preload, before the workers are forked.
+    """
+    global CONFIG_FILE, SQLITE_DB_PATH, CENTRAL_STORE
+    if config_file is not None:
+        CONFIG_FILE = os.path.abspath(config_file)
+        config.clear()
+        config.read(CONFIG_FILE)
+        CENTRAL_STORE = open_store(config)
+        REQUEST_PROFILER.configure(config)
+        SLOW_QUERY_RECORDER.configure(config)
+        RESPONSE_COMPRESSOR.configure(config)
+    if sqlite_path is not None:
+        SQLITE_DB_PATH = os.path.abspath(sqlite_path)
+    load_category_catalog()
+    init_worker()
+    return app
+
+def init_worker():
+    """Reset the per-process state; run in each worker after a fork
+    
+    Drops a central pool inherited from the parent without closing it,
+    since its sessions belong to the parent, and reseeds the profiler's
+    sampling so that forked workers do not sample the same requests.
+    """
+    global CENTRAL_POOL, CENTRAL_POOL_PID
+    CENTRAL_POOL = None
+    CENTRAL_POOL_PID = None
+    random.seed()
+
+# Prometheus metrics, scraped on /metrics
+HTTP_REQUESTS = REGISTRY.counter(
+    'spendly_http_requests_total', "Requests by method, endpoint and status",
+    ['method', 'endpoint', 'status'])
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'spendly_http_request_duration_seconds', "Request handling time by endpoint", ['endpoint'])
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    'spendly_http_requests_in_progress', "Requests being handled")
+REPORT_GENERATIONS = REGISTRY.counter(
+    'spendly_report_generations_total', "Report generations by report and outcome",
+    ['report', 'outcome'])
+REPORT_DURATION = REGISTRY.histogram(
+    'spendly_report_duration_seconds', "Report generation time", ['report'])
+
+# ============================================
+# REQUEST METRICS
+# ============================================
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    HTTP_REQUESTS_IN_PROGRESS.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and time it under its endpoint, not its URL"""
+    started = g.get('metrics_started')
+    if started is not None:
+        # Unmatched URLs share one label so scanners cannot grow the series
+        endpoint = request.endpoint or 'unmatched'
+        HTTP_REQUESTS.labels(request.method, endpoint, response.status_code).inc()
+        HTTP_REQUEST_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exception=None):
+    if g.pop('metrics_started', None) is not None:
+        HTTP_REQUESTS_IN_PROGRESS.dec()
+
+# ============================================
+# COMPRESSION AND STATIC ASSETS
+# ============================================
+
+# gzip/brotli for text responses above `compression_min_bytes` under [web];
+# registered after the metrics hook, so its time counts in the request's
+RESPONSE_COMPRESSOR = ResponseCompressor(config)
+RESPONSE_COMPRESSOR.init_app(app)
+
+# url_for('static', ...) gives content-hashed URLs cached for a year
+STATIC_ASSETS = StaticAssets()
+STATIC_ASSETS.init_app(app)
+
 # ============================================
 # CONTEXT PROCESSOR - Inject pending sync count
 # ============================================
@@ -80,41 +197,73 @@ def get_sqlite_db():
     """Connect to SQLite database"""
     conn = sqlite3.connect(SQLITE_DB_PATH)
     conn.row_factory = sqlite3.Row
-    return conn
+    return REQUEST_PROFILER.wrap(SLOW_QUERY_RECORDER.wrap(conn), 'sqlite')
 
-def get_oracle_db():
-    """Connect to Oracle database"""
-    if not ORACLE_AVAILABLE:
+# Category table kept in memory; views resolve category names from it
+# instead of joining `category` (see category_catalog.py)
+CATEGORY_CATALOG = CategoryCatalog()
+app.add_template_filter(CATEGORY_CATALOG.name, 'category_name')
+
+def load_category_catalog():
+    """Load the catalog up front, so the first requests find it cached"""
+    try:
+        db = get_sqlite_db()
+    except sqlite3.Error:
+        return
+    try:
+        CATEGORY_CATALOG.get(db)
+    except sqlite3.Error as e:
+        print(f"Category catalog not loaded: {e}")
+    finally:
+        db.close()
+
+def get_central_pool():
+    """This process's central connection pool, or None when pooling is off"""
+    global CENTRAL_POOL, CENTRAL_POOL_PID
+    size = config.getint('web', 'central_pool_size', fallback=0)
+    if size <= 0:
         return None
+    if CENTRAL_POOL is None or CENTRAL_POOL_PID != os.getpid():
+        with CENTRAL_POOL_LOCK:
+            if CENTRAL_POOL is None or CENTRAL_POOL_PID != os.getpid():
+                CENTRAL_POOL = CENTRAL_STORE.create_pool(size, threaded=True)
+                CENTRAL_POOL_PID = os.getpid()
+    return CENTRAL_POOL
+
+def get_oracle_db():
+    """Connect to the central database (Oracle, or its local stand-in)
+    
+    With a pool, closing the connection hands it back to the pool.
+    """
     try:
-        username = config['oracle']['username']
-        password = config['oracle']['password']
-        host = config['oracle']['host']
-        port = config['oracle']['port']
-        
-        # Check if using SID or service_name
-        if 'sid' in config['oracle']:
-            sid = config['oracle']['sid']
-            dsn = cx_Oracle.makedsn(host, port, sid=sid)
-        else:
-            service_name = config['oracle']['service_name']
-            dsn = cx_Oracle.makedsn(host, port, service_name=service_name)
-        
-        conn = cx_Oracle.connect(username, password, dsn)
-        return conn
+        pool = get_central_pool()
+        conn = pool.acquire() if pool is not None else CENTRAL_STORE.connect()
+        return REQUEST_PROFILER.wrap(conn, 'oracle')
     except Exception as e:
         print(f"Oracle connection error: {e}")
+        CONNECT_FAILURES.labels(CENTRAL_STORE.name).inc()
         return None
 
+def instrumented_report(name):
+    """Count and time a report generator; a None result counts as failed"""
+    def decorator(generate):
+        @wraps(generate)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = generate(*args, **kwargs)
+            REPORT_DURATION.labels(name).observe(time.perf_counter() - start)
+            REPORT_GENERATIONS.labels(name, 'failed' if result is None else 'success').inc()
+            return result
+        return wrapper
+    return decorator
+
 # ============================================
 # REPORT GENERATION FUNCTIONS (FROM ORACLE)
 # ============================================
 
+@instrumented_report('monthly_expenditure')
 def generate_monthly_expenditure_report(user_id, year=None, month=None):
     """Generate monthly expenditure analysis report from Oracle database"""
-    if not ORACLE_AVAILABLE:
-        return None
-    
     oracle_conn = get_oracle_db()
     if not oracle_conn:
         return None
@@ -215,11 +364,9 @@ def generate_monthly_expenditure_report(user_id, year=None, month=None):
         print(f"Report error: {e}")
         return None
 
+@instrumented_report('budget_adherence')
 def generate_budget_adherence_report(user_id):
     """Generate budget adherence tracking report from Oracle database"""
-    if not ORACLE_AVAILABLE:
-        return None
-    
     oracle_conn = get_oracle_db()
     if not oracle_conn:
         return None
@@ -289,12 +436,9 @@ def generate_budget_adherence_report(user_id):
         print(f"Report error: {e}")
         return None
 
+@instrumented_report('savings_progress')
 def generate_savings_progress_report(user_id):
     """Generate savings goal progress report from Oracle database"""
-    if not ORACLE_AVAILABLE:
-        print("Oracle not available")
-        return None
-    
     oracle_conn = get_oracle_db()
     if not oracle_conn:
         print("Could not connect to Oracle")
@@ -364,11 +508,9 @@ def generate_savings_progress_report(user_id):
                 pass
         return None
 
+@instrumented_report('category_distribution')
 def generate_category_distribution_report(user_id, days=30):
     """Generate category-wise expense distribution report from Oracle database"""
-    if not ORACLE_AVAILABLE:
-        return None
-    
     oracle_conn = get_oracle_db()
     if not oracle_conn:
         return None
@@ -437,11 +579,9 @@ def generate_category_distribution_report(user_id, days=30):
         print(f"Report error: {e}")
         return None
 
+@instrumented_report('savings_forecast')
 def generate_savings_forecast_report(user_id, months=6):
     """Generate savings forecast report from Oracle database"""
-    if not ORACLE_AVAILABLE:
-        return None
-    
     oracle_conn = get_oracle_db()
     if not oracle_conn:
         return None
@@ -534,6 +674,83 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def admin_required(f):
+    """Limit a diagnostics page to the admin_users under [profiling]"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not REQUEST_PROFILER.is_admin():
+            flash('This page is only available to administrators.', 'warning')
+            return redirect(url_for('dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+# ============================================
+# CONDITIONAL REQUESTS (ETag / 304)
+# ============================================
+
+def build_token():
+    """Short hash of the code and template modification times
+
+    Part of every ETag, so that pages cached by a browser are not reused
+    after a release. The same in every worker process.
+    """
+    paths = [os.path.join(BASE_DIR, 'app.py')]
+    for root, _, files in os.walk(os.path.join(BASE_DIR, 'templates')):
+        paths.extend(os.path.join(root, name) for name in files)
+    stamps = ','.join(f"{os.path.getmtime(path):.0f}" for path in sorted(paths))
+    return f"{zlib.crc32(stamps.encode()):08x}"
+
+BUILD_TOKEN = build_token()
+
+def get_data_version(user_id):
+    """The user's data version (sqlite/14_data_version.sql), or None without it
+
+    Triggers bump it on every write to the user's rows and on every sync
+    run, so an unchanged version means unchanged data.
+    """
+    db = get_sqlite_db()
+    try:
+        row = db.execute('SELECT version FROM user_data_version WHERE user_id = ?',
+                         (user_id,)).fetchone()
+        return row['version'] if row else 0
+    except sqlite3.OperationalError:
+        # Database not migrated yet: no version, no caching
+        return None
+    finally:
+        db.close()
+
+def data_version_etag(f):
+    """Answer 304 Not Modified while the user's data version is unchanged
+
+    The strong ETag names the user, the data version, the day (pages show
+    the current month) and the build. It is checked against If-None-Match
+    before the view runs, so a repeat request costs one indexed lookup.
+    Responses carrying flashed messages are never served from cache.
+    Use below @login_required.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user_id = session['user_id']
+        version = get_data_version(user_id) if '_flashes' not in session else None
+        if version is None:
+            return f(*args, **kwargs)
+
+        # Read before the view runs: a write racing the view leaves the
+        # response with an older tag, which only costs a recompute later
+        etag = f"u{user_id}-v{version}-{datetime.now():%Y%m%d}-{BUILD_TOKEN}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200 or '_flashes' in session:
+                return response
+        response.set_etag(etag)
+        # Cached by the browser only, and revalidated on every use
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response
+    return decorated_function
+
 # ============================================
 # AUTHENTICATION ROUTES
 # ============================================
@@ -717,29 +934,17 @@ def change_password():
 
 @app.route('/dashboard')
 @login_required
+@data_version_etag
 def dashboard():
     """Main dashboard with financial overview"""
     db = get_sqlite_db()
     user_id = session['user_id']
     
-    # Get current month's data
-    current_month = datetime.now().strftime('%Y-%m')
-    
-    # Total expenses this month
-    total_expenses = db.execute('''
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM expense
-        WHERE user_id = ? AND strftime('%Y-%m', expense_date) = ?
-          AND (is_deleted = 0 OR is_deleted IS NULL)
-    ''', (user_id, current_month)).fetchone()['total']
-    
-    # Total income this month
-    total_income = db.execute('''
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM income
-        WHERE user_id = ? AND strftime('%Y-%m', income_date) = ?
-          AND (is_deleted = 0 OR is_deleted IS NULL)
-    ''', (user_id, current_month)).fetchone()['total']
+    # The Money Flow chart (last 7 months) and this month's totals share
+    # one grouped query per table, as in /api/bundle
+    shared = {}
+    monthly_data = money_flow_dataset(db, user_id, shared, months=7)
+    summary = month_summary_dataset(db, user_id, shared)
     
     # Active budgets
     active_budgets = db.execute('''
@@ -755,14 +960,13 @@ def dashboard():
           AND (is_deleted = 0 OR is_deleted IS NULL)
     ''', (user_id,)).fetchone()['count']
     
-    # Recent expenses (last 5)
+    # Recent expenses (last 5); category names come from the catalog
+    CATEGORY_CATALOG.get(db)
     recent_expenses = db.execute('''
-        SELECT e.*, c.category_name
-        FROM expense e
-        JOIN category c ON e.category_id = c.category_id
-        WHERE e.user_id = ?
-          AND (e.is_deleted = 0 OR e.is_deleted IS NULL)
-        ORDER BY e.expense_date DESC, e.created_at DESC
+        SELECT * FROM expense
+        WHERE user_id = ?
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY expense_date DESC, created_at DESC
         LIMIT 5
     ''', (user_id,)).fetchall()
     
@@ -773,44 +977,13 @@ def dashboard():
         LIMIT 5
     ''', (user_id,)).fetchall()
     
-    # Get monthly income and expenses for the last 7 months for Money Flow chart
-    monthly_data = []
-    for i in range(6, -1, -1):  # Last 7 months including current
-        month_date = datetime.now() - timedelta(days=30*i)
-        month_str = month_date.strftime('%Y-%m')
-        month_name = month_date.strftime('%b')
-        
-        month_income = db.execute('''
-            SELECT COALESCE(SUM(amount), 0) as total
-            FROM income
-            WHERE user_id = ? AND strftime('%Y-%m', income_date) = ?
-              AND (is_deleted = 0 OR is_deleted IS NULL)
-        ''', (user_id, month_str)).fetchone()['total']
-        
-        month_expense = db.execute('''
-            SELECT COALESCE(SUM(amount), 0) as total
-            FROM expense
-            WHERE user_id = ? AND strftime('%Y-%m', expense_date) = ?
-              AND (is_deleted = 0 OR is_deleted IS NULL)
-        ''', (user_id, month_str)).fetchone()['total']
-        
-        monthly_data.append({
-            'month': month_name,
-            'income': float(month_income),
-            'expense': float(month_expense)
-        })
-    
     db.close()
     
-    # Calculate net savings
-    net_savings = total_income - total_expenses
-    savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
-    
     return render_template('dashboard.html',
-                         total_expenses=total_expenses,
-                         total_income=total_income,
-                         net_savings=net_savings,
-                         savings_rate=savings_rate,
+                         total_expenses=summary['expenses'],
+                         total_income=summary['income'],
+                         net_savings=summary['net_savings'],
+                         savings_rate=summary['savings_rate'],
                          active_budgets=active_budgets,
                          active_goals=active_goals,
                          recent_expenses=recent_expenses,
@@ -828,21 +1001,17 @@ def expenses():
     db = get_sqlite_db()
     user_id = session['user_id']
     
+    # Categories for the form and the table, from the catalog cache
+    catalog = CATEGORY_CATALOG.get(db)
+    
     # Get all expenses (excluding deleted ones)
     expenses_list = db.execute('''
-        SELECT e.*, c.category_name
-        FROM expense e
-        JOIN category c ON e.category_id = c.category_id
-        WHERE e.user_id = ? AND (e.is_deleted = 0 OR e.is_deleted IS NULL)
-        ORDER BY e.expense_date DESC, e.created_at DESC
+        SELECT * FROM expense
+        WHERE user_id = ? AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY expense_date DESC, created_at DESC
     ''', (user_id,)).fetchall()
     
-    # Get categories for form
-    categories = db.execute('''
-        SELECT * FROM category 
-        WHERE category_type = 'EXPENSE' AND is_active = 1
-        ORDER BY category_name
-    ''').fetchall()
+    categories = catalog.active('EXPENSE')
     
     db.close()
     
@@ -976,6 +1145,7 @@ def delete_income(income_id):
 
 @app.route('/budgets')
 @login_required
+@data_version_etag
 def budgets():
     """Budget management page"""
     db = get_sqlite_db()
@@ -989,11 +1159,7 @@ def budgets():
     ''', (user_id,)).fetchall()
     
     # Get categories for form
-    categories = db.execute('''
-        SELECT * FROM category 
-        WHERE category_type = 'EXPENSE' AND is_active = 1
-        ORDER BY category_name
-    ''').fetchall()
+    categories = CATEGORY_CATALOG.get(db).active('EXPENSE')
     
     db.close()
     
@@ -1158,116 +1324,46 @@ def reports():
 
 @app.route('/api/pending_sync_details')
 @login_required
+@data_version_etag
 def pending_sync_details():
     """Get detailed information about pending sync items"""
     user_id = session['user_id']
     conn = get_sqlite_db()
     
     try:
-        # Get recent unsynced expenses (limit 3)
-        expenses = conn.execute('''
-            SELECT e.expense_id, e.amount, c.category_name as category, e.description, e.expense_date
-            FROM expense e
-            JOIN category c ON e.category_id = c.category_id
-            WHERE e.user_id = ? AND e.is_synced = 0
-              AND (e.is_deleted = 0 OR e.is_deleted IS NULL)
-            ORDER BY e.expense_date DESC, e.expense_id DESC
-            LIMIT 3
-        ''', (user_id,)).fetchall()
-        
-        # Count total unsynced expenses
-        total_expenses = conn.execute(
-            'SELECT COUNT(*) as count FROM expense WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
-            (user_id,)
-        ).fetchone()['count']
-        
-        # Get recent unsynced income (limit 3)
-        income = conn.execute('''
-            SELECT income_id, amount, income_source as source, description, income_date
-            FROM income
-            WHERE user_id = ? AND is_synced = 0
-              AND (is_deleted = 0 OR is_deleted IS NULL)
-            ORDER BY income_date DESC, income_id DESC
-            LIMIT 3
-        ''', (user_id,)).fetchall()
-        
-        total_income = conn.execute(
-            'SELECT COUNT(*) as count FROM income WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
-            (user_id,)
-        ).fetchone()['count']
-        
-        # Get recent unsynced budgets (limit 3)
-        budgets = conn.execute('''
-            SELECT b.budget_id, c.category_name, b.budget_amount, b.start_date, b.end_date
-            FROM budget b
-            JOIN category c ON b.category_id = c.category_id
-            WHERE b.user_id = ? AND b.is_synced = 0
-              AND (b.is_deleted = 0 OR b.is_deleted IS NULL)
-            ORDER BY b.created_at DESC, b.budget_id DESC
-            LIMIT 3
-        ''', (user_id,)).fetchall()
-        
-        total_budgets = conn.execute(
-            'SELECT COUNT(*) as count FROM budget WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
-            (user_id,)
-        ).fetchone()['count']
-        
-        # Get recent unsynced goals (limit 3)
-        goals = conn.execute('''
-            SELECT goal_id, goal_name, target_amount, current_amount
-            FROM savings_goal
-            WHERE user_id = ? AND is_synced = 0
-              AND (is_deleted = 0 OR is_deleted IS NULL)
-            ORDER BY created_at DESC, goal_id DESC
-            LIMIT 3
-        ''', (user_id,)).fetchall()
-        
-        total_goals = conn.execute(
-            'SELECT COUNT(*) as count FROM savings_goal WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
-            (user_id,)
-        ).fetchone()['count']
-        
-        conn.close()
-        
-        return jsonify({
-            'expenses': {
-                'items': [dict(row) for row in expenses],
-                'total': total_expenses
-            },
-            'income': {
-                'items': [dict(row) for row in income],
-                'total': total_income
-            },
-            'budgets': {
-                'items': [dict(row) for row in budgets],
-                'total': total_budgets
-            },
-            'goals': {
-                'items': [dict(row) for row in goals],
-                'total': total_goals
-            }
-        })
-        
+        return jsonify(pending_sync_dataset(conn, user_id))
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
 
 @app.route('/sync_to_oracle', methods=['POST'])
 @login_required
 def sync_to_oracle():
     """Synchronize data from SQLite to Oracle"""
     try:
-        # Import and use the sync manager
-        import sys
-        sys.path.append(os.path.join('..', 'synchronization'))
+        # With a sync server configured, changes go up as a bundle instead
+        # of this client opening its own Oracle session
+        if config.get('bundle', 'server_url', fallback=''):
+            from sync_bundle import BundleSync, expand_bundle_paths
+            
+            bundle_sync = BundleSync(CONFIG_FILE, sqlite_path=SQLITE_DB_PATH)
+            bundle_sync.export_bundle()
+            if bundle_sync.upload_bundles(expand_bundle_paths([bundle_sync.output_dir])):
+                flash('Changes sent to the sync server!', 'success')
+            else:
+                flash('Upload to the sync server failed. Check logs for details.', 'danger')
+            return redirect(request.referrer or url_for('dashboard'))
+        
         from sync_manager import DatabaseSync
         
-        sync = DatabaseSync(CONFIG_FILE)
+        sync = DatabaseSync(CONFIG_FILE, sqlite_path=SQLITE_DB_PATH, oracle_pool=get_central_pool())
         success = sync.sync_all(session['user_id'], 'Manual')
         
         if success:
             flash('Data synchronized successfully to Oracle database!', 'success')
+        elif sync.status == 'Partial':
+            flash('Some changes could not be synchronized. Check logs for details.', 'warning')
         else:
             flash('Synchronization failed. Check logs for details.', 'danger')
     except Exception as e:
@@ -1340,6 +1436,12 @@ def view_savings_forecast():
     
     return render_template('report_savings_forecast.html', data=report_data)
 
+def csv_writer():
+    """In-memory CSV file and its writer; csv is only imported for downloads"""
+    import csv
+    output = io.StringIO()
+    return output, csv.writer(output)
+
 @app.route('/download/monthly_expenditure')
 @login_required
 def download_monthly_expenditure():
@@ -1353,8 +1455,7 @@ def download_monthly_expenditure():
         return redirect(url_for('reports'))
     
     # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    output, writer = csv_writer()
     
     writer.writerow(['Monthly Expenditure Analysis Report'])
     writer.writerow(['User', report_data['username']])
@@ -1395,8 +1496,7 @@ def download_budget_adherence():
         flash('Unable to generate report', 'danger')
         return redirect(url_for('reports'))
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    output, writer = csv_writer()
     
     writer.writerow(['Budget Adherence Report'])
     writer.writerow(['User', report_data['username']])
@@ -1431,8 +1531,7 @@ def download_savings_progress():
         flash('Unable to generate report', 'danger')
         return redirect(url_for('reports'))
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    output, writer = csv_writer()
     
     writer.writerow(['Savings Progress Report'])
     writer.writerow(['User', report_data['username']])
@@ -1468,8 +1567,7 @@ def download_category_distribution():
         flash('Unable to generate report', 'danger')
         return redirect(url_for('reports'))
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    output, writer = csv_writer()
     
     writer.writerow(['Category Distribution Report'])
     writer.writerow(['User', report_data['username']])
@@ -1506,8 +1604,7 @@ def download_savings_forecast():
         flash('Unable to generate report', 'danger')
         return redirect(url_for('reports'))
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    output, writer = csv_writer()
     
     writer.writerow(['Savings Forecast Report'])
     writer.writerow(['User', report_data['username']])
@@ -1535,64 +1632,471 @@ def download_savings_forecast():
         headers={'Content-Disposition': f'attachment; filename=savings_forecast_{months}months.csv'}
     )
 
+# ============================================
+# DATASETS (chart APIs and /api/bundle)
+# ============================================
+
+def expense_by_category_dataset(conn, user_id, shared=None):
+    """Total live expenses per category, largest first"""
+    catalog = CATEGORY_CATALOG.get(conn)
+    data = conn.execute('''
+        SELECT category_id, SUM(amount) as total
+        FROM expense
+        WHERE user_id = ?
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        GROUP BY category_id
+    ''', (user_id,)).fetchall()
+    
+    # Names and types resolved from the catalog instead of a join
+    totals = [(catalog.name(row['category_id']), float(row['total'])) for row in data
+              if catalog.types.get(row['category_id']) == 'EXPENSE' and row['total'] > 0]
+    totals.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'labels': [name for name, _ in totals],
+        'values': [total for _, total in totals]
+    }
+
+def monthly_totals(conn, user_id, table, shared, since=None):
+    """{'YYYY-MM': total} of the user's live expense or income rows
+    
+    From the year_month key `since` (YYYYMM) on, or the whole history.
+    Kept in `shared`, so the datasets of one bundle or page that need
+    the same totals run the aggregate once: totals from an earlier month
+    on also answer a later `since`.
+    """
+    if table not in ('expense', 'income'):
+        raise ValueError(f"No monthly totals for table '{table}'")
+    for (name, cached_table, cached_since), totals in shared.items():
+        if (name == 'monthly_totals' and cached_table == table
+                and (cached_since is None or since is not None and cached_since <= since)):
+            return totals
+    
+    # Grouped on the (user_id, year_month) index, already in month order
+    rows = conn.execute(f'''
+        SELECT year_month, SUM(amount) as total
+        FROM {table}
+        WHERE user_id = ? AND year_month >= ?
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        GROUP BY year_month
+    ''', (user_id, since or 0)).fetchall()
+    totals = {
+        f"{row['year_month'] // 100:04d}-{row['year_month'] % 100:02d}": float(row['total'])
+        for row in rows
+    }
+    shared[('monthly_totals', table, since)] = totals
+    return totals
+
+def monthly_trend_dataset(conn, user_id, shared=None, months=6):
+    """Expense totals of the user's last `months` months with expenses"""
+    totals = monthly_totals(conn, user_id, 'expense', {} if shared is None else shared)
+    recent = sorted(totals)[-months:]
+    return {
+        'labels': recent,
+        'values': [totals[month] for month in recent]
+    }
+
+def money_flow_dataset(conn, user_id, shared=None, months=7):
+    """Income and expenses of the last `months` calendar months, as on the dashboard"""
+    shared = {} if shared is None else shared
+    first_month = datetime.now() - timedelta(days=30*(months - 1))
+    since = int(first_month.strftime('%Y%m'))
+    income_totals = monthly_totals(conn, user_id, 'income', shared, since)
+    expense_totals = monthly_totals(conn, user_id, 'expense', shared, since)
+    data = []
+    for i in range(months - 1, -1, -1):
+        month_date = datetime.now() - timedelta(days=30*i)
+        month_str = month_date.strftime('%Y-%m')
+        data.append({
+            'month': month_date.strftime('%b'),
+            'income': income_totals.get(month_str, 0.0),
+            'expense': expense_totals.get(month_str, 0.0)
+        })
+    return data
+
+def month_summary_dataset(conn, user_id, shared=None):
+    """This month's income, expenses, net savings and savings rate"""
+    shared = {} if shared is None else shared
+    current_month = datetime.now().strftime('%Y-%m')
+    since = int(current_month.replace('-', ''))
+    total_income = monthly_totals(conn, user_id, 'income', shared, since).get(current_month, 0.0)
+    total_expenses = monthly_totals(conn, user_id, 'expense', shared, since).get(current_month, 0.0)
+    net_savings = total_income - total_expenses
+    return {
+        'month': current_month,
+        'income': total_income,
+        'expenses': total_expenses,
+        'net_savings': net_savings,
+        'savings_rate': (net_savings / total_income * 100) if total_income > 0 else 0
+    }
+
+def pending_sync_dataset(conn, user_id, shared=None):
+    """Latest unsynced rows (up to 3) and unsynced counts per entity"""
+    catalog = CATEGORY_CATALOG.get(conn)
+    
+    # Get recent unsynced expenses (limit 3)
+    expenses = conn.execute('''
+        SELECT expense_id, amount, category_id, description, expense_date
+        FROM expense
+        WHERE user_id = ? AND is_synced = 0
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY expense_date DESC, expense_id DESC
+        LIMIT 3
+    ''', (user_id,)).fetchall()
+    
+    # Count total unsynced expenses
+    total_expenses = conn.execute(
+        'SELECT COUNT(*) as count FROM expense WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
+        (user_id,)
+    ).fetchone()['count']
+    
+    # Get recent unsynced income (limit 3)
+    income = conn.execute('''
+        SELECT income_id, amount, income_source as source, description, income_date
+        FROM income
+        WHERE user_id = ? AND is_synced = 0
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY income_date DESC, income_id DESC
+        LIMIT 3
+    ''', (user_id,)).fetchall()
+    
+    total_income = conn.execute(
+        'SELECT COUNT(*) as count FROM income WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
+        (user_id,)
+    ).fetchone()['count']
+    
+    # Get recent unsynced budgets (limit 3)
+    budgets = conn.execute('''
+        SELECT budget_id, category_id, budget_amount, start_date, end_date
+        FROM budget
+        WHERE user_id = ? AND is_synced = 0
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY created_at DESC, budget_id DESC
+        LIMIT 3
+    ''', (user_id,)).fetchall()
+    
+    total_budgets = conn.execute(
+        'SELECT COUNT(*) as count FROM budget WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
+        (user_id,)
+    ).fetchone()['count']
+    
+    # Get recent unsynced goals (limit 3)
+    goals = conn.execute('''
+        SELECT goal_id, goal_name, target_amount, current_amount
+        FROM savings_goal
+        WHERE user_id = ? AND is_synced = 0
+          AND (is_deleted = 0 OR is_deleted IS NULL)
+        ORDER BY created_at DESC, goal_id DESC
+        LIMIT 3
+    ''', (user_id,)).fetchall()
+    
+    total_goals = conn.execute(
+        'SELECT COUNT(*) as count FROM savings_goal WHERE user_id = ? AND is_synced = 0 AND (is_deleted = 0 OR is_deleted IS NULL)',
+        (user_id,)
+    ).fetchone()['count']
+    
+    return {
+        'expenses': {
+            'items': [
+                {'expense_id': row['expense_id'], 'amount': row['amount'],
+                 'category': catalog.name(row['category_id']),
+                 'description': row['description'], 'expense_date': row['expense_date']}
+                for row in expenses
+            ],
+            'total': total_expenses
+        },
+        'income': {
+            'items': [dict(row) for row in income],
+            'total': total_income
+        },
+        'budgets': {
+            'items': [
+                {'budget_id': row['budget_id'], 'category_name': catalog.name(row['category_id']),
+                 'budget_amount': row['budget_amount'], 'start_date': row['start_date'],
+                 'end_date': row['end_date']}
+                for row in budgets
+            ],
+            'total': total_budgets
+        },
+        'goals': {
+            'items': [dict(row) for row in goals],
+            'total': total_goals
+        }
+    }
+
 # ============================================
 # API ENDPOINTS FOR CHARTS
 # ============================================
 
 @app.route('/api/expense_by_category')
 @login_required
+@data_version_etag
 def api_expense_by_category():
     """API endpoint for category-wise expense chart"""
     db = get_sqlite_db()
     user_id = session['user_id']
     
-    data = db.execute('''
-        SELECT c.category_name, COALESCE(SUM(e.amount), 0) as total
-        FROM category c
-        LEFT JOIN expense e ON c.category_id = e.category_id 
-          AND e.user_id = ?
-          AND (e.is_deleted = 0 OR e.is_deleted IS NULL)
-        WHERE c.category_type = 'EXPENSE'
-        GROUP BY c.category_name
-        HAVING total > 0
-        ORDER BY total DESC
-    ''', (user_id,)).fetchall()
+    data = expense_by_category_dataset(db, user_id)
     
     db.close()
     
-    return jsonify({
-        'labels': [row['category_name'] for row in data],
-        'values': [float(row['total']) for row in data]
-    })
+    return jsonify(data)
 
 @app.route('/api/monthly_trend')
 @login_required
+@data_version_etag
 def api_monthly_trend():
     """API endpoint for monthly expense trend"""
     db = get_sqlite_db()
     user_id = session['user_id']
     
-    data = db.execute('''
-        SELECT strftime('%Y-%m', expense_date) as month, 
-               SUM(amount) as total
-        FROM expense
-        WHERE user_id = ?
-          AND (is_deleted = 0 OR is_deleted IS NULL)
-        GROUP BY month
-        ORDER BY month DESC
-        LIMIT 6
-    ''', (user_id,)).fetchall()
+    data = monthly_trend_dataset(db, user_id)
     
     db.close()
     
-    return jsonify({
-        'labels': [row['month'] for row in reversed(data)],
-        'values': [float(row['total']) for row in reversed(data)]
-    })
+    return jsonify(data)
+
+# ============================================
+# BUNDLE API
+# ============================================
+
+# Datasets served by /api/bundle: name -> (builder, {parameter: (default, min, max)}).
+# Builders are called as builder(conn, user_id, shared, **parameters).
+BUNDLE_DATASETS = {
+    'expense_by_category': (expense_by_category_dataset, {}),
+    'monthly_trend': (monthly_trend_dataset, {'months': (6, 1, 120)}),
+    'money_flow': (money_flow_dataset, {'months': (7, 1, 120)}),
+    'month_summary': (month_summary_dataset, {}),
+    'pending_sync': (pending_sync_dataset, {}),
+}
+
+# orjson when installed (optional), else the standard library's encoder
+JSON_DUMPS = None
+
+def compact_json(payload):
+    """Serialize to compact JSON bytes with the fastest encoder available"""
+    global JSON_DUMPS
+    if JSON_DUMPS is None:
+        try:
+            import orjson
+            JSON_DUMPS = orjson.dumps
+        except ImportError:
+            import json
+            JSON_DUMPS = lambda value: json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return JSON_DUMPS(payload)
+
+def bundle_parameter(dataset, name, default, low, high):
+    """Integer parameter `<dataset>.<name>` of the request, within [low, high]"""
+    raw = request.args.get(f"{dataset}.{name}")
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{dataset}.{name} must be an integer") from None
+    if not low <= value <= high:
+        raise ValueError(f"{dataset}.{name} must be between {low} and {high}")
+    return value
+
+@app.route('/api/bundle')
+@login_required
+@data_version_etag
+def api_bundle():
+    """Several datasets in one response, computed on one connection
+    
+    ?datasets=expense_by_category,monthly_trend&monthly_trend.months=12
+    returns {"expense_by_category": {...}, "monthly_trend": {...}}. Datasets
+    of the same request share their aggregates, e.g. the monthly totals
+    behind monthly_trend, money_flow and month_summary are read once.
+    """
+    names = [name.strip() for name in request.args.get('datasets', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in BUNDLE_DATASETS]
+    if not names or unknown:
+        return jsonify({
+            'error': f"Unknown datasets: {', '.join(unknown)}" if unknown else "No datasets requested",
+            'datasets': sorted(BUNDLE_DATASETS)
+        }), 400
+    
+    try:
+        parameters = {}
+        for name in names:
+            _, spec = BUNDLE_DATASETS[name]
+            parameters[name] = {
+                parameter: bundle_parameter(name, parameter, *bounds)
+                for parameter, bounds in spec.items()
+            }
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    user_id = session['user_id']
+    conn = get_sqlite_db()
+    shared = {}
+    try:
+        payload = {}
+        for name in dict.fromkeys(names):
+            build, _ = BUNDLE_DATASETS[name]
+            payload[name] = build(conn, user_id, shared, **parameters[name])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+    
+    return Response(compact_json(payload), mimetype='application/json')
+
+# Upper bounds (ms) of the sync phase duration histogram buckets
+SYNC_HISTOGRAM_BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def histogram(values, buckets):
+    """Count values per bucket; the last count holds values above every bound"""
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+@app.route('/api/sync_metrics')
+@login_required
+def api_sync_metrics():
+    """API endpoint for per-phase sync timings of the user's recent syncs"""
+    user_id = session['user_id']
+    # A negative LIMIT means no limit in SQLite, so keep it in range
+    runs = min(max(request.args.get('runs', 50, type=int), 1), 500)
+    conn = get_sqlite_db()
+    
+    try:
+        sync_runs = conn.execute('''
+            SELECT sync_log_id, sync_start_time, sync_status, records_synced, duration_seconds,
+                   round_trips, bytes_fetched, failed_rows, retry_count
+            FROM sync_log
+            WHERE user_id = ?
+            ORDER BY sync_start_time DESC, sync_log_id DESC
+            LIMIT ?
+        ''', (user_id, runs)).fetchall()
+        
+        phase_rows = conn.execute('''
+            SELECT p.phase_name, p.phase_order, p.duration_ms, p.rows_processed,
+                   p.round_trips, p.bytes_fetched, p.failed_rows
+            FROM sync_phase p
+            JOIN (
+                SELECT sync_log_id FROM sync_log
+                WHERE user_id = ?
+                ORDER BY sync_start_time DESC, sync_log_id DESC
+                LIMIT ?
+            ) r ON r.sync_log_id = p.sync_log_id
+            ORDER BY p.phase_order
+        ''', (user_id, runs)).fetchall()
+        
+        conn.close()
+        
+        phases = {}
+        for row in phase_rows:
+            phases.setdefault(row['phase_name'], []).append(row)
+        
+        phase_metrics = []
+        for name, rows in phases.items():
+            durations = [row['duration_ms'] for row in rows]
+            rates = [row['rows_processed'] * 1000 / row['duration_ms']
+                     for row in rows if row['duration_ms'] > 0]
+            phase_metrics.append({
+                'phase': name,
+                'samples': len(rows),
+                'duration_ms': {
+                    'p50': percentile(durations, 50),
+                    'p90': percentile(durations, 90),
+                    'p99': percentile(durations, 99),
+                    'max': max(durations),
+                },
+                'rows_per_second': {
+                    'p50': percentile(rates, 50),
+                    'p90': percentile(rates, 90),
+                    'p99': percentile(rates, 99),
+                },
+                'histogram': {
+                    'buckets_ms': SYNC_HISTOGRAM_BUCKETS_MS,
+                    'counts': histogram(durations, SYNC_HISTOGRAM_BUCKETS_MS),
+                },
+                'rows': sum(row['rows_processed'] for row in rows),
+                'round_trips': sum(row['round_trips'] for row in rows),
+                'bytes_fetched': sum(row['bytes_fetched'] for row in rows),
+                'failed_rows': sum(row['failed_rows'] for row in rows),
+            })
+        
+        durations = [row['duration_seconds'] for row in sync_runs
+                     if row['duration_seconds'] is not None]
+        return jsonify({
+            'runs': len(sync_runs),
+            'duration_seconds': {
+                'p50': percentile(durations, 50),
+                'p90': percentile(durations, 90),
+                'p99': percentile(durations, 99),
+            },
+            'records_synced': sum(row['records_synced'] for row in sync_runs),
+            'retries': sum(row['retry_count'] or 0 for row in sync_runs),
+            'phases': phase_metrics,
+            'recent': [dict(row) for row in sync_runs[:10]],
+        })
+        
+    except Exception as e:
+        if conn:
+            conn.close()
+        return jsonify({'error': str(e)}), 500
+
+# ============================================
+# DIAGNOSTICS
+# ============================================
+
+@app.route('/report/slow_queries')
+@login_required
+@admin_required
+def view_slow_queries():
+    """Recorded slow SQLite statements grouped by statement, with their plans"""
+    groups = aggregate_slow_queries(read_slow_queries())
+    if request.args.get('flagged'):
+        groups = [group for group in groups if group['flags']]
+    return render_template('report_slow_queries.html',
+                         groups=groups,
+                         enabled=SLOW_QUERY_RECORDER.enabled,
+                         threshold_ms=SLOW_QUERY_RECORDER.threshold_ms,
+                         flagged=bool(request.args.get('flagged')))
+
+def may_scrape_metrics():
+    """Whether the request may read /metrics
+
+    A scraper sends the [web] metrics_token as a bearer token; admin
+    users may look from the browser. Without a token configured, only
+    requests from this host are answered.
+    """
+    token = config.get('web', 'metrics_token', fallback='')
+    scheme, _, sent = request.headers.get('Authorization', '').partition(' ')
+    if token and scheme.lower() == 'bearer' and hmac.compare_digest(sent, token):
+        return True
+    if REQUEST_PROFILER.is_admin():
+        return True
+    return not token and request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/metrics')
+def metrics():
+    """Request, report and sync metrics in the Prometheus text format"""
+    if not may_scrape_metrics():
+        return Response('Unauthorized\n', status=401, content_type='text/plain',
+                        headers={'WWW-Authenticate': 'Bearer'})
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 # ============================================
 # RUN APPLICATION
 # ============================================
 
 if __name__ == '__main__':
+    # Development server; use serve.py for multi-worker serving
     app.run(debug=True, host='0.0.0.0', port=5000)
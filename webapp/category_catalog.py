@@ -0,0 +1,85 @@
+"""
+Personal Finance Management System - Category Catalog
+In-process cache of the category table, with id -> name/type maps and
+the active categories of each type pre-sorted by name, reloaded only
+when the catalog version (sqlite/15_category_catalog_version.sql) moves
+"""
+
+import sqlite3
+
+from metrics_registry import REGISTRY
+
+CATALOG_LOOKUPS = REGISTRY.counter(
+    'spendly_category_catalog_lookups_total',
+    "Category catalog lookups, answered from the cache (hit) or by reloading it (reload)",
+    ['result'])
+
+
+class Catalog:
+    """One loaded version of the category table; never modified"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.by_id = {row['category_id']: row for row in rows}
+        self.names = {row['category_id']: row['category_name'] for row in rows}
+        self.types = {row['category_id']: row['category_type'] for row in rows}
+        self.active_by_type = {}
+        for row in sorted(rows, key=lambda row: row['category_name']):
+            if row['is_active'] == 1:
+                self.active_by_type.setdefault(row['category_type'], []).append(row)
+
+    def name(self, category_id):
+        return self.names.get(category_id, 'Unknown')
+
+    def active(self, category_type):
+        """Active categories of one type ('EXPENSE' or 'INCOME'), by name"""
+        return self.active_by_type.get(category_type, [])
+
+
+class CategoryCatalog:
+    """The current Catalog of this process
+
+    get(conn) costs one single-row read of the catalog version on the
+    connection the request already has open; the table itself is read
+    again only after it changed. Without the version table every call
+    reloads, which is still correct.
+    """
+
+    def __init__(self):
+        self.current = None
+
+    @staticmethod
+    def read_version(conn):
+        try:
+            row = conn.execute(
+                'SELECT version FROM category_catalog_version WHERE catalog_id = 1'
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def get(self, conn):
+        """The catalog as of `conn`, reloaded if the version moved"""
+        version = self.read_version(conn)
+        catalog = self.current
+        if catalog is not None and version is not None and catalog.version == version:
+            CATALOG_LOOKUPS.labels('hit').inc()
+            return catalog
+        return self.load(conn, version)
+
+    def load(self, conn, version=None):
+        """Read the category table and make it the current catalog"""
+        rows = conn.execute('''
+            SELECT category_id, category_name, category_type, description, is_active
+            FROM category
+        ''').fetchall()
+        catalog = Catalog(version, [dict(row) for row in rows])
+        # Swapped whole, so concurrent requests see one version or the other
+        self.current = catalog
+        CATALOG_LOOKUPS.labels('reload').inc()
+        return catalog
+
+    def name(self, category_id):
+        """Name of a category in the current catalog (template filter)"""
+        catalog = self.current
+        return catalog.name(category_id) if catalog is not None else 'Unknown'
@@ -0,0 +1,97 @@
+"""
+Personal Finance Management System - Response Compression
+gzip or brotli compression of dynamic responses above a size threshold,
+negotiated from the request's Accept-Encoding
+"""
+
+import gzip
+
+from flask import request
+
+# Text formats worth compressing; images and downloads are left alone
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+# Fast settings for responses compressed on every request; static assets
+# are compressed once and can afford the smallest output
+DYNAMIC_LEVELS = {'br': 5, 'gzip': 6}
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+
+# The brotli module (optional), imported on first use; False once known missing
+_brotli = None
+
+
+def brotli_module():
+    """The brotli module, or None when it is not installed"""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli or None
+
+
+def supported_encodings():
+    """Encodings this process can produce, preferred first"""
+    return ['br', 'gzip'] if brotli_module() else ['gzip']
+
+
+def negotiate_encoding():
+    """The best encoding the current request accepts, or None"""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli_module().compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ResponseCompressor:
+    """Compresses text responses for clients that accept it
+
+    Configured under [web] in config.ini and on by default. Responses
+    below `compression_min_bytes`, already encoded, streamed (file
+    downloads) or not text are sent as they are.
+    """
+
+    def __init__(self, config):
+        self.configure(config)
+
+    def configure(self, config):
+        """(Re)read the settings; the hook registered by init_app stays"""
+        section = 'web'
+        self.enabled = config.getboolean(section, 'compression', fallback=True)
+        self.min_bytes = config.getint(section, 'compression_min_bytes', fallback=1024)
+
+    def init_app(self, app):
+        """Register the response hook on a Flask app"""
+        app.after_request(self.compress_response)
+
+    def compress_response(self, response):
+        if (not self.enabled
+                or response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        # The body depends on Accept-Encoding whether or not it is compressed here
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding()
+        data = response.get_data()
+        if encoding is None or len(data) < self.min_bytes:
+            return response
+
+        response.set_data(compress(data, encoding, DYNAMIC_LEVELS[encoding]))
+        response.headers['Content-Encoding'] = encoding
+        # A strong tag names exact bytes; the encoded body only matches weakly
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            response.set_etag(tag, weak=True)
+        return response
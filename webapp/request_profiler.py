@@ -0,0 +1,353 @@
+"""
+Personal Finance Management System - Request Profiler
+Opt-in, sampled per-request timing of the web app and of every SQLite and
+Oracle statement a request runs, with N+1 detection, a Server-Timing
+header and a log of slow requests, plus on-demand cProfile or stack
+sampling of single requests for admins
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from flask import g, has_request_context, request, session
+
+from code_profiler import CodeProfile
+
+LOGGER_NAME = 'finance.web.profiler'
+LOG_DIR = Path(__file__).resolve().parent.parent / 'logs'
+LOG_FILE = 'slow_requests.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Statements listed per logged request, slowest first
+LOGGED_STATEMENTS = 10
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Modules whose connection wrappers sit between a query and its caller
+WRAPPER_MODULES = {__name__, 'slow_queries'}
+
+
+def normalize_sql(sql):
+    """Statement text with literals replaced and whitespace collapsed
+
+    Statements that differ only in inlined values share a normalized
+    text, so loops that build their SQL with string formatting are
+    grouped like parameterized ones.
+    """
+    return WHITESPACE_PATTERN.sub(' ', LITERAL_PATTERN.sub('?', sql)).strip()
+
+
+def call_site():
+    """'file:line function' of the first caller outside the wrappers"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') in WRAPPER_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+
+
+class Statement:
+    """One executed statement: database, text, call site, time and rows"""
+
+    __slots__ = ('database', 'sql', 'site', 'seconds', 'rows')
+
+    def __init__(self, database, sql, site):
+        self.database = database
+        self.sql = sql
+        self.site = site
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class RequestProfile:
+    """Statements recorded while serving one sampled request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = []
+
+    def record(self, database, sql):
+        statement = Statement(database, sql, call_site())
+        self.statements.append(statement)
+        return statement
+
+    def database_totals(self):
+        """{database: (statements, seconds)} in first-use order"""
+        totals = {}
+        for statement in self.statements:
+            count, seconds = totals.get(statement.database, (0, 0.0))
+            totals[statement.database] = (count + 1, seconds + statement.seconds)
+        return totals
+
+    def repeated_statements(self, threshold):
+        """Statements run at least `threshold` times from the same call site
+
+        The same statement issued over and over from one line is the
+        signature of an N+1 loop that a single grouped query could replace.
+        """
+        groups = {}
+        for statement in self.statements:
+            key = (statement.database, statement.site, normalize_sql(statement.sql))
+            groups.setdefault(key, []).append(statement)
+
+        repeated = []
+        for (database, site, sql), statements in groups.items():
+            if len(statements) >= threshold:
+                repeated.append({
+                    'database': database,
+                    'site': site,
+                    'sql': sql,
+                    'count': len(statements),
+                    'total_ms': round(sum(s.seconds for s in statements) * 1000, 3),
+                })
+        repeated.sort(key=lambda item: item['count'], reverse=True)
+        return repeated
+
+
+class ProfiledCursor:
+    """Cursor wrapper that times execution and fetching of each statement"""
+
+    def __init__(self, cursor, database, profile, statement=None):
+        self._cursor = cursor
+        self._database = database
+        self._profile = profile
+        self._statement = statement
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def _run(self, method, sql, args, kwargs):
+        statement = self._profile.record(self._database, sql)
+        start = time.perf_counter()
+        try:
+            method(sql, *args, **kwargs)
+        finally:
+            statement.seconds += time.perf_counter() - start
+        if self._cursor.rowcount and self._cursor.rowcount > 0:
+            statement.rows = self._cursor.rowcount
+        self._statement = statement
+        return self
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._cursor.execute, sql, args, kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._cursor.executemany, sql, args, kwargs)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._statement is not None:
+            self._statement.seconds += time.perf_counter() - start
+            if isinstance(result, list):
+                self._statement.rows += len(result)
+            elif result is not None:
+                self._statement.rows += 1
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+
+class ProfiledConnection:
+    """Connection wrapper whose cursors record into the request profile"""
+
+    def __init__(self, connection, database, profile):
+        self._connection = connection
+        self._database = database
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._connection.cursor(*args, **kwargs),
+                              self._database, self._profile)
+
+    def execute(self, sql, *args, **kwargs):
+        return self.cursor().execute(sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self.cursor().executemany(sql, *args, **kwargs)
+
+
+class RequestProfiler:
+    """Samples requests and profiles them
+
+    Configured under [profiling] in config.ini and off by default. A
+    request that is not sampled costs one random number; its connections
+    are not wrapped and no header is added.
+    """
+
+    def __init__(self, config):
+        self.logger = None
+        self.configure(config)
+
+    def configure(self, config):
+        """(Re)read the settings; the hooks registered by init_app stay"""
+        section = 'profiling'
+        self.enabled = config.getboolean(section, 'enabled', fallback=False)
+        self.sample_rate = config.getfloat(section, 'sample_rate', fallback=0.05)
+        self.slow_request_ms = config.getfloat(section, 'slow_request_ms', fallback=500)
+        self.repeat_threshold = config.getint(section, 'n_plus_one_threshold', fallback=5)
+        # On-demand code profiling, for these users or requests with the token
+        self.admin_users = {
+            name.strip() for name in config.get(section, 'admin_users', fallback='').split(',')
+            if name.strip()
+        }
+        self.profile_token = config.get(section, 'profile_token', fallback='')
+        self.sample_interval = config.getfloat(section, 'sample_interval_ms', fallback=5) / 1000
+        if self.enabled:
+            self.logger = self.get_logger()
+
+    def init_app(self, app):
+        """Register the request hooks on a Flask app"""
+        app.before_request(self.start_code_profile)
+        app.after_request(self.finish_code_profile)
+        app.teardown_request(self.cancel_code_profile)
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+
+    def get_logger(self):
+        """Logger writing one JSON line per flagged request to logs/"""
+        logger = logging.getLogger(LOGGER_NAME)
+        if not logger.handlers:
+            from logging.handlers import RotatingFileHandler
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                LOG_DIR / LOG_FILE,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8',
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        return logger
+
+    def start_request(self):
+        if self.enabled and random.random() < self.sample_rate:
+            g.request_profile = RequestProfile()
+
+    def wrap(self, connection, database):
+        """Profile a connection if the current request is sampled"""
+        if connection is None or not has_request_context():
+            return connection
+        profile = g.get('request_profile')
+        if profile is None:
+            return connection
+        return ProfiledConnection(connection, database, profile)
+
+    def finish_request(self, response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        totals = profile.database_totals()
+        timings = [f"app;dur={total_ms:.1f}"]
+        for database, (count, seconds) in totals.items():
+            timings.append(f'{database};dur={seconds * 1000:.1f};desc="{count} queries"')
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+        repeated = profile.repeated_statements(self.repeat_threshold)
+        if total_ms >= self.slow_request_ms or repeated:
+            self.log_request(profile, response, total_ms, totals, repeated)
+        return response
+
+    def log_request(self, profile, response, total_ms, totals, repeated):
+        slowest = sorted(profile.statements, key=lambda s: s.seconds, reverse=True)
+        self.logger.info(json.dumps({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 3),
+            'slow': total_ms >= self.slow_request_ms,
+            'databases': {
+                database: {'statements': count, 'duration_ms': round(seconds * 1000, 3)}
+                for database, (count, seconds) in totals.items()
+            },
+            'n_plus_one': repeated,
+            'statements': [
+                {
+                    'database': statement.database,
+                    'site': statement.site,
+                    'sql': normalize_sql(statement.sql),
+                    'duration_ms': round(statement.seconds * 1000, 3),
+                    'rows': statement.rows,
+                }
+                for statement in slowest[:LOGGED_STATEMENTS]
+            ],
+        }))
+
+    def is_admin(self):
+        """Whether the logged-in user is listed in `admin_users`"""
+        return session.get('username') in self.admin_users
+
+    def may_profile(self):
+        """Whether the current request may ask for a code profile"""
+        token = request.headers.get('X-Profile-Token')
+        if self.profile_token and token and hmac.compare_digest(token, self.profile_token):
+            return True
+        return self.is_admin()
+
+    def start_code_profile(self):
+        """Run the request under cProfile or the stack sampler when asked
+
+        Asked for with an `X-Profile: cprofile|sample` header or a
+        `?profile=cprofile|sample` query flag, and ignored unless the
+        user is listed in `admin_users` or the request carries the
+        `X-Profile-Token`.
+        """
+        if not (self.admin_users or self.profile_token):
+            return
+        mode = request.headers.get('X-Profile') or request.args.get('profile')
+        if not mode or not self.may_profile():
+            return
+        label = f"{request.endpoint or 'unmatched'}_user{session.get('user_id', '')}"
+        try:
+            profile = CodeProfile(mode, label, self.sample_interval)
+            profile.start()
+        except (ValueError, RuntimeError) as e:
+            g.code_profile_error = str(e)
+            return
+        g.code_profile = profile
+
+    def finish_code_profile(self, response):
+        profile = g.pop('code_profile', None)
+        if profile is not None:
+            response.headers['X-Profile-Output'] = profile.stop().name
+        elif 'code_profile_error' in g:
+            response.headers['X-Profile-Output'] = f"not profiled: {g.code_profile_error}"
+        return response
+
+    def cancel_code_profile(self, exception=None):
+        # The request failed before its response was finished
+        profile = g.pop('code_profile', None)
+        if profile is not None:
+            profile.cancel()
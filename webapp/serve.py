@@ -0,0 +1,126 @@
+"""
+Personal Finance Management System - Production Server
+Serves the web app with several worker processes (gunicorn, Linux/macOS)
+or worker threads (waitress, any platform) instead of the debug server
+"""
+
+import argparse
+import configparser
+import os
+import sys
+
+from jinja2 import TemplateError
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.normpath(os.path.join(BASE_DIR, '..', 'synchronization', 'config.ini'))
+
+SERVERS = ('auto', 'gunicorn', 'waitress')
+
+
+def load_app(config_file, sqlite_path=None):
+    """Import and configure the app, and compile its templates and assets
+
+    With gunicorn this runs once in the master before the workers are
+    forked, so the configuration, the imported modules, the compiled
+    templates and the compressed assets are shared copy-on-write instead
+    of rebuilt per worker.
+    """
+    # Relative paths in config.ini (databases, bundles) are relative to
+    # webapp/ and synchronization/, which are siblings
+    os.chdir(BASE_DIR)
+    sys.path.insert(0, BASE_DIR)
+    import app as webapp
+
+    flask_app = webapp.create_app(config_file, sqlite_path)
+    for name in flask_app.jinja_env.list_templates():
+        try:
+            flask_app.jinja_env.get_template(name)
+        except TemplateError:
+            # Left for the request that renders it, if any (e.g. old backups)
+            continue
+    webapp.STATIC_ASSETS.precompress()
+    return webapp, flask_app
+
+
+def serve_gunicorn(webapp, flask_app, host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    def post_fork(server, worker):
+        # Connections are opened per worker, never shared across a fork
+        webapp.init_worker()
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', post_fork)
+
+        def load(self):
+            return flask_app
+
+    Server().run()
+
+
+def serve_waitress(flask_app, host, port, threads):
+    from waitress import serve
+
+    serve(flask_app, host=host, port=port, threads=threads)
+
+
+def pick_server(name):
+    """The server to run: the one named, or gunicorn where it can fork"""
+    if name != 'auto':
+        return name
+    if os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+            return 'gunicorn'
+        except ImportError:
+            pass
+    return 'waitress'
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Serve the web app with multiple workers")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help="configuration file")
+    parser.add_argument('--database', help="local SQLite database (default: ../sqlite/finance_local.db)")
+    parser.add_argument('--server', choices=SERVERS, default='auto',
+                        help="gunicorn (processes and threads) or waitress (threads only)")
+    parser.add_argument('--host', help="address to bind (default: [web] host)")
+    parser.add_argument('--port', type=int, help="port to bind (default: [web] port)")
+    parser.add_argument('--workers', type=int,
+                        help="worker processes, gunicorn only (default: [web] workers)")
+    parser.add_argument('--threads', type=int,
+                        help="threads per worker (default: [web] threads)")
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    host = args.host or config.get('web', 'host', fallback='0.0.0.0')
+    port = args.port or config.getint('web', 'port', fallback=5000)
+    # 0 workers means one per CPU core
+    workers = args.workers or config.getint('web', 'workers', fallback=0) or os.cpu_count() or 1
+    threads = args.threads or config.getint('web', 'threads', fallback=4)
+
+    server = pick_server(args.server)
+    database = os.path.abspath(args.database) if args.database else None
+    webapp, flask_app = load_app(os.path.abspath(args.config), database)
+    try:
+        if server == 'gunicorn':
+            print(f"Serving on {host}:{port} with gunicorn: {workers} workers x {threads} threads")
+            serve_gunicorn(webapp, flask_app, host, port, workers, threads)
+        else:
+            print(f"Serving on {host}:{port} with waitress: {threads} threads")
+            serve_waitress(flask_app, host, port, threads)
+    except ImportError:
+        print(f"{server} is not installed. Run: pip install {server}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
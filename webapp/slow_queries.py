@@ -0,0 +1,307 @@
+"""
+Personal Finance Management System - Slow Query Recorder
+Records SQLite statements slower than a threshold with their EXPLAIN QUERY
+PLAN, flags full table scans and temporary B-trees, and aggregates the
+log by normalized statement text for the report page and the CLI
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from request_profiler import call_site, normalize_sql
+
+LOGGER_NAME = 'finance.web.slow_queries'
+LOG_DIR = Path(__file__).resolve().parent.parent / 'logs'
+LOG_FILE = 'slow_queries.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+TEMP_BTREE_PATTERN = re.compile(r'USE TEMP B-TREE FOR (.+)$')
+
+
+def plan_flags(plan):
+    """Flags of an EXPLAIN QUERY PLAN: full scans and temporary B-trees
+
+    A scan of a table, or of a whole index, reads every row; a temporary
+    B-tree sorts or groups rows no index delivers in order. Both usually
+    mean an index is missing or a predicate cannot use it.
+    """
+    flags = []
+    for detail in plan:
+        scan = SCAN_PATTERN.match(detail)
+        if scan and scan.group(1) != 'CONSTANT':
+            flags.append(f"full scan of {scan.group(1)}")
+        temp_btree = TEMP_BTREE_PATTERN.search(detail)
+        if temp_btree:
+            flags.append(f"temp B-tree for {temp_btree.group(1).lower()}")
+    return flags
+
+
+class RecordingCursor:
+    """Cursor wrapper that times each statement across execute and fetches"""
+
+    def __init__(self, cursor, recorder, connection):
+        self._cursor = cursor
+        self._recorder = recorder
+        self._connection = connection
+        self._current = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._current is not None:
+            self._current[2] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._current[3] += len(result)
+            elif result is not None:
+                self._current[3] += 1
+            self._recorder.check(self._connection, self._current)
+        return result
+
+    def execute(self, sql, parameters=()):
+        # [sql, parameters, seconds, rows, recorded]
+        self._current = [sql, parameters, 0.0, 0, False]
+        self._timed(self._cursor.execute, sql, parameters)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._current = None
+        self._cursor.executemany(sql, seq_of_parameters)
+        return self
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+
+class RecordingConnection:
+    """SQLite connection wrapper whose cursors report slow statements"""
+
+    def __init__(self, connection, recorder):
+        self._connection = connection
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args):
+        return RecordingCursor(self._connection.cursor(*args), self._recorder,
+                               self._connection)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def parameter_types(parameters):
+    """Type names of a statement's parameters, positional or named"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters]
+
+
+class SlowQueryRecorder:
+    """Writes SQLite statements slower than the threshold to logs/
+
+    Configured under [slow_queries] in config.ini and off by default.
+    Time is what the caller spends in execute and fetch calls. Entries
+    keep the statement as run and the types of its parameters; their
+    values, which are user data, only with `log_parameters`. Plans are
+    cached per normalized statement for `plan_cache_seconds`, so a
+    statement that is slow on every request is not explained every time.
+    """
+
+    def __init__(self, config):
+        self.plans = {}
+        self.lock = threading.Lock()
+        self.configure(config)
+
+    def configure(self, config):
+        """(Re)read the settings under [slow_queries]"""
+        section = 'slow_queries'
+        self.enabled = config.getboolean(section, 'enabled', fallback=False)
+        self.threshold_ms = config.getfloat(section, 'threshold_ms', fallback=100)
+        self.plan_cache_seconds = config.getfloat(section, 'plan_cache_seconds', fallback=300)
+        self.log_parameters = config.getboolean(section, 'log_parameters', fallback=False)
+        self.logger = self.get_logger() if self.enabled else None
+
+    def get_logger(self):
+        """Logger writing one JSON line per slow statement to logs/"""
+        logger = logging.getLogger(LOGGER_NAME)
+        if not logger.handlers:
+            from logging.handlers import RotatingFileHandler
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                LOG_DIR / LOG_FILE,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8',
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        return logger
+
+    def wrap(self, connection):
+        """Record slow statements of a SQLite connection when enabled"""
+        if not self.enabled:
+            return connection
+        return RecordingConnection(connection, self)
+
+    def check(self, connection, current):
+        """Record a statement once its time passes the threshold"""
+        sql, parameters, seconds, rows, recorded = current
+        if recorded or seconds * 1000 < self.threshold_ms:
+            return
+        current[4] = True
+
+        statement = normalize_sql(sql)
+        plan = self.query_plan(connection, statement, sql, parameters)
+        self.logger.info(json.dumps({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'sql': statement,
+            'statement': ' '.join(sql.split()),
+            # Values are amounts, descriptions and usernames, so they are
+            # only kept when asked for
+            'parameter_types': parameter_types(parameters),
+            **({'parameters': list(parameters)} if self.log_parameters else {}),
+            'site': call_site(),
+            'duration_ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'plan': plan,
+            'flags': plan_flags(plan),
+        }, default=str))
+
+    def query_plan(self, connection, statement, sql, parameters):
+        """EXPLAIN QUERY PLAN details of a statement, cached per statement"""
+        now = time.monotonic()
+        with self.lock:
+            cached = self.plans.get(statement)
+        if cached and now - cached[0] < self.plan_cache_seconds:
+            return cached[1]
+
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            plan = [row[3] for row in rows]
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        with self.lock:
+            self.plans[statement] = (now, plan)
+        return plan
+
+
+def read_slow_queries(log_dir=LOG_DIR):
+    """Recorded slow statements, oldest first, across the rotated logs"""
+    paths = [log_dir / f"{LOG_FILE}.{index}" for index in range(LOG_BACKUP_COUNT, 0, -1)]
+    paths.append(log_dir / LOG_FILE)
+    entries = []
+    for path in paths:
+        if not path.exists():
+            continue
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def aggregate_slow_queries(entries):
+    """Group recorded statements by normalized text, most total time first
+
+    A statement whose plan changed while it was being recorded lists
+    every plan seen; a new full scan in the latest one is an index
+    regression.
+    """
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['sql'])
+        if group is None:
+            group = groups[entry['sql']] = {
+                'sql': entry['sql'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'rows': 0,
+                'sites': [],
+                'plans': [],
+                'first_seen': entry['time'],
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['rows'] += entry['rows']
+        group['last_seen'] = entry['time']
+        group['plan'] = entry['plan']
+        group['flags'] = entry['flags']
+        if entry['site'] not in group['sites']:
+            group['sites'].append(entry['site'])
+        if entry['plan'] not in group['plans']:
+            group['plans'].append(entry['plan'])
+
+    results = []
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 3)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 3)
+        group['plan_changed'] = len(group['plans']) > 1
+        results.append(group)
+    results.sort(key=lambda group: group['total_ms'], reverse=True)
+    return results
+
+
+def main():
+    """Print the aggregated slow query log"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarize recorded slow SQLite statements")
+    parser.add_argument('--log-dir', type=Path, default=LOG_DIR,
+                        help=f"directory holding {LOG_FILE} (default: {LOG_DIR})")
+    parser.add_argument('--top', type=int, default=20, help="statements shown (default: 20)")
+    parser.add_argument('--flagged', action='store_true',
+                        help="only statements with full scans or temp B-trees")
+    args = parser.parse_args()
+
+    groups = aggregate_slow_queries(read_slow_queries(args.log_dir))
+    if args.flagged:
+        groups = [group for group in groups if group['flags']]
+    if not groups:
+        print("No slow statements recorded")
+        return
+
+    for group in groups[:args.top]:
+        print("=" * 70)
+        print(f"{group['count']} times, total {group['total_ms']:.1f} ms, "
+              f"mean {group['mean_ms']:.1f} ms, max {group['max_ms']:.1f} ms")
+        print(f"  {group['sql']}")
+        print(f"  Called from: {', '.join(group['sites'])}")
+        for detail in group['plan']:
+            print(f"  | {detail}")
+        for flag in group['flags']:
+            print(f"  ! {flag}")
+        if group['plan_changed']:
+            print(f"  ! plan changed ({len(group['plans'])} plans seen)")
+
+
+if __name__ == "__main__":
+    main()
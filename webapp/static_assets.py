@@ -0,0 +1,132 @@
+"""
+Personal Finance Management System - Static Assets
+Content-hash fingerprinted static URLs served with far-future immutable
+caching, and text assets compressed once instead of on every request
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import Response, request, send_from_directory
+
+from compression import (COMPRESSIBLE_TYPES, STATIC_LEVELS, compress, negotiate_encoding,
+                         supported_encodings)
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+HASH_LENGTH = 10
+FINGERPRINT_PATTERN = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+class StaticAssets:
+    """Fingerprints url_for('static', ...) and serves the static folder
+
+    url_for('static', filename='css/style.css') becomes
+    /static/css/style.<hash>.css, the hash being taken from the file's
+    content. A changed file gets a new URL, so the old one can be cached
+    for good. Hashes and compressed copies are computed on first use and
+    redone when a file's modification time changes.
+    """
+
+    def __init__(self):
+        self.static_folder = None
+        self.hashes = {}        # filename -> (mtime, hash)
+        self.compressed = {}    # (filename, hash, encoding) -> bytes
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        """Fingerprint static URLs of a Flask app and take over its static route"""
+        self.static_folder = app.static_folder
+        app.url_defaults(self.fingerprint_url)
+        app.view_functions['static'] = self.send_static
+
+    def content_hash(self, filename):
+        """Hash of a static file's content, or None when it does not exist"""
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        cached = self.hashes.get(filename)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'rb') as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()[:HASH_LENGTH]
+            cached = (mtime, digest)
+            self.hashes[filename] = cached
+        return cached[1]
+
+    def fingerprint_url(self, endpoint, values):
+        """url_defaults hook: put the content hash into static file names"""
+        if endpoint != 'static' or 'filename' not in values:
+            return
+        filename = values['filename']
+        digest = self.content_hash(filename)
+        if digest is not None:
+            stem, ext = os.path.splitext(filename)
+            values['filename'] = f"{stem}.{digest}{ext}"
+
+    def compressed_body(self, filename, digest, encoding):
+        key = (filename, digest, encoding)
+        body = self.compressed.get(key)
+        if body is None:
+            with open(os.path.join(self.static_folder, filename), 'rb') as handle:
+                body = compress(handle.read(), encoding, STATIC_LEVELS[encoding])
+            with self.lock:
+                # Drop the copies of older versions of the file
+                for old in [k for k in self.compressed if k[0] == filename and k[1] != digest]:
+                    del self.compressed[old]
+                self.compressed[key] = body
+        return body
+
+    def precompress(self, encodings=('br', 'gzip')):
+        """Hash and compress every text asset now rather than on first request
+
+        Run in the master process before workers are forked, the results
+        are shared by all of them.
+        """
+        encodings = [encoding for encoding in encodings if encoding in supported_encodings()]
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                filename = os.path.relpath(os.path.join(root, name), self.static_folder).replace(os.sep, '/')
+                digest = self.content_hash(filename)
+                if self.mimetype(filename) in COMPRESSIBLE_TYPES:
+                    for encoding in encodings:
+                        self.compressed_body(filename, digest, encoding)
+
+    @staticmethod
+    def mimetype(filename):
+        return mimetypes.guess_type(filename)[0]
+
+    def send_static(self, filename):
+        """Static route: fingerprinted names are cached for good, others as before"""
+        match = FINGERPRINT_PATTERN.match(filename)
+        if match is None:
+            return send_from_directory(self.static_folder, filename)
+
+        original = match.group('stem') + match.group('ext')
+        digest = self.content_hash(original)
+        if digest is None:
+            return send_from_directory(self.static_folder, filename)
+        if digest != match.group('hash'):
+            # A page rendered before the file changed: current content, not cached for good
+            return send_from_directory(self.static_folder, original, max_age=0)
+
+        mimetype = self.mimetype(original)
+        encoding = negotiate_encoding() if mimetype in COMPRESSIBLE_TYPES else None
+        if encoding is None:
+            response = send_from_directory(self.static_folder, original, max_age=IMMUTABLE_MAX_AGE)
+        else:
+            response = Response(self.compressed_body(original, digest, encoding), mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f"{digest}-{encoding}")
+            response.make_conditional(request)
+        if mimetype in COMPRESSIBLE_TYPES:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response